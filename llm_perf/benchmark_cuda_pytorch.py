@@ -7,6 +7,7 @@ from llm_perf.utils import common_errors_reporter, is_experiment_conducted, is_e
 from optimum_benchmark.backends.pytorch.config import PyTorchConfig
 from optimum_benchmark.benchmarks.inference.config import InferenceConfig
 from optimum_benchmark.experiment import ExperimentConfig, launch
+from optimum_benchmark.journal import Journal
 from optimum_benchmark.launchers.process.config import ProcessConfig
 from optimum_benchmark.logging_utils import setup_logging
 
@@ -15,6 +16,8 @@ MACHINE = os.getenv("MACHINE", "1xA100")
 SUBSET = os.getenv("SUBSET", "unquantized")
 CANONICAL_MODELS_ONLY = os.getenv("CANONICAL_MODELS_ONLY", "1") == "1"
 PUSH_REPO_ID = f"optimum-benchmark/llm-perf-pytorch-cuda-{SUBSET}-{MACHINE}"
+# local journal of the experiments, to resume interrupted runs without checking the hub for every experiment
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", os.path.join(CWD, f"llm-perf-pytorch-cuda-{SUBSET}-{MACHINE}.db"))
 
 
 ATTENTION_COFIGS = ["eager", "sdpa", "flash_attention_2"]
@@ -81,6 +84,7 @@ elif SUBSET == "awq":
 
 setup_logging()
 LOGGER = getLogger("llm-perf-backend")
+JOURNAL = Journal(JOURNAL_PATH)
 
 
 def benchmark_cuda_pytorch(model, attn_implementation, weights_config):
@@ -96,6 +100,8 @@ def benchmark_cuda_pytorch(model, attn_implementation, weights_config):
         start_method="spawn",
         device_isolation=True,
         device_isolation_action="error",
+        memory_screening=True,
+        memory_screening_action="error",
     )
     benchmark_config = InferenceConfig(
         memory=True,
@@ -130,15 +136,24 @@ def benchmark_cuda_pytorch(model, attn_implementation, weights_config):
         backend=backend_config,
     )
 
-    if is_experiment_conducted(experiment_config, PUSH_REPO_ID, subfolder):
+    if not JOURNAL.should_run(experiment_config):
+        LOGGER.info(f"Skipping experiment {experiment_name} with model {model} according to the journal")
+        return
+
+    if JOURNAL.get_entry(experiment_config) is None and is_experiment_conducted(
+        experiment_config, PUSH_REPO_ID, subfolder
+    ):
         LOGGER.info(f"Skipping experiment {experiment_name} with model {model} since it was already conducted")
+        JOURNAL.start(experiment_config)
+        JOURNAL.finish(experiment_config)
         return
 
     experiment_config.push_to_hub(subfolder=subfolder, repo_id=PUSH_REPO_ID, private=True)
 
     try:
-        benchmark_report = launch(experiment_config)
-        benchmark_report.push_to_hub(subfolder=subfolder, repo_id=PUSH_REPO_ID, private=True)
+        with JOURNAL.record(experiment_config):
+            benchmark_report = launch(experiment_config)
+            benchmark_report.push_to_hub(subfolder=subfolder, repo_id=PUSH_REPO_ID, private=True)
     except Exception as error:
         os.chdir(CWD)  # TODO: figure our why this is happening
         LOGGER.error(f"Experiment {experiment_name} failed with model {model}")
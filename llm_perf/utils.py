@@ -4,7 +4,11 @@ from optimum_benchmark.benchmarks.report import BenchmarkReport
 def common_errors_reporter(error, logger, subfolder, push_repo_id):
     benchmark_report = BenchmarkReport.from_targets(["decode", "prefill", "per_token", "error"])
 
-    if "torch.cuda.OutOfMemoryError" in str(error):
+    if "Estimated peak memory" in str(error):
+        logger.error("Memory screening: estimated out of memory")
+        benchmark_report.error = "Memory screening: estimated out of memory"
+        benchmark_report.push_to_hub(subfolder=subfolder, repo_id=push_repo_id, private=True)
+    elif "torch.cuda.OutOfMemoryError" in str(error):
         logger.error("CUDA: Out of memory")
         benchmark_report.error = "CUDA: Out of memory"
         benchmark_report.push_to_hub(subfolder=subfolder, repo_id=push_repo_id, private=True)
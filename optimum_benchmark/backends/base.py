@@ -10,6 +10,7 @@ import transformers.utils.logging as transformers_logging
 from transformers import GenerationConfig, PretrainedConfig, PreTrainedModel, TrainerState
 
 from ..task_utils import get_automodel_class_for_task
+from ..trackers.stage import track_stage
 from .config import BackendConfigT
 from .diffusers_utils import extract_diffusers_shapes_from_model, get_diffusers_pretrained_config
 from .timm_utils import extract_timm_shapes_from_config, get_timm_pretrained_config
@@ -43,34 +44,35 @@ class Backend(Generic[BackendConfigT], ABC):
         self.config = config
         self.seed()
 
-        if self.config.library == "diffusers":
-            self.pretrained_config = get_diffusers_pretrained_config(self.config.model, **self.config.hub_kwargs)
-            self.model_shapes = extract_diffusers_shapes_from_model(self.config.model, **self.config.hub_kwargs)
-            self.model_type = self.config.task
-            self.pretrained_processor = None
-            self.generation_config = None
-
-        elif self.config.library == "timm":
-            self.pretrained_config = get_timm_pretrained_config(self.config.model)
-            self.model_shapes = extract_timm_shapes_from_config(self.pretrained_config)
-            self.model_type = self.pretrained_config.architecture
-            self.pretrained_processor = None
-            self.generation_config = None
-
-        else:
-            self.pretrained_processor = get_transformers_pretrained_processor(
-                self.config.model, **self.config.hub_kwargs
+        with track_stage("load_config"):
+            if self.config.library == "diffusers":
+                self.pretrained_config = get_diffusers_pretrained_config(self.config.model, **self.config.hub_kwargs)
+                self.model_shapes = extract_diffusers_shapes_from_model(self.config.model, **self.config.hub_kwargs)
+                self.model_type = self.config.task
+                self.pretrained_processor = None
+                self.generation_config = None
+
+            elif self.config.library == "timm":
+                self.pretrained_config = get_timm_pretrained_config(self.config.model)
+                self.model_shapes = extract_timm_shapes_from_config(self.pretrained_config)
+                self.model_type = self.pretrained_config.architecture
+                self.pretrained_processor = None
+                self.generation_config = None
+
+            else:
+                self.pretrained_processor = get_transformers_pretrained_processor(
+                    self.config.model, **self.config.hub_kwargs
+                )
+                self.generation_config = get_transformers_generation_config(self.config.model, **self.config.hub_kwargs)
+                self.pretrained_config = get_transformers_pretrained_config(self.config.model, **self.config.hub_kwargs)
+                self.model_shapes = extract_transformers_shapes_from_artifacts(
+                    self.pretrained_config, self.pretrained_processor
+                )
+                self.model_type = self.pretrained_config.model_type
+
+            self.automodel_class = get_automodel_class_for_task(
+                model_type=self.model_type, library=self.config.library, task=self.config.task, framework="pt"
             )
-            self.generation_config = get_transformers_generation_config(self.config.model, **self.config.hub_kwargs)
-            self.pretrained_config = get_transformers_pretrained_config(self.config.model, **self.config.hub_kwargs)
-            self.model_shapes = extract_transformers_shapes_from_artifacts(
-                self.pretrained_config, self.pretrained_processor
-            )
-            self.model_type = self.pretrained_config.model_type
-
-        self.automodel_class = get_automodel_class_for_task(
-            model_type=self.model_type, library=self.config.library, task=self.config.task, framework="pt"
-        )
 
     def seed(self) -> None:
         LOGGER.info(f"\t+ Setting random seed to {self.config.seed}")
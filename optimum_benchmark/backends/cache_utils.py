@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict
+from logging import getLogger
+from typing import Any, Dict, List
+
+from transformers import PretrainedConfig
+
+from ..import_utils import optimum_version, torch_version, transformers_version
+from .config import BackendConfig
+
+LOGGER = getLogger("cache")
+
+ARTIFACT_METADATA_FILE = "artifact.json"
+
+
+def get_hash(key: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def get_config_hash(config: BackendConfig, exclude: List[str], **extra: Any) -> str:
+    """Hashes the backend config (which includes the backend's version) without the excluded fields."""
+
+    key = {name: value for name, value in asdict(config).items() if name not in exclude}
+    key.update(extra)
+
+    return get_hash(key)
+
+
+def get_artifact_dir(cache_dir: str, config: BackendConfig, exclude: List[str]) -> str:
+    """
+    Returns the directory of the artifact (e.g. exported, optimized or quantized model) produced by the backend config,
+    content-addressed by the fields of the config that affect the artifact and the versions of the libraries used to
+    produce it.
+    """
+
+    artifact_hash = get_config_hash(
+        config, exclude, optimum_version=optimum_version(), transformers_version=transformers_version()
+    )
+
+    return os.path.abspath(os.path.join(cache_dir, config.name, artifact_hash))
+
+
+def get_no_weights_model_dir(cache_dir: str, pretrained_config: PretrainedConfig, **extra: Any) -> str:
+    """
+    Returns the directory of the materialized random weights checkpoint of a model, content-addressed by its
+    pretrained config, the options used to materialize it (e.g. dtype) and the versions of torch and transformers.
+    """
+
+    no_weights_hash = get_hash(
+        {
+            "pretrained_config": pretrained_config.to_dict(),
+            "torch_version": torch_version(),
+            "transformers_version": transformers_version(),
+            **extra,
+        }
+    )
+
+    return os.path.abspath(os.path.join(cache_dir, "no_weights", no_weights_hash))
+
+
+def is_artifact_cached(artifact_dir: str) -> bool:
+    # the metadata file is written last, its presence means the artifact is complete
+    return os.path.isfile(os.path.join(artifact_dir, ARTIFACT_METADATA_FILE))
+
+
+def cache_artifact(artifact: str, artifact_dir: str, metadata: Dict[str, Any]) -> None:
+    """Copies the artifact to the cache, concurrent runs producing the same artifact are safe."""
+
+    LOGGER.info(f"\t+ Caching artifact {artifact} to {artifact_dir}")
+    tmp_artifact_dir = f"{artifact_dir}.{os.getpid()}.tmp"
+    shutil.copytree(artifact, tmp_artifact_dir)
+
+    with open(os.path.join(tmp_artifact_dir, ARTIFACT_METADATA_FILE), "w") as f:
+        json.dump(metadata, f, indent=4, default=str)
+
+    try:
+        os.rename(tmp_artifact_dir, artifact_dir)
+    except OSError:
+        LOGGER.info("\t+ Artifact was already cached by another run")
+        shutil.rmtree(tmp_artifact_dir, ignore_errors=True)
@@ -3,15 +3,18 @@ from typing import Dict
 from hydra.utils import get_class
 
 from ..import_utils import is_diffusers_available
+from ..metadata_cache import cached_metadata
 
 if is_diffusers_available():
     import diffusers  # type: ignore
 
 
+@cached_metadata("diffusers_config")
 def get_diffusers_pretrained_config(model: str, **kwargs) -> Dict[str, int]:
     return diffusers.DiffusionPipeline.load_config(model, **kwargs)
 
 
+@cached_metadata("diffusers_shapes")
 def extract_diffusers_shapes_from_model(model: str, **kwargs) -> Dict[str, int]:
     model_config = get_diffusers_pretrained_config(model, **kwargs)
 
@@ -11,13 +11,18 @@ from neural_compressor.config import AccuracyCriterion, PostTrainingQuantConfig,
 from optimum.intel.neural_compressor.quantization import INCQuantizer
 
 from ...generators.dataset_generator import DatasetGenerator
+from ...trackers.stage import record_artifact, track_stage
 from ..base import Backend
+from ..cache_utils import cache_artifact, get_artifact_dir, is_artifact_cached
 from ..transformers_utils import random_init_weights
 from .config import INCConfig
 from .utils import TASKS_TO_INCMODELS
 
 LOGGER = getLogger("neural-compressor")
 
+# options that don't affect the quantized model
+ARTIFACT_EXCLUDED_FIELDS = ["artifacts_cache_dir", "device_ids", "inter_op_num_threads", "intra_op_num_threads"]
+
 
 class INCBackend(Backend[INCConfig]):
     NAME: str = "neural-compressor"
@@ -29,7 +34,18 @@ class INCBackend(Backend[INCConfig]):
         LOGGER.info("\t+ Creating backend temporary directory")
         self.tmpdir = TemporaryDirectory()
 
-        if self.config.ptq_quantization:
+        if self.config.artifacts_cache_dir is not None and self.config.ptq_quantization:
+            self.artifact_dir = get_artifact_dir(self.config.artifacts_cache_dir, self.config, ARTIFACT_EXCLUDED_FIELDS)
+        else:
+            self.artifact_dir = None
+
+        if self.artifact_dir is not None and is_artifact_cached(self.artifact_dir):
+            LOGGER.info(f"\t+ Loading cached quantized INCModel from {self.artifact_dir}")
+            original_model, self.config.model = self.config.model, self.artifact_dir
+            self.load_incmodel_from_pretrained()
+            self.config.model = original_model
+
+        elif self.config.ptq_quantization:
             if self.config.no_weights:
                 LOGGER.info("\t+ Loading no weights AutoModel")
                 self.load_automodel_with_no_weights()
@@ -38,13 +54,23 @@ class INCBackend(Backend[INCConfig]):
                 self.load_automodel_from_pretrained()
 
             LOGGER.info("\t+ Applying post-training quantization")
-            self.quantize_automodel()
+            # calibration happens within the quantizer and is accounted in the quantize stage
+            with track_stage("quantize"):
+                self.quantize_automodel()
+            record_artifact("quantize", self.quantized_model)
 
             LOGGER.info("\t+ Loading quantized INCModel")
             original_model, self.config.model = self.config.model, self.quantized_model
             self.load_incmodel_from_pretrained()
             self.config.model = original_model
 
+            if self.artifact_dir is not None:
+                cache_artifact(
+                    self.quantized_model,
+                    self.artifact_dir,
+                    metadata={"model": self.config.model, "task": self.config.task},
+                )
+
         elif self.config.no_weights:
             LOGGER.info("\t+ Loading no weights INCModel")
             self.load_incmodel_with_no_weights()
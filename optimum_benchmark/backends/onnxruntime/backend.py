@@ -21,7 +21,9 @@ from safetensors.torch import save_file
 
 from ...generators.dataset_generator import DatasetGenerator
 from ...task_utils import TEXT_GENERATION_TASKS
+from ...trackers.stage import record_artifact, track_stage
 from ..base import Backend
+from ..cache_utils import cache_artifact, get_artifact_dir, is_artifact_cached
 from ..transformers_utils import random_init_weights
 from .config import ORTConfig
 from .utils import TASKS_TO_ORTMODELS, TASKS_TO_ORTSD, format_calibration_config, format_quantization_config
@@ -30,6 +32,18 @@ LOGGER = getLogger("onnxruntime")
 
 PROBLEMATIC_INPUTS = ["token_type_ids", "position_ids"]
 
+# options that only affect the inference sessions, not the exported/optimized/quantized model
+ARTIFACT_EXCLUDED_FIELDS = [
+    "artifacts_cache_dir",
+    "device_ids",
+    "provider",
+    "provider_options",
+    "use_io_binding",
+    "session_options",
+    "inter_op_num_threads",
+    "intra_op_num_threads",
+]
+
 
 class ORTBackend(Backend[ORTConfig]):
     NAME: str = "onnxruntime"
@@ -47,34 +61,74 @@ class ORTBackend(Backend[ORTConfig]):
         LOGGER.info("\t+ Creating backend temporary directory")
         self.tmpdir = TemporaryDirectory()
 
-        if self.config.no_weights:
-            LOGGER.info("\t+ Loading no weights ORTModel")
-            self.load_ortmodel_with_no_weights()
+        if self.config.artifacts_cache_dir is not None and (
+            self.config.export or self.is_optimized or self.is_quantized
+        ):
+            self.artifact_dir = get_artifact_dir(self.config.artifacts_cache_dir, self.config, ARTIFACT_EXCLUDED_FIELDS)
         else:
-            LOGGER.info("\t+ Loading pretrained ORTModel")
-            self.load_ortmodel_from_pretrained()
+            self.artifact_dir = None
+
+        if self.artifact_dir is not None and is_artifact_cached(self.artifact_dir):
+            LOGGER.info(f"\t+ Loading cached ORTModel from {self.artifact_dir}")
+            original_model, self.config.model = self.config.model, self.artifact_dir
+            original_export, self.config.export = self.config.export, False
+            with track_stage("load_weights"):
+                self.load_ortmodel_from_pretrained()
+            self.config.model, self.config.export = original_model, original_export
+        else:
+            self.load_and_process_ortmodel()
+
+        self.validate_provider()
+        self.tmpdir.cleanup()
+
+    def load_and_process_ortmodel(self) -> None:
+        # loading an ORTModel includes exporting it (if needed) and creating its inference sessions
+        with track_stage("export" if self.config.export else "load_weights"):
+            if self.config.no_weights:
+                LOGGER.info("\t+ Loading no weights ORTModel")
+                self.load_ortmodel_with_no_weights()
+            else:
+                LOGGER.info("\t+ Loading pretrained ORTModel")
+                self.load_ortmodel_from_pretrained()
+
+        if self.config.export:
+            record_artifact("export", self.pretrained_model.model_save_dir)
 
         if self.is_optimized or self.is_quantized:
             original_model, self.config.model = self.config.model, self.pretrained_model.model_save_dir
 
         if self.is_optimized:
             LOGGER.info("\t+ Applying ORT optimization")
-            self.optimize_onnx_files()
+            with track_stage("optimize"):
+                self.optimize_onnx_files()
+            record_artifact("optimize", self.optimized_model)
             self.config.model = self.optimized_model
 
         if self.is_quantized:
             LOGGER.info("\t+ Applying ORT quantization")
-            self.quantize_onnx_files()
+            with track_stage("quantize"):
+                self.quantize_onnx_files()
+            record_artifact("quantize", self.quantized_model)
             self.config.model = self.quantized_model
 
         if self.is_optimized or self.is_quantized:
             original_export, self.config.export = self.config.export, False
             LOGGER.info("\t+ Loading optimized/quantized ORTModel")
-            self.load_ortmodel_from_pretrained()
+            with track_stage("create_session"):
+                self.load_ortmodel_from_pretrained()
             self.config.model, self.config.export = original_model, original_export
 
-        self.validate_provider()
-        self.tmpdir.cleanup()
+        if self.artifact_dir is not None:
+            if self.is_quantized:
+                artifact = self.quantized_model
+            elif self.is_optimized:
+                artifact = self.optimized_model
+            else:
+                artifact = os.path.join(self.tmpdir.name, "exported_model")
+                LOGGER.info("\t+ Saving exported ORTModel")
+                self.pretrained_model.save_pretrained(artifact)
+
+            cache_artifact(artifact, self.artifact_dir, metadata={"model": self.config.model, "task": self.config.task})
 
     def validate_task(self) -> None:
         if self.config.task in TASKS_TO_ORTSD:
@@ -251,16 +305,17 @@ class ORTBackend(Backend[ORTConfig]):
 
             if self.is_calibrated:
                 LOGGER.info("\t+ Fitting calibration tensors range")
-                calibration_tensors_range = quantizer.fit(
-                    dataset=calibration_dataset,
-                    use_gpu=(self.config.device == "cuda"),
-                    calibration_config=calibration_config,
-                    operators_to_quantize=quantization_config.operators_to_quantize,
-                    # TODO: add support for these (maybe)
-                    use_external_data_format=False,
-                    force_symmetric_range=False,
-                    batch_size=1,
-                )
+                with track_stage("calibrate", samples=calibration_dataset.num_rows):
+                    calibration_tensors_range = quantizer.fit(
+                        dataset=calibration_dataset,
+                        use_gpu=(self.config.device == "cuda"),
+                        calibration_config=calibration_config,
+                        operators_to_quantize=quantization_config.operators_to_quantize,
+                        # TODO: add support for these (maybe)
+                        use_external_data_format=False,
+                        force_symmetric_range=False,
+                        batch_size=1,
+                    )
             else:
                 calibration_tensors_range = None
 
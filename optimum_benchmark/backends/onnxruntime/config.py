@@ -73,6 +73,9 @@ class ORTConfig(BackendConfig):
     calibration: bool = False
     calibration_config: Dict[str, Any] = field(default_factory=dict)
 
+    # exported/optimized/quantized models cache, shared by runs producing the same model
+    artifacts_cache_dir: Optional[str] = None
+
     def __post_init__(self):
         super().__post_init__()
 
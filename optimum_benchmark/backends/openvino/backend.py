@@ -16,7 +16,9 @@ from transformers.utils.logging import set_verbosity_error
 
 from ...generators.dataset_generator import DatasetGenerator
 from ...task_utils import TEXT_GENERATION_TASKS
+from ...trackers.stage import record_artifact, track_stage
 from ..base import Backend
+from ..cache_utils import cache_artifact, get_artifact_dir, is_artifact_cached
 from ..transformers_utils import random_init_weights
 from .config import OVConfig
 from .utils import TASKS_TO_OVMODEL
@@ -26,6 +28,18 @@ set_verbosity_error()
 
 LOGGER = getLogger("openvino")
 
+# options that only affect the compiled model, not the exported/quantized intermediate representation
+ARTIFACT_EXCLUDED_FIELDS = [
+    "artifacts_cache_dir",
+    "device",
+    "device_ids",
+    "openvino_config",
+    "half",
+    "reshape",
+    "inter_op_num_threads",
+    "intra_op_num_threads",
+]
+
 
 class OVBackend(Backend[OVConfig]):
     NAME: str = "openvino"
@@ -41,7 +55,20 @@ class OVBackend(Backend[OVConfig]):
         LOGGER.info("\t+ Creating backend temporary directory")
         self.tmpdir = TemporaryDirectory()
 
-        if self.config.quantization:
+        if self.config.artifacts_cache_dir is not None and (self.config.export or self.config.quantization):
+            self.artifact_dir = get_artifact_dir(self.config.artifacts_cache_dir, self.config, ARTIFACT_EXCLUDED_FIELDS)
+        else:
+            self.artifact_dir = None
+
+        if self.artifact_dir is not None and is_artifact_cached(self.artifact_dir):
+            LOGGER.info(f"\t+ Loading cached OVModel from {self.artifact_dir}")
+            original_model, self.config.model = self.config.model, self.artifact_dir
+            original_export, self.config.export = self.config.export, False
+            with track_stage("load_weights"):
+                self.load_ovmodel_from_pretrained()
+            self.config.model, self.config.export = original_model, original_export
+
+        elif self.config.quantization:
             if self.config.no_weights:
                 LOGGER.info("\t+ Loading no weights AutoModel")
                 self.load_automodel_with_no_weights()
@@ -50,7 +77,10 @@ class OVBackend(Backend[OVConfig]):
                 self.load_automodel_from_pretrained()
 
             LOGGER.info("\t+ Applying post-training quantization")
-            self.quantize_automodel()
+            # calibration happens within the quantizer and is accounted in the quantize stage
+            with track_stage("quantize"):
+                self.quantize_automodel()
+            record_artifact("quantize", self.quantized_model)
 
             original_model, self.config.model = self.config.model, self.quantized_model
             original_export, self.config.export = self.config.export, False
@@ -60,10 +90,25 @@ class OVBackend(Backend[OVConfig]):
 
         elif self.config.no_weights:
             LOGGER.info("\t+ Loading no weights OVModel")
-            self.load_ovmodel_with_no_weights()
+            with track_stage("export"):
+                self.load_ovmodel_with_no_weights()
+            record_artifact("export", self.pretrained_model.model_save_dir)
         else:
             LOGGER.info("\t+ Loading pretrained OVModel")
-            self.load_ovmodel_from_pretrained()
+            with track_stage("export" if self.config.export else "load_weights"):
+                self.load_ovmodel_from_pretrained()
+            if self.config.export:
+                record_artifact("export", self.pretrained_model.model_save_dir)
+
+        if self.artifact_dir is not None and not is_artifact_cached(self.artifact_dir):
+            if self.config.quantization:
+                artifact = self.quantized_model
+            else:
+                artifact = os.path.join(self.tmpdir.name, "exported_model")
+                LOGGER.info("\t+ Saving exported OVModel")
+                self.pretrained_model.save_pretrained(artifact)
+
+            cache_artifact(artifact, self.artifact_dir, metadata={"model": self.config.model, "task": self.config.task})
 
         self.tmpdir.cleanup()
 
@@ -187,7 +232,8 @@ class OVBackend(Backend[OVConfig]):
 
         if self.config.reshape or self.config.half:
             LOGGER.info("\t+ Compiling model")
-            self.pretrained_model.compile()
+            with track_stage("compile"):
+                self.pretrained_model.compile()
 
     def prepare_inputs(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         inputs = super().prepare_inputs(inputs)
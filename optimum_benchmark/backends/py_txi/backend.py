@@ -10,6 +10,7 @@ from safetensors.torch import save_file
 
 from ...task_utils import TEXT_EMBEDDING_TASKS, TEXT_GENERATION_TASKS
 from ..base import Backend
+from ..cache_utils import cache_artifact, get_no_weights_model_dir, is_artifact_cached
 from ..transformers_utils import random_init_weights
 from .config import PyTXIConfig
 
@@ -99,11 +100,25 @@ class PyTXIBackend(Backend[PyTXIConfig]):
             self.generation_config.save_pretrained(save_directory=self.no_weights_model)
 
     def load_model_with_no_weights(self) -> None:
-        LOGGER.info("\t+  Creating no weights model")
-        self.create_no_weights_model()
-
-        original_volumes, self.config.volumes = self.config.volumes, {self.tmpdir.name: {"bind": "/data", "mode": "rw"}}
-        original_model, self.config.model = self.config.model, "/data/no_weights_model"
+        if self.config.no_weights_cache_dir is not None:
+            no_weights_model_dir = get_no_weights_model_dir(
+                self.config.no_weights_cache_dir, self.pretrained_config, task=self.config.task
+            )
+            if is_artifact_cached(no_weights_model_dir):
+                LOGGER.info(f"\t+ Using cached no weights model from {no_weights_model_dir}")
+            else:
+                LOGGER.info("\t+  Creating no weights model")
+                self.create_no_weights_model()
+                cache_artifact(self.no_weights_model, no_weights_model_dir, metadata={"model": self.config.model})
+        else:
+            LOGGER.info("\t+  Creating no weights model")
+            self.create_no_weights_model()
+            no_weights_model_dir = self.no_weights_model
+
+        # the container reads the model from its /data volume
+        volume, model_folder = os.path.split(no_weights_model_dir)
+        original_volumes, self.config.volumes = self.config.volumes, {volume: {"bind": "/data", "mode": "rw"}}
+        original_model, self.config.model = self.config.model, f"/data/{model_folder}"
         LOGGER.info("\t+ Loading no weights model")
         self.load_model_from_pretrained()
         self.config.model, self.config.volumes = original_model, original_volumes
@@ -19,6 +19,8 @@ class PyTXIConfig(BackendConfig):
 
     # optimum benchmark specific
     no_weights: bool = False
+    # materialized random weights checkpoints, shared by runs with the same model config
+    no_weights_cache_dir: Optional[str] = None
 
     # Image to use for the container
     image: Optional[str] = None
@@ -1,11 +1,13 @@
 import gc
 import os
+import time
 from collections import OrderedDict
 from logging import getLogger
 from tempfile import TemporaryDirectory
 from typing import Any, Callable, Dict, List
 
 import torch
+from accelerate import init_empty_weights
 from datasets import Dataset
 from safetensors.torch import save_file
 from transformers import (
@@ -19,10 +21,18 @@ from transformers import (
 )
 
 from ...import_utils import is_deepspeed_available, is_torch_distributed_available, is_zentorch_available
+from ...trackers.stage import track_stage
 from ..base import Backend
+from ..cache_utils import cache_artifact, get_config_hash, get_no_weights_model_dir, is_artifact_cached
 from ..peft_utils import apply_peft
-from ..transformers_utils import random_init_weights
-from .config import PyTorchConfig
+from ..transformers_utils import (
+    assign_transformers_state_dict,
+    fast_random_init_weights,
+    get_transformers_safetensors_files,
+    load_transformers_state_dict,
+    random_init_weights,
+)
+from .config import STATE_DICT_LOAD_STRATEGIES, PyTorchConfig
 
 if is_deepspeed_available():
     from deepspeed import init_inference
@@ -78,10 +88,12 @@ class PyTorchBackend(Backend[PyTorchConfig]):
             raise ValueError("Diffusion pipelines and Timm models don't support no weights")
         elif self.config.no_weights:
             LOGGER.info("\t+ Loading model with random weights")
-            self.load_model_with_no_weights()
+            with track_stage("load_weights"):
+                self.load_model_with_no_weights()
         else:
             LOGGER.info("\t+ Loading model with pretrained weights")
-            self.load_model_from_pretrained()
+            with track_stage("load_weights"):
+                self.load_model_from_pretrained()
 
         if self.config.cache_implementation is not None:
             LOGGER.info(f"\t+ Setting cache implementation to {self.config.cache_implementation}")
@@ -98,24 +110,31 @@ class PyTorchBackend(Backend[PyTorchConfig]):
             self.pretrained_model.to_bettertransformer()
 
         # Torch compile
+        self.compile_cache_dir = None
         if self.config.torch_compile:
+            if self.config.torch_compile_cache_dir is not None:
+                LOGGER.info("\t+ Setting up compile cache directory")
+                self.set_compile_cache_dir()
+
             if self.config.device == "cuda" and torch.cuda.get_device_capability(0)[0] >= 8:
                 LOGGER.info("\t+ Setting float32_matmul_precision to high")
                 torch.set_float32_matmul_precision("high")
 
-            if self.config.library == "diffusers":
-                LOGGER.info("\t+ Using torch.compile to compile unet and vae")
-                self.pretrained_model.unet = torch.compile(
-                    self.pretrained_model.unet, **self.config.torch_compile_config
-                )
-                self.pretrained_model.vae.decode = torch.compile(
-                    self.pretrained_model.vae.decode, **self.config.torch_compile_config
-                )
-            else:
-                LOGGER.info("\t+ Using torch.compile on forward pass")
-                self.pretrained_model.forward = torch.compile(
-                    self.pretrained_model.forward, **self.config.torch_compile_config
-                )
+            # compilation is lazy, graphs are only compiled during the first calls
+            with track_stage("compile"):
+                if self.config.library == "diffusers":
+                    LOGGER.info("\t+ Using torch.compile to compile unet and vae")
+                    self.pretrained_model.unet = torch.compile(
+                        self.pretrained_model.unet, **self.config.torch_compile_config
+                    )
+                    self.pretrained_model.vae.decode = torch.compile(
+                        self.pretrained_model.vae.decode, **self.config.torch_compile_config
+                    )
+                else:
+                    LOGGER.info("\t+ Using torch.compile on forward pass")
+                    self.pretrained_model.forward = torch.compile(
+                        self.pretrained_model.forward, **self.config.torch_compile_config
+                    )
 
         if self.config.peft_type is not None:
             LOGGER.info("\t+ Applying PEFT")
@@ -123,6 +142,21 @@ class PyTorchBackend(Backend[PyTorchConfig]):
 
         self.tmpdir.cleanup()
 
+    def set_compile_cache_dir(self) -> None:
+        # the config includes the torch version, the cache directory itself doesn't change the compiled artifacts
+        config_hash = get_config_hash(self.config, exclude=["torch_compile_cache_dir"])
+        self.compile_cache_dir = os.path.abspath(os.path.join(self.config.torch_compile_cache_dir, config_hash))
+        LOGGER.info(f"\t+ Using {self.compile_cache_dir} as compile cache directory")
+
+        # inductor's fx graph and c++ codegen caches, as well as triton's kernels cache
+        os.environ["TORCHINDUCTOR_CACHE_DIR"] = self.compile_cache_dir
+        os.environ["TRITON_CACHE_DIR"] = os.path.join(self.compile_cache_dir, "triton")
+        os.environ["TORCHINDUCTOR_FX_GRAPH_CACHE"] = "1"
+        # in case inductor's config was already imported and read the environment
+        import torch._inductor.config
+
+        torch._inductor.config.fx_graph_cache = True
+
     def validate_library(self) -> None:
         if self.config.library == "timm":
             LOGGER.info(f"\t+ Using Timm method {self.automodel_class.__name__}")
@@ -139,7 +173,8 @@ class PyTorchBackend(Backend[PyTorchConfig]):
             self.pretrained_model = self.automodel_class(model_name=self.config.model)
             if self.config.device != "cpu":
                 LOGGER.info(f"\t+ Moving model to device: {self.config.device}")
-                self.pretrained_model.to(self.config.device)
+                with track_stage("move_to_device"):
+                    self.pretrained_model.to(self.config.device)
         elif self.config.library == "diffusers":
             LOGGER.info("\t+ Loading Diffusion pipeline")
             self.pretrained_model = self.automodel_class.from_pretrained(
@@ -151,7 +186,8 @@ class PyTorchBackend(Backend[PyTorchConfig]):
             )
             if self.config.device_map is None and self.config.device != "cpu":
                 LOGGER.info(f"\t+ Moving pipeline to device: {self.config.device}")
-                self.pretrained_model.to(self.config.device)
+                with track_stage("move_to_device"):
+                    self.pretrained_model.to(self.config.device)
         elif self.config.deepspeed_inference:
             if self.config.no_weights:
                 with torch.device("meta"):
@@ -196,6 +232,9 @@ class PyTorchBackend(Backend[PyTorchConfig]):
                 **self.config.hub_kwargs,
                 **self.automodel_kwargs,
             )
+        elif self.config.load_strategy in STATE_DICT_LOAD_STRATEGIES:
+            LOGGER.info(f"\t+ Loading model with {self.config.load_strategy} load strategy")
+            self.load_model_with_load_strategy()
         else:
             LOGGER.info(f"\t+ Loading model directly on device: {self.config.device}")
             with torch.device(self.config.device):
@@ -235,14 +274,114 @@ class PyTorchBackend(Backend[PyTorchConfig]):
             self.pretrained_config.save_pretrained(save_directory=self.no_weights_model)
 
     def load_model_with_no_weights(self) -> None:
-        LOGGER.info("\t+ Creating no weights model")
-        self.create_no_weights_model()
+        # quantized and deepspeed models are initialized differently and are not cached
+        if (
+            self.config.no_weights_cache_dir is not None
+            and not self.is_quantized
+            and not self.config.deepspeed_inference
+        ):
+            no_weights_model_dir = get_no_weights_model_dir(
+                self.config.no_weights_cache_dir,
+                self.pretrained_config,
+                automodel_class=self.automodel_class.__name__,
+                torch_dtype=self.config.torch_dtype,
+                seed=self.config.seed,
+                fast_init=self.config.no_weights_fast_init,
+            )
+        else:
+            no_weights_model_dir = None
 
-        with random_init_weights():
-            original_model, self.config.model = self.config.model, self.no_weights_model
-            LOGGER.info("\t+ Loading no weights AutoModel")
+        if no_weights_model_dir is not None and is_artifact_cached(no_weights_model_dir):
+            original_model, self.config.model = self.config.model, no_weights_model_dir
+            # safetensors checkpoints are memory-mapped, no random initialization is needed
+            LOGGER.info(f"\t+ Loading cached random weights AutoModel from {no_weights_model_dir}")
             self.load_model_from_pretrained()
             self.config.model = original_model
+            return
+
+        if self.config.no_weights_fast_init:
+            LOGGER.info("\t+ Loading no weights AutoModel with fast initialization")
+            self.load_model_with_fast_init()
+        else:
+            LOGGER.info("\t+ Creating no weights model")
+            self.create_no_weights_model()
+
+            with random_init_weights():
+                original_model, self.config.model = self.config.model, self.no_weights_model
+                LOGGER.info("\t+ Loading no weights AutoModel")
+                self.load_model_from_pretrained()
+                self.config.model = original_model
+
+        if no_weights_model_dir is not None:
+            LOGGER.info("\t+ Saving random weights model")
+            random_weights_model = os.path.join(self.tmpdir.name, "random_weights_model")
+            self.pretrained_model.save_pretrained(random_weights_model, safe_serialization=True)
+            cache_artifact(random_weights_model, no_weights_model_dir, metadata={"model": self.config.model})
+
+    def load_model_with_load_strategy(self) -> None:
+        LOGGER.info("\t+ Creating model on meta device")
+        self.create_meta_model()
+
+        LOGGER.info("\t+ Resolving safetensors checkpoint files")
+        files = get_transformers_safetensors_files(self.config.model, **self.config.hub_kwargs)
+
+        LOGGER.info(f"\t+ Reading {len(files)} checkpoint file(s)")
+        with track_stage("read_weights"):
+            state_dict = load_transformers_state_dict(
+                files, strategy=self.config.load_strategy, num_threads=self.config.load_threads
+            )
+
+        LOGGER.info("\t+ Assigning checkpoint tensors to model")
+        with track_stage("assign_weights"):
+            assign_transformers_state_dict(self.pretrained_model, state_dict)
+
+        # weights keep the checkpoint's dtype unless another one is requested (which copies memory-mapped weights)
+        if self.config.torch_dtype is not None and self.config.torch_dtype != "auto":
+            LOGGER.info(f"\t+ Casting model to {self.config.torch_dtype}")
+            self.pretrained_model.to(getattr(torch, self.config.torch_dtype))
+
+        if self.config.device != "cpu":
+            LOGGER.info(f"\t+ Moving model to device: {self.config.device}")
+            with track_stage("move_to_device"):
+                self.pretrained_model.to(self.config.device)
+
+        if self.generation_config is not None and getattr(self.pretrained_model, "generation_config", None) is not None:
+            self.pretrained_model.generation_config = self.generation_config
+
+    def create_meta_model(self) -> None:
+        from_config_kwargs = {}
+        if self.config.torch_dtype == "auto":
+            from_config_kwargs["torch_dtype"] = getattr(self.pretrained_config, "torch_dtype", None) or torch.float32
+        elif self.config.torch_dtype is not None:
+            from_config_kwargs["torch_dtype"] = getattr(torch, self.config.torch_dtype)
+        if self.config.attn_implementation is not None:
+            from_config_kwargs["attn_implementation"] = self.config.attn_implementation
+
+        # buffers (e.g. rotary frequencies) are computed at construction and are kept on cpu
+        with init_empty_weights(include_buffers=False):
+            self.pretrained_model = self.automodel_class.from_config(self.pretrained_config, **from_config_kwargs)
+
+    def load_model_with_fast_init(self) -> None:
+        LOGGER.info("\t+ Creating model on meta device")
+        self.create_meta_model()
+
+        buffers = dict(self.pretrained_model.named_buffers())
+        LOGGER.info(f"\t+ Materializing model on device: {self.config.device}")
+        with track_stage("move_to_device"):
+            self.pretrained_model.to_empty(device=self.config.device)
+            for name, buffer in self.pretrained_model.named_buffers():
+                buffer.copy_(buffers[name])
+
+        LOGGER.info("\t+ Tying model weights")
+        self.pretrained_model.tie_weights()
+
+        LOGGER.info("\t+ Filling model weights with random values")
+        start = time.perf_counter()
+        with track_stage("init_weights"):
+            fast_random_init_weights(
+                self.pretrained_model, seed=self.config.seed, num_threads=self.config.no_weights_init_threads
+            )
+        LOGGER.info(f"\t+ Filled model weights in {time.perf_counter() - start:.2f}s")
 
     def process_quantization_config(self) -> None:
         if self.is_gptq_quantized:
@@ -318,6 +457,9 @@ class PyTorchBackend(Backend[PyTorchConfig]):
         if self.config.low_cpu_mem_usage is not None:
             kwargs["low_cpu_mem_usage"] = self.config.low_cpu_mem_usage
 
+        if self.config.load_strategy == "low_cpu_mem_usage":
+            kwargs["low_cpu_mem_usage"] = True
+
         if self.config.no_weights:
             # we use our own context manager to load the model with random weights
             kwargs["_fast_init"] = False
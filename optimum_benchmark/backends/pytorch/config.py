@@ -8,6 +8,9 @@ from ..config import BackendConfig
 DEVICE_MAPS = ["auto", "sequential"]
 AMP_DTYPES = ["bfloat16", "float16"]
 TORCH_DTYPES = ["bfloat16", "float16", "float32", "auto"]
+# low_cpu_mem_usage goes through from_pretrained, the others read the safetensors checkpoint into a meta device model
+LOAD_STRATEGIES = ["low_cpu_mem_usage", "mmap", "meta", "parallel"]
+STATE_DICT_LOAD_STRATEGIES = ["mmap", "meta", "parallel"]
 
 QUANTIZATION_CONFIGS = {"bnb": {"llm_int8_threshold": 0.0}, "gptq": {}, "awq": {}}
 
@@ -20,8 +23,16 @@ class PyTorchConfig(BackendConfig):
 
     # load options
     no_weights: bool = False
+    # materialized random weights checkpoints, shared by runs with the same model config and dtype
+    no_weights_cache_dir: Optional[str] = None
+    # meta device construction and parallel random fill, instead of initializing each module
+    no_weights_fast_init: bool = False
+    no_weights_init_threads: Optional[int] = None
     device_map: Optional[str] = None
     torch_dtype: Optional[str] = None
+    # how pretrained weights are loaded, compared with the build benchmark
+    load_strategy: Optional[str] = None
+    load_threads: Optional[int] = None
 
     # automatic mixed precision options
     amp_autocast: bool = False
@@ -37,6 +48,8 @@ class PyTorchConfig(BackendConfig):
     # compilation options
     torch_compile: bool = False
     torch_compile_config: Dict[str, Any] = field(default_factory=dict)
+    # persistent inductor/triton caches, shared by runs with the same model, config and torch version
+    torch_compile_cache_dir: Optional[str] = None
 
     # quantization options
     quantization_scheme: Optional[str] = None
@@ -62,6 +75,41 @@ class PyTorchConfig(BackendConfig):
         if self.amp_dtype is not None and self.amp_dtype not in AMP_DTYPES:
             raise ValueError(f"`amp_dtype` must be one of {AMP_DTYPES}. Got {self.amp_dtype} instead.")
 
+        if self.load_strategy is not None and self.load_strategy not in LOAD_STRATEGIES:
+            raise ValueError(f"`load_strategy` must be one of {LOAD_STRATEGIES}. Got {self.load_strategy} instead.")
+
+        if self.load_strategy == "low_cpu_mem_usage" and self.low_cpu_mem_usage is False:
+            raise ValueError("`load_strategy=low_cpu_mem_usage` is not compatible with `low_cpu_mem_usage=False`.")
+
+        if self.load_strategy in STATE_DICT_LOAD_STRATEGIES:
+            if self.library != "transformers":
+                raise ValueError(f"`load_strategy={self.load_strategy}` is only supported for transformers models.")
+
+            if (
+                self.no_weights
+                or self.quantization_scheme is not None
+                or self.deepspeed_inference
+                or self.device_map is not None
+            ):
+                raise ValueError(
+                    f"`load_strategy={self.load_strategy}` is not compatible with no weights, quantization, "
+                    "deepspeed inference or device maps."
+                )
+
+        if self.no_weights_fast_init:
+            if not self.no_weights:
+                raise ValueError("`no_weights_fast_init` requires `no_weights` to be True.")
+
+            if self.library != "transformers":
+                raise ValueError(
+                    f"`no_weights_fast_init` is only supported for transformers models, got {self.library}."
+                )
+
+            if self.quantization_scheme is not None or self.deepspeed_inference or self.device_map is not None:
+                raise ValueError(
+                    "`no_weights_fast_init` is not compatible with quantization, deepspeed inference or device maps."
+                )
+
         if self.quantization_scheme is not None:
             if self.quantization_scheme not in QUANTIZATION_CONFIGS:
                 raise ValueError(
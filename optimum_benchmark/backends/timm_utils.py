@@ -1,13 +1,27 @@
+import json
+import os
 from typing import Any, Dict
 
 from transformers import PretrainedConfig
 
 from ..import_utils import is_timm_available
+from ..metadata_cache import METADATA_CACHE_VALUE_FILE, cached_metadata
 
 if is_timm_available():
     import timm  # type: ignore
 
 
+def save_timm_pretrained_config(config: PretrainedConfig, path: str) -> None:
+    with open(os.path.join(path, METADATA_CACHE_VALUE_FILE), "w") as f:
+        json.dump(config.to_dict(remove_source=False), f)
+
+
+def load_timm_pretrained_config(path: str) -> PretrainedConfig:
+    with open(os.path.join(path, METADATA_CACHE_VALUE_FILE), "r") as f:
+        return timm.models.PretrainedCfg(**json.load(f))
+
+
+@cached_metadata("timm_config", save=save_timm_pretrained_config, load=load_timm_pretrained_config)
 def get_timm_pretrained_config(model_name: str) -> PretrainedConfig:
     model_source, model_name = timm.models.parse_model_name(model_name)
     if model_source == "hf-hub":
@@ -1,8 +1,13 @@
+import json
 import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 import torch
+from huggingface_hub import snapshot_download
+from safetensors.torch import load_file
 from transformers import (
     AutoConfig,
     AutoProcessor,
@@ -15,6 +20,8 @@ from transformers import (
     ProcessorMixin,
 )
 
+from ..metadata_cache import cached_metadata, save_pretrained
+
 PretrainedProcessor = Union[FeatureExtractionMixin, ImageProcessingMixin, PreTrainedTokenizer, ProcessorMixin]
 
 
@@ -22,15 +29,31 @@ def get_transformers_cache_dir() -> str:
     return os.path.expanduser("~/.cache/huggingface/hub")
 
 
+@cached_metadata("transformers_config", save=save_pretrained, load=AutoConfig.from_pretrained)
 def get_transformers_pretrained_config(model: str, **kwargs) -> "PretrainedConfig":
     # sometimes contains information about the model's input shapes that are not available in the config
     return AutoConfig.from_pretrained(model, **kwargs)
 
 
+@cached_metadata("generation_config", save=save_pretrained, load=GenerationConfig.from_pretrained)
+def load_transformers_generation_config(model: str, **kwargs) -> "GenerationConfig":
+    return GenerationConfig.from_pretrained(model, **kwargs)
+
+
+@cached_metadata("processor", save=save_pretrained, load=AutoProcessor.from_pretrained)
+def load_transformers_processor(model: str, **kwargs) -> "PretrainedProcessor":
+    return AutoProcessor.from_pretrained(model, **kwargs)
+
+
+@cached_metadata("tokenizer", save=save_pretrained, load=AutoTokenizer.from_pretrained)
+def load_transformers_tokenizer(model: str, **kwargs) -> "PreTrainedTokenizer":
+    return AutoTokenizer.from_pretrained(model, **kwargs)
+
+
 def get_transformers_generation_config(model: str, **kwargs) -> Optional["GenerationConfig"]:
     try:
         # sometimes contains information about the model's input shapes that are not available in the config
-        return GenerationConfig.from_pretrained(model, **kwargs)
+        return load_transformers_generation_config(model, **kwargs)
     except Exception:
         return GenerationConfig()
 
@@ -38,10 +61,10 @@ def get_transformers_generation_config(model: str, **kwargs) -> Optional["Genera
 def get_transformers_pretrained_processor(model: str, **kwargs) -> Optional["PretrainedProcessor"]:
     try:
         # sometimes contains information about the model's input shapes that are not available in the config
-        return AutoProcessor.from_pretrained(model, **kwargs)
+        return load_transformers_processor(model, **kwargs)
     except Exception:
         try:
-            return AutoTokenizer.from_pretrained(model, **kwargs)
+            return load_transformers_tokenizer(model, **kwargs)
         except Exception:
             return None
 
@@ -153,3 +176,147 @@ def random_init_weights():
         for name, init_func in TORCH_INIT_FUNCTIONS.items():
             if name != "uniform_":
                 setattr(torch.nn.init, name, init_func)
+
+
+# number of elements filled by each task of the parallel random initialization
+FAST_INIT_CHUNK_SIZE = 2**24
+
+
+def fast_random_init_weights(model: torch.nn.Module, seed: int = 0, num_threads: Optional[int] = None) -> None:
+    """
+    Fills the parameters of a materialized (e.g. with `to_empty`) model with small uniform values, in chunks processed
+    by a thread pool. Each chunk has its own seeded generator, which makes the values deterministic and avoids
+    contention on the global generator. The values are not a proper initialization, only non-degenerate ones.
+    """
+
+    chunks = []
+    data_ptrs = set()
+    for parameter in model.parameters():
+        # tied parameters are only filled once
+        if parameter.data_ptr() in data_ptrs:
+            continue
+
+        data_ptrs.add(parameter.data_ptr())
+        chunks.extend(parameter.data.view(-1).split(FAST_INIT_CHUNK_SIZE))
+
+    def fill(index: int, chunk: torch.Tensor) -> None:
+        generator = torch.Generator(device=chunk.device).manual_seed(seed + index)
+        chunk.uniform_(-0.02, 0.02, generator=generator)
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        list(executor.map(fill, range(len(chunks)), chunks))
+
+
+SAFETENSORS_INDEX_FILE = "model.safetensors.index.json"
+SAFETENSORS_FILE = "model.safetensors"
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def get_transformers_safetensors_files(model: str, **kwargs) -> List[str]:
+    if os.path.isdir(model):
+        model_dir = model
+    else:
+        hub_kwargs = {key: kwargs[key] for key in ["revision", "cache_dir", "force_download", "token"] if key in kwargs}
+        model_dir = snapshot_download(model, allow_patterns=["*.safetensors", SAFETENSORS_INDEX_FILE], **hub_kwargs)
+
+    if os.path.isfile(os.path.join(model_dir, SAFETENSORS_INDEX_FILE)):
+        with open(os.path.join(model_dir, SAFETENSORS_INDEX_FILE), "r") as f:
+            shards = sorted(set(json.load(f)["weight_map"].values()))
+        return [os.path.join(model_dir, shard) for shard in shards]
+    elif os.path.isfile(os.path.join(model_dir, SAFETENSORS_FILE)):
+        return [os.path.join(model_dir, SAFETENSORS_FILE)]
+    else:
+        raise ValueError(f"Model {model} doesn't have a safetensors checkpoint")
+
+
+def mmap_safetensors_file(path: str) -> Dict[str, torch.Tensor]:
+    """
+    Loads a safetensors file without copying it: tensors are views of a private memory map of the file, whose pages
+    are only read when first accessed and are shared with the page cache until written to.
+    """
+
+    with open(path, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+
+    data_offset = 8 + header_size
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=os.path.getsize(path))
+
+    state_dict = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        itemsize = torch.empty(0, dtype=dtype).element_size()
+
+        if (data_offset + start) % itemsize == 0:
+            tensor = torch.empty(0, dtype=dtype).set_(storage, (data_offset + start) // itemsize, info["shape"])
+        else:
+            # misaligned tensors can't be viewed in place
+            tensor = torch.empty(0, dtype=torch.uint8).set_(storage, data_offset + start, (end - start,))
+            tensor = tensor.clone().view(dtype).view(info["shape"])
+
+        state_dict[name] = tensor
+
+    return state_dict
+
+
+def load_transformers_state_dict(
+    files: List[str], strategy: str, num_threads: Optional[int] = None
+) -> Dict[str, torch.Tensor]:
+    """
+    Reads a (sharded) safetensors checkpoint with one of the strategies compared by the load benchmark: zero-copy
+    memory maps (`mmap`), sequential reads of the shards (`meta`) or reads of the shards by a thread pool (`parallel`).
+    """
+
+    if strategy == "mmap":
+        read_file = mmap_safetensors_file
+    elif strategy in ["meta", "parallel"]:
+        read_file = load_file
+    else:
+        raise ValueError(f"Unknown load strategy {strategy}")
+
+    if strategy == "parallel":
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            shards = list(executor.map(read_file, files))
+    else:
+        shards = [read_file(file) for file in files]
+
+    return {name: tensor for shard in shards for name, tensor in shard.items()}
+
+
+def assign_transformers_state_dict(model: torch.nn.Module, state_dict: Dict[str, torch.Tensor]) -> None:
+    """
+    Assigns the tensors of a checkpoint to the parameters and buffers of a model created on the meta device, without
+    copying them, then ties its weights (e.g. the language modeling head to the input embeddings).
+    """
+
+    prefix = getattr(model, "base_model_prefix", "")
+    model_keys = set(model.state_dict().keys())
+
+    # checkpoints saved from a model with a head loaded without it, and the other way around
+    if prefix and len(model_keys & state_dict.keys()) == 0:
+        if all(name.startswith(f"{prefix}.") for name in state_dict):
+            state_dict = {name[len(prefix) + 1 :]: tensor for name, tensor in state_dict.items()}
+        else:
+            state_dict = {f"{prefix}.{name}": tensor for name, tensor in state_dict.items()}
+
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+
+    missing_weights = [name for name, parameter in model.named_parameters() if parameter.device.type == "meta"]
+    if len(missing_weights) > 0:
+        raise ValueError(f"Some weights are missing from the checkpoint: {missing_weights}")
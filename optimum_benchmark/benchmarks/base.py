@@ -1,8 +1,11 @@
 from abc import ABC
 from logging import getLogger
-from typing import ClassVar, Generic
+from typing import ClassVar, Generic, Type
+
+from hydra.utils import get_class
 
 from ..backends.base import Backend
+from ..backends.config import BackendConfig
 from .config import BenchmarkConfigT
 from .report import BenchmarkReport
 
@@ -16,6 +19,10 @@ class Benchmark(Generic[BenchmarkConfigT], ABC):
         LOGGER.info(f"Allocating {self.NAME} benchmark")
         self.config = config
 
+    def allocate_backend(self, backend_config: BackendConfig) -> Backend:
+        backend_factory: Type[Backend] = get_class(backend_config._target_)
+        return backend_factory(backend_config)
+
     def run(self, backend: Backend) -> None:
         raise NotImplementedError("Benchmark must implement run method")
 
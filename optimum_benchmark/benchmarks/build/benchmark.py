@@ -0,0 +1,47 @@
+from logging import getLogger
+
+from ...backends.base import Backend, BackendConfigT
+from ...backends.config import BackendConfig
+from ...trackers.stage import StageTracker
+from ..base import Benchmark
+from ..report import BenchmarkReport
+from ..startup.benchmark import get_stages_report
+from .config import BuildConfig
+
+LOGGER = getLogger("build")
+
+
+class BuildBenchmark(Benchmark[BuildConfig]):
+    """
+    Measures the cost of building a backend's model artifact step by step (e.g. export, optimization, calibration and
+    quantization): wall time, peak memory and size on disk of each step's artifact, as well as the time per sample of
+    the steps that process samples (e.g. calibration for static quantization).
+    """
+
+    NAME = "build"
+
+    def __init__(self, config: BuildConfig) -> None:
+        super().__init__(config)
+
+    def allocate_backend(self, backend_config: BackendConfig) -> Backend:
+        LOGGER.info("\t+ Creating stage tracker")
+        self.stage_tracker = StageTracker(
+            device=backend_config.device,
+            backend=backend_config.name,
+            device_ids=backend_config.device_ids,
+            memory=self.config.memory,
+        )
+
+        with self.stage_tracker.activate():
+            backend = super().allocate_backend(backend_config)
+
+        return backend
+
+    def run(self, backend: Backend[BackendConfigT]) -> None:
+        stages = self.stage_tracker.get_stages()
+        LOGGER.info(f"\t+ Reporting build steps: {stages}")
+        self.report = get_stages_report(self.stage_tracker, stages, extra_targets=[])
+        self.report.log()
+
+    def get_report(self) -> BenchmarkReport:
+        return self.report
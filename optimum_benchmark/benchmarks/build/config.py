@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import ClassVar
+
+from ..config import BenchmarkConfig
+
+LOGGER = getLogger("build")
+
+
+@dataclass
+class BuildConfig(BenchmarkConfig):
+    name: str = "build"
+    _target_: str = "optimum_benchmark.benchmarks.build.benchmark.BuildBenchmark"
+
+    # measures the backend allocation
+    backend_reusable: ClassVar[bool] = False
+
+    # tracking options
+    memory: bool = field(default=True, metadata={"help": "Measure the max memory usage of each build step"})
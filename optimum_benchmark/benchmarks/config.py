@@ -1,7 +1,7 @@
 from abc import ABC
 from dataclasses import dataclass
 from logging import getLogger
-from typing import TypeVar
+from typing import ClassVar, TypeVar
 
 LOGGER = getLogger("benchmark")
 
@@ -11,6 +11,9 @@ class BenchmarkConfig(ABC):
     name: str
     _target_: str
 
+    # whether the benchmark can run on a backend already used by other benchmarks (batched experiments)
+    backend_reusable: ClassVar[bool] = True
+
     def __post_init__(self):
         pass
 
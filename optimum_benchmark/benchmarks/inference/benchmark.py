@@ -1,16 +1,26 @@
 import time
+from contextlib import ExitStack, contextmanager, nullcontext
 from dataclasses import dataclass
 from logging import getLogger
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from transformers import LogitsProcessorList
 
 from ...backends.base import Backend, BackendConfigT
 from ...generators.input_generator import InputGenerator
+from ...heartbeat_utils import heartbeat
 from ...import_utils import is_torch_distributed_available
 from ...task_utils import IMAGE_DIFFUSION_TASKS, TEXT_GENERATION_TASKS
-from ...trackers.energy import Efficiency, EnergyTracker
-from ...trackers.latency import LatencyTracker, PerTokenLatencyLogitsProcessor, Throughput
-from ...trackers.memory import MemoryTracker
+from ...trackers.compile import CompileTracker
+from ...trackers.energy import ENERGY_UNIT, Efficiency, Energy, EnergyDistribution, EnergyTracker, Power
+from ...trackers.latency import (
+    LATENCY_UNIT,
+    LatencyTracker,
+    PerTokenLatencyLogitsProcessor,
+    Throughput,
+    TrackingOverhead,
+)
+from ...trackers.memory import MemoryTracker, get_tensors_memory
 from ..base import Benchmark
 from ..report import BenchmarkMeasurements, BenchmarkReport
 from .config import InferenceConfig
@@ -22,6 +32,9 @@ LOGGER = getLogger("inference")
 
 PER_TOKEN_BACKENDS = ["pytorch", "onnxruntime", "openvino", "neural-compressor"]
 
+# polling interval (in seconds) of the memory monitors in combined mode, where they run alongside the timed loop
+COMBINED_MEMORY_INTERVAL = 0.01
+
 TEXT_GENERATION_DEFAULT_KWARGS = {
     "num_return_sequences": 1,
     "max_new_tokens": 100,
@@ -125,6 +138,12 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             LOGGER.info("\t+ Initializing Inference report")
             self.report = InferenceReport(forward=BenchmarkMeasurements())
 
+        if self.config.memory_breakdown:
+            LOGGER.info("\t+ Measuring model weights memory")
+            # diffusion pipelines hold their models in components
+            model = getattr(backend, "pretrained_model", None)
+            self.weights_memory = get_tensors_memory(getattr(model, "components", model))
+
         LOGGER.info("\t+ Preparing backend for Inference")
         backend.prepare_for_inference(
             **backend.model_shapes,
@@ -134,21 +153,56 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             **self.config.call_kwargs,
         )
 
+        # cache hits and time saved are always reported when using a persistent compile cache
+        compile_cache_dir = getattr(backend, "compile_cache_dir", None)
+        if self.config.compilation or compile_cache_dir is not None:
+            if not getattr(backend.config, "torch_compile", False):
+                LOGGER.warning("\t+ Tracking compilation of a backend that doesn't use torch.compile")
+            LOGGER.info("\t+ Creating compile tracker")
+            self.compile_tracker = CompileTracker(cache_dir=compile_cache_dir)
+        else:
+            self.compile_tracker = None
+
         LOGGER.info("\t+ Warming up backend for Inference")
-        for _ in range(self.config.warmup_runs):
+        heartbeat("warmup")
+        with self.track_compilation("warmup"):
+            for _ in range(self.config.warmup_runs):
+                heartbeat()
+                with self.track_compilation_iteration():
+                    if backend.config.task in TEXT_GENERATION_TASKS:
+                        _ = backend.generate(
+                            self.inputs, {**self.config.generate_kwargs, **TEXT_GENERATION_WARMUP_OVERRIDES}
+                        )
+                    elif backend.config.task in IMAGE_DIFFUSION_TASKS:
+                        _ = backend.call(self.inputs, {**self.config.call_kwargs, **IMAGE_DIFFUSION_WARMUP_OVERRIDES})
+                    else:
+                        _ = backend.forward(self.inputs, self.config.forward_kwargs)
+
+            if backend.config.task in TEXT_GENERATION_TASKS:
+                LOGGER.info("\t+ Additional warmup for Text Generation")
+                with self.track_compilation_iteration():
+                    _ = backend.generate(self.inputs, self.config.generate_kwargs)
+            elif backend.config.task in IMAGE_DIFFUSION_TASKS:
+                LOGGER.info("\t+ Additional warmup for Image Diffusion")
+                with self.track_compilation_iteration():
+                    _ = backend.call(self.inputs, self.config.call_kwargs)
+
+        if self.compile_tracker is not None:
+            for target in self.report.to_dict().keys():
+                getattr(self.report, target).warmup_compilation = self.compile_tracker.get_compilation("warmup")
+
+        heartbeat("measure")
+
+        if self.config.combined:
             if backend.config.task in TEXT_GENERATION_TASKS:
-                _ = backend.generate(self.inputs, {**self.config.generate_kwargs, **TEXT_GENERATION_WARMUP_OVERRIDES})
+                self.run_text_generation_combined_tracking(backend)
             elif backend.config.task in IMAGE_DIFFUSION_TASKS:
-                _ = backend.call(self.inputs, {**self.config.call_kwargs, **IMAGE_DIFFUSION_WARMUP_OVERRIDES})
+                self.run_image_diffusion_combined_tracking(backend)
             else:
-                _ = backend.forward(self.inputs, self.config.forward_kwargs)
+                self.run_inference_combined_tracking(backend)
 
-        if backend.config.task in TEXT_GENERATION_TASKS:
-            LOGGER.info("\t+ Additional warmup for Text Generation")
-            _ = backend.generate(self.inputs, self.config.generate_kwargs)
-        elif backend.config.task in IMAGE_DIFFUSION_TASKS:
-            LOGGER.info("\t+ Additional warmup for Image Diffusion")
-            _ = backend.call(self.inputs, self.config.call_kwargs)
+            self.report.log()
+            return
 
         if self.config.memory:
             if backend.config.task in TEXT_GENERATION_TASKS:
@@ -185,6 +239,228 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             self.report.log_energy()
             self.report.log_efficiency()
 
+    ## Combined tracking
+    def run_combined_tracking(
+        self,
+        backend: Backend[BackendConfigT],
+        method: Callable,
+        kwargs: Dict[str, Any],
+        file_prefix: str,
+        energy_tracker: Optional[EnergyTracker] = None,
+        phase_tracker: Optional[PerTokenLatencyLogitsProcessor] = None,
+    ) -> Tuple[BenchmarkMeasurements, List[Energy], Any]:
+        """
+        Runs a single timed loop of the given backend method under all enabled trackers and returns the per-iteration
+        measurements, the per-iteration energies (if attributed) and the outputs of the last iteration. The energy
+        tracker (and its idle baseline) is shared by the loops of a benchmark. A phase tracker, if given, also records
+        the prefill and decode phases of each generation.
+        """
+
+        latency_tracker = LatencyTracker(backend=backend.config.name, device=backend.config.device)
+        memory_tracker = (
+            MemoryTracker(
+                backend=backend.config.name,
+                device=backend.config.device,
+                device_ids=backend.config.device_ids,
+                interval=COMBINED_MEMORY_INTERVAL,
+            )
+            if self.config.memory
+            else None
+        )
+
+        tracked_kwargs = kwargs
+        if phase_tracker is not None:
+            tracked_kwargs = {**kwargs, "logits_processor": LogitsProcessorList([phase_tracker])}
+
+        with ExitStack() as stack:
+            if memory_tracker is not None:
+                stack.enter_context(memory_tracker.track())
+            if energy_tracker is not None:
+                stack.enter_context(energy_tracker.track(file_prefix=file_prefix))
+
+            with self.track_compilation(file_prefix):
+                while (
+                    latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations
+                ):
+                    # release the previous outputs so that they don't count towards the peak memory
+                    outputs = None
+                    with (
+                        latency_tracker.track(),
+                        self.track_iteration(phase_tracker),
+                        self.track_compilation_iteration(),
+                    ):
+                        outputs = method(self.inputs, tracked_kwargs)
+
+        count = latency_tracker.count()
+        measurements = BenchmarkMeasurements(latency=latency_tracker.get_latency())
+        energies = []
+
+        if self.compile_tracker is not None:
+            measurements.compilation = self.compile_tracker.get_compilation(file_prefix)
+
+        if memory_tracker is not None:
+            measurements.memory = memory_tracker.get_max_memory()
+
+            if self.config.memory_breakdown:
+                measurements.memory_breakdown = memory_tracker.get_memory_breakdown(
+                    weights_memory=self.weights_memory,
+                    kv_cache_memory=get_tensors_memory(getattr(outputs, "past_key_values", None)),
+                )
+
+        if energy_tracker is not None:
+            measurements.energy = energy_tracker.get_energy() / count
+
+            if energy_tracker.get_idle_power() is not None:
+                measurements.idle_power = energy_tracker.get_idle_power()
+                measurements.net_energy = energy_tracker.get_net_energy() / count
+
+            if energy_tracker.source == "rapl":
+                measurements.power_timeline = energy_tracker.get_power_timeline()
+
+            if self.config.energy_per_iteration:
+                intervals = latency_tracker.get_intervals()
+                energies = energy_tracker.get_intervals_energy(intervals)
+                measurements.energy_distribution = EnergyDistribution.from_values(
+                    [energy.total for energy in energies], unit=ENERGY_UNIT
+                )
+                measurements.power = Power.from_energies(energies, measurements.latency.values)
+
+        if (memory_tracker is not None or energy_tracker is not None) and self.config.combined_overhead_runs > 0:
+            LOGGER.info("\t+ Measuring the overhead of memory and energy tracking")
+            latency_tracker.reset()
+            while latency_tracker.count() < self.config.combined_overhead_runs:
+                with latency_tracker.track():
+                    _ = method(self.inputs, kwargs)
+
+            measurements.tracking_overhead = TrackingOverhead.from_latencies(
+                tracked=measurements.latency.mean, untracked=latency_tracker.get_latency().mean, unit=LATENCY_UNIT
+            )
+
+        return measurements, energies, outputs
+
+    def set_combined_measurements(
+        self,
+        target: str,
+        measurements: BenchmarkMeasurements,
+        volume: int,
+        throughput_unit: str,
+        efficiency_unit: str,
+    ) -> None:
+        if self.config.latency:
+            measurements.throughput = Throughput.from_latency(measurements.latency, volume, unit=throughput_unit)
+        else:
+            measurements.latency = None
+
+        if measurements.energy is not None:
+            measurements.efficiency = Efficiency.from_energy(measurements.energy, volume, unit=efficiency_unit)
+
+        if measurements.net_energy is not None:
+            measurements.net_efficiency = Efficiency.from_energy(measurements.net_energy, volume, unit=efficiency_unit)
+
+        setattr(self.report, target, measurements)
+
+    def run_text_generation_combined_tracking(self, backend: Backend[BackendConfigT]):
+        LOGGER.info("\t+ Running Text Generation combined tracking")
+        prefill_kwargs = {**self.config.generate_kwargs, **TEXT_GENERATION_PREFILL_OVERRIDES}
+        generate_kwargs = self.config.generate_kwargs
+
+        if self.config.memory_breakdown:
+            # to get the cache object used during generation
+            prefill_kwargs = {**prefill_kwargs, "return_dict_in_generate": True}
+            generate_kwargs = {**generate_kwargs, "return_dict_in_generate": True}
+
+        energy_tracker = self.create_energy_tracker(backend) if self.config.energy else None
+        phase_tracker = self.create_phase_tracker(backend) if self.config.energy else None
+
+        prefill, prefill_energies, _ = self.run_combined_tracking(
+            backend, backend.prefill, prefill_kwargs, file_prefix="prefill", energy_tracker=energy_tracker
+        )
+        generate, generate_energies, _ = self.run_combined_tracking(
+            backend,
+            backend.generate,
+            generate_kwargs,
+            file_prefix="generate",
+            energy_tracker=energy_tracker,
+            phase_tracker=phase_tracker,
+        )
+
+        # decode is derived from the generate loop minus the average prefill
+        decode = BenchmarkMeasurements(
+            memory=generate.memory,
+            memory_breakdown=generate.memory_breakdown,
+            latency=generate.latency - prefill.latency,
+            idle_power=generate.idle_power,
+            tracking_overhead=generate.tracking_overhead,
+            compilation=generate.compilation,
+        )
+
+        if generate.energy is not None:
+            decode.energy = generate.energy - prefill.energy
+
+        if generate.net_energy is not None:
+            decode.net_energy = generate.net_energy - prefill.net_energy
+
+        if phase_tracker is not None:
+            # the energy tracker still holds the samples of the generate loop
+            decode_energies, decode_durations = self.get_decode_energy(energy_tracker, phase_tracker)
+            decode.power_timeline = energy_tracker.get_power_timeline(phase_tracker.get_decode_intervals())
+
+            if self.config.energy_per_iteration:
+                decode.energy_distribution = EnergyDistribution.from_values(
+                    [energy.total for energy in decode_energies], unit=ENERGY_UNIT
+                )
+                decode.power = Power.from_energies(decode_energies, decode_durations)
+        elif self.config.energy_per_iteration and generate.energy is not None:
+            mean_prefill_energy = Energy.aggregate(prefill_energies)
+            decode_energies = [energy - mean_prefill_energy for energy in generate_energies]
+            decode.energy_distribution = generate.energy_distribution - prefill.energy_distribution
+            decode.power = Power.from_energies(decode_energies, decode.latency.values)
+
+        self.set_combined_measurements(
+            "prefill",
+            prefill,
+            self.atomic_prefill_volume,
+            throughput_unit=TEXT_GENERATION_THROUGHPUT_UNIT,
+            efficiency_unit=TEXT_GENERATION_EFFICIENCY_UNIT,
+        )
+        self.set_combined_measurements(
+            "decode",
+            decode,
+            self.atomic_decode_volume,
+            throughput_unit=TEXT_GENERATION_THROUGHPUT_UNIT,
+            efficiency_unit=TEXT_GENERATION_EFFICIENCY_UNIT,
+        )
+
+    def run_image_diffusion_combined_tracking(self, backend: Backend[BackendConfigT]):
+        LOGGER.info("\t+ Running Image Diffusion combined tracking")
+        energy_tracker = self.create_energy_tracker(backend) if self.config.energy else None
+        call, _, _ = self.run_combined_tracking(
+            backend, backend.call, self.config.call_kwargs, file_prefix="call", energy_tracker=energy_tracker
+        )
+
+        self.set_combined_measurements(
+            "call",
+            call,
+            self.atomic_call_volume,
+            throughput_unit=IMAGE_DIFFUSION_THROUGHPUT_UNIT,
+            efficiency_unit=IMAGE_DIFFUSION_EFFICIENCY_UNIT,
+        )
+
+    def run_inference_combined_tracking(self, backend: Backend[BackendConfigT]):
+        LOGGER.info("\t+ Running Inference combined tracking")
+        energy_tracker = self.create_energy_tracker(backend) if self.config.energy else None
+        forward, _, _ = self.run_combined_tracking(
+            backend, backend.forward, self.config.forward_kwargs, file_prefix="forward", energy_tracker=energy_tracker
+        )
+
+        self.set_combined_measurements(
+            "forward",
+            forward,
+            self.atomic_forward_volume,
+            throughput_unit=INFERENCE_THROUGHPUT_UNIT,
+            efficiency_unit=INFERENCE_EFFICIENCY_UNIT,
+        )
+
     ## Memory tracking
     def run_text_generation_memory_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running Text Generation memory tracking")
@@ -192,17 +468,37 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             backend=backend.config.name, device=backend.config.device, device_ids=backend.config.device_ids
         )
         prefill_kwargs = {**self.config.generate_kwargs, **TEXT_GENERATION_PREFILL_OVERRIDES}
+        generate_kwargs = self.config.generate_kwargs
+
+        if self.config.memory_breakdown:
+            # to get the cache object used during generation
+            prefill_kwargs = {**prefill_kwargs, "return_dict_in_generate": True}
+            generate_kwargs = {**generate_kwargs, "return_dict_in_generate": True}
 
         with self.memory_tracker.track():
-            _ = backend.prefill(self.inputs, prefill_kwargs)
+            outputs = backend.prefill(self.inputs, prefill_kwargs)
 
         self.report.prefill.memory = self.memory_tracker.get_max_memory()
 
+        if self.config.memory_breakdown:
+            self.report.prefill.memory_breakdown = self.memory_tracker.get_memory_breakdown(
+                weights_memory=self.weights_memory,
+                kv_cache_memory=get_tensors_memory(getattr(outputs, "past_key_values", None)),
+            )
+
+        del outputs
+
         with self.memory_tracker.track():
-            _ = backend.generate(self.inputs, self.config.generate_kwargs)
+            outputs = backend.generate(self.inputs, generate_kwargs)
 
         self.report.decode.memory = self.memory_tracker.get_max_memory()
 
+        if self.config.memory_breakdown:
+            self.report.decode.memory_breakdown = self.memory_tracker.get_memory_breakdown(
+                weights_memory=self.weights_memory,
+                kv_cache_memory=get_tensors_memory(getattr(outputs, "past_key_values", None)),
+            )
+
     def run_image_diffusion_memory_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running Image Diffusion memory tracking")
         self.memory_tracker = MemoryTracker(
@@ -214,6 +510,11 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
 
         self.report.call.memory = self.memory_tracker.get_max_memory()
 
+        if self.config.memory_breakdown:
+            self.report.call.memory_breakdown = self.memory_tracker.get_memory_breakdown(
+                weights_memory=self.weights_memory
+            )
+
     def run_inference_memory_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running Inference memory tracking")
         self.memory_tracker = MemoryTracker(
@@ -221,19 +522,46 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
         )
 
         with self.memory_tracker.track():
-            _ = backend.forward(self.inputs, self.config.forward_kwargs)
+            outputs = backend.forward(self.inputs, self.config.forward_kwargs)
 
         self.report.forward.memory = self.memory_tracker.get_max_memory()
 
+        if self.config.memory_breakdown:
+            self.report.forward.memory_breakdown = self.memory_tracker.get_memory_breakdown(
+                weights_memory=self.weights_memory,
+                kv_cache_memory=get_tensors_memory(getattr(outputs, "past_key_values", None)),
+            )
+
+    ## Compilation tracking
+    @contextmanager
+    def track_compilation(self, phase: str):
+        if self.compile_tracker is None:
+            yield
+            return
+
+        with self.compile_tracker.track(phase):
+            yield
+
+        compiling_iterations = self.compile_tracker.get_compilation(phase).compiling_iterations
+        if phase != "warmup" and len(compiling_iterations) > 0:
+            LOGGER.warning(
+                f"\t+ {len(compiling_iterations)} iterations of the {phase} phase triggered a compilation, "
+                "their latencies include compile time. Consider increasing `warmup_runs`."
+            )
+
+    def track_compilation_iteration(self):
+        return self.compile_tracker.track_iteration() if self.compile_tracker is not None else nullcontext()
+
     ## Latency tracking
     def run_per_token_text_generation_latency_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running Per-Token Text Generation latency tracking")
         latency_tracker = PerTokenLatencyLogitsProcessor(device=backend.config.device, backend=backend.config.name)
         per_token_kwargs = {**self.config.generate_kwargs, "logits_processor": LogitsProcessorList([latency_tracker])}
 
-        while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
-            with latency_tracker.track():
-                _ = backend.generate(self.inputs, per_token_kwargs)
+        with self.track_compilation("generate"):
+            while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
+                with latency_tracker.track(), self.track_compilation_iteration():
+                    _ = backend.generate(self.inputs, per_token_kwargs)
 
         per_token_latency = latency_tracker.get_per_token_latency()
         prefill_latency = latency_tracker.get_prefill_latency()
@@ -256,14 +584,21 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             decode_latency, decode_volume, unit=TEXT_GENERATION_THROUGHPUT_UNIT
         )
 
+        if self.compile_tracker is not None:
+            # prefill and decode both run within the tracked generate calls
+            self.report.per_token.compilation = self.compile_tracker.get_compilation("generate")
+            self.report.prefill.compilation = self.compile_tracker.get_compilation("generate")
+            self.report.decode.compilation = self.compile_tracker.get_compilation("generate")
+
     def run_text_generation_latency_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running Text Generation latency tracking")
         latency_tracker = LatencyTracker(backend=backend.config.name, device=backend.config.device)
         prefill_kwargs = {**self.config.generate_kwargs, **TEXT_GENERATION_PREFILL_OVERRIDES}
 
-        while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
-            with latency_tracker.track():
-                _ = backend.prefill(self.inputs, prefill_kwargs)
+        with self.track_compilation("prefill"):
+            while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
+                with latency_tracker.track(), self.track_compilation_iteration():
+                    _ = backend.prefill(self.inputs, prefill_kwargs)
 
         prefill_latency = latency_tracker.get_latency()
         prefill_volume = self.atomic_prefill_volume
@@ -274,9 +609,10 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
         )
 
         latency_tracker.reset()
-        while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
-            with latency_tracker.track():
-                _ = backend.generate(self.inputs, self.config.generate_kwargs)
+        with self.track_compilation("generate"):
+            while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
+                with latency_tracker.track(), self.track_compilation_iteration():
+                    _ = backend.generate(self.inputs, self.config.generate_kwargs)
 
         generate_latency = latency_tracker.get_latency()
         decode_latency = generate_latency - prefill_latency
@@ -287,13 +623,18 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             decode_latency, decode_volume, unit=TEXT_GENERATION_THROUGHPUT_UNIT
         )
 
+        if self.compile_tracker is not None:
+            self.report.prefill.compilation = self.compile_tracker.get_compilation("prefill")
+            self.report.decode.compilation = self.compile_tracker.get_compilation("generate")
+
     def run_image_diffusion_latency_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running Image Diffusion latency tracking")
         latency_tracker = LatencyTracker(backend=backend.config.name, device=backend.config.device)
 
-        while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
-            with latency_tracker.track():
-                _ = backend.call(self.inputs, self.config.call_kwargs)
+        with self.track_compilation("call"):
+            while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
+                with latency_tracker.track(), self.track_compilation_iteration():
+                    _ = backend.call(self.inputs, self.config.call_kwargs)
 
         call_latency = latency_tracker.get_latency()
         call_volume = self.atomic_call_volume
@@ -303,13 +644,17 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             call_latency, call_volume, unit=IMAGE_DIFFUSION_THROUGHPUT_UNIT
         )
 
+        if self.compile_tracker is not None:
+            self.report.call.compilation = self.compile_tracker.get_compilation("call")
+
     def run_latency_inference_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running latency tracking")
         latency_tracker = LatencyTracker(backend=backend.config.name, device=backend.config.device)
 
-        while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
-            with latency_tracker.track():
-                _ = backend.forward(self.inputs, self.config.forward_kwargs)
+        with self.track_compilation("forward"):
+            while latency_tracker.elapsed() < self.config.duration or latency_tracker.count() < self.config.iterations:
+                with latency_tracker.track(), self.track_compilation_iteration():
+                    _ = backend.forward(self.inputs, self.config.forward_kwargs)
 
         forward_latency = latency_tracker.get_latency()
         forward_volume = self.atomic_forward_volume
@@ -319,13 +664,61 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             forward_latency, forward_volume, unit=INFERENCE_THROUGHPUT_UNIT
         )
 
+        if self.compile_tracker is not None:
+            self.report.forward.compilation = self.compile_tracker.get_compilation("forward")
+
     ## Energy tracking
-    def run_text_generation_energy_tracking(self, backend: Backend[BackendConfigT]):
-        LOGGER.info("\t+ Running Text Generation energy tracking")
+    def create_energy_tracker(self, backend: Backend[BackendConfigT]) -> EnergyTracker:
         energy_tracker = EnergyTracker(
-            backend=backend.config.name, device=backend.config.device, device_ids=backend.config.device_ids
+            backend=backend.config.name,
+            device=backend.config.device,
+            device_ids=backend.config.device_ids,
+            source=self.config.energy_source,
+            sampling_interval=self.config.energy_sampling_interval,
         )
+
+        if self.config.energy_baseline_duration > 0:
+            energy_tracker.calibrate(duration=self.config.energy_baseline_duration)
+
+        return energy_tracker
+
+    def create_iteration_tracker(self, backend: Backend[BackendConfigT]) -> Optional[LatencyTracker]:
+        if self.config.energy_per_iteration:
+            return LatencyTracker(backend=backend.config.name, device=backend.config.device)
+
+    def track_iteration(self, iteration_tracker: Optional[LatencyTracker]):
+        return iteration_tracker.track() if iteration_tracker is not None else nullcontext()
+
+    def get_iterations_energy(
+        self, energy_tracker: EnergyTracker, iteration_tracker: LatencyTracker
+    ) -> Tuple[List[Energy], List[float]]:
+        intervals = iteration_tracker.get_intervals()
+        iteration_tracker.reset()
+
+        return energy_tracker.get_intervals_energy(intervals), [end - start for start, end in intervals]
+
+    def create_phase_tracker(self, backend: Backend[BackendConfigT]) -> Optional[PerTokenLatencyLogitsProcessor]:
+        # splits each generation into its prefill and decode phases at its first token, to attribute sampled energy
+        if self.config.energy_source == "rapl" and backend.config.name in PER_TOKEN_BACKENDS:
+            return PerTokenLatencyLogitsProcessor(backend=backend.config.name, device=backend.config.device)
+
+    def get_decode_energy(
+        self, energy_tracker: EnergyTracker, phase_tracker: PerTokenLatencyLogitsProcessor
+    ) -> Tuple[List[Energy], List[float]]:
+        intervals = phase_tracker.get_decode_intervals()
+
+        return energy_tracker.get_intervals_energy(intervals), [end - start for start, end in intervals]
+
+    def run_text_generation_energy_tracking(self, backend: Backend[BackendConfigT]):
+        LOGGER.info("\t+ Running Text Generation energy tracking")
+        energy_tracker = self.create_energy_tracker(backend)
+        iteration_tracker = self.create_iteration_tracker(backend)
+        phase_tracker = self.create_phase_tracker(backend)
         prefill_kwargs = {**self.config.generate_kwargs, **TEXT_GENERATION_PREFILL_OVERRIDES}
+        generate_kwargs = self.config.generate_kwargs
+
+        if phase_tracker is not None:
+            generate_kwargs = {**generate_kwargs, "logits_processor": LogitsProcessorList([phase_tracker])}
 
         count = 0
         elapsed = 0
@@ -333,7 +726,9 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
 
         with energy_tracker.track(file_prefix="prefill"):
             while elapsed < self.config.duration or count < self.config.iterations:
-                _ = backend.prefill(self.inputs, prefill_kwargs)
+                heartbeat()
+                with self.track_iteration(iteration_tracker):
+                    _ = backend.prefill(self.inputs, prefill_kwargs)
                 elapsed = time.perf_counter() - start_time
                 count += 1
 
@@ -345,13 +740,35 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             prefill_energy, prefill_volume, unit=TEXT_GENERATION_EFFICIENCY_UNIT
         )
 
+        if energy_tracker.get_idle_power() is not None:
+            prefill_net_energy = energy_tracker.get_net_energy() / count
+
+            self.report.prefill.idle_power = energy_tracker.get_idle_power()
+            self.report.prefill.net_energy = prefill_net_energy
+            self.report.prefill.net_efficiency = Efficiency.from_energy(
+                prefill_net_energy, prefill_volume, unit=TEXT_GENERATION_EFFICIENCY_UNIT
+            )
+
+        if iteration_tracker is not None:
+            prefill_energies, prefill_durations = self.get_iterations_energy(energy_tracker, iteration_tracker)
+
+            self.report.prefill.energy_distribution = EnergyDistribution.from_values(
+                [energy.total for energy in prefill_energies], unit=ENERGY_UNIT
+            )
+            self.report.prefill.power = Power.from_energies(prefill_energies, prefill_durations)
+
+        if energy_tracker.source == "rapl":
+            self.report.prefill.power_timeline = energy_tracker.get_power_timeline()
+
         count = 0
         elapsed = 0
         start_time = time.perf_counter()
 
         with energy_tracker.track(file_prefix="generate"):
             while elapsed < self.config.duration or count < self.config.iterations:
-                _ = backend.generate(self.inputs, self.config.generate_kwargs)
+                heartbeat()
+                with self.track_iteration(iteration_tracker), self.track_iteration(phase_tracker):
+                    _ = backend.generate(self.inputs, generate_kwargs)
                 elapsed = time.perf_counter() - start_time
                 count += 1
 
@@ -364,11 +781,42 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             decode_energy, decode_volume, unit=TEXT_GENERATION_EFFICIENCY_UNIT
         )
 
+        if energy_tracker.get_idle_power() is not None:
+            decode_net_energy = energy_tracker.get_net_energy() / count - prefill_net_energy
+
+            self.report.decode.idle_power = energy_tracker.get_idle_power()
+            self.report.decode.net_energy = decode_net_energy
+            self.report.decode.net_efficiency = Efficiency.from_energy(
+                decode_net_energy, decode_volume, unit=TEXT_GENERATION_EFFICIENCY_UNIT
+            )
+
+        if phase_tracker is not None:
+            self.report.decode.power_timeline = energy_tracker.get_power_timeline(phase_tracker.get_decode_intervals())
+
+        if iteration_tracker is not None and phase_tracker is not None:
+            # prefill and decode are split within each generation, at its first token
+            decode_energies, decode_durations = self.get_decode_energy(energy_tracker, phase_tracker)
+
+            self.report.decode.energy_distribution = EnergyDistribution.from_values(
+                [energy.total for energy in decode_energies], unit=ENERGY_UNIT
+            )
+            self.report.decode.power = Power.from_energies(decode_energies, decode_durations)
+        elif iteration_tracker is not None:
+            generate_energies, generate_durations = self.get_iterations_energy(energy_tracker, iteration_tracker)
+            mean_prefill_energy = Energy.aggregate(prefill_energies)
+            mean_prefill_duration = sum(prefill_durations) / len(prefill_durations)
+            decode_energies = [energy - mean_prefill_energy for energy in generate_energies]
+            decode_durations = [duration - mean_prefill_duration for duration in generate_durations]
+
+            self.report.decode.energy_distribution = EnergyDistribution.from_values(
+                [energy.total for energy in decode_energies], unit=ENERGY_UNIT
+            )
+            self.report.decode.power = Power.from_energies(decode_energies, decode_durations)
+
     def run_image_diffusion_energy_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running Image Diffusion energy tracking")
-        energy_tracker = EnergyTracker(
-            backend=backend.config.name, device=backend.config.device, device_ids=backend.config.device_ids
-        )
+        energy_tracker = self.create_energy_tracker(backend)
+        iteration_tracker = self.create_iteration_tracker(backend)
 
         count = 0
         elapsed = 0
@@ -376,7 +824,9 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
 
         with energy_tracker.track(file_prefix="call"):
             while elapsed < self.config.duration or count < self.config.iterations:
-                _ = backend.call(self.inputs, self.config.call_kwargs)
+                heartbeat()
+                with self.track_iteration(iteration_tracker):
+                    _ = backend.call(self.inputs, self.config.call_kwargs)
                 elapsed = time.perf_counter() - start_time
                 count += 1
 
@@ -388,11 +838,30 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             call_energy, call_volume, unit=IMAGE_DIFFUSION_EFFICIENCY_UNIT
         )
 
+        if energy_tracker.get_idle_power() is not None:
+            call_net_energy = energy_tracker.get_net_energy() / count
+
+            self.report.call.idle_power = energy_tracker.get_idle_power()
+            self.report.call.net_energy = call_net_energy
+            self.report.call.net_efficiency = Efficiency.from_energy(
+                call_net_energy, call_volume, unit=IMAGE_DIFFUSION_EFFICIENCY_UNIT
+            )
+
+        if iteration_tracker is not None:
+            call_energies, call_durations = self.get_iterations_energy(energy_tracker, iteration_tracker)
+
+            self.report.call.energy_distribution = EnergyDistribution.from_values(
+                [energy.total for energy in call_energies], unit=ENERGY_UNIT
+            )
+            self.report.call.power = Power.from_energies(call_energies, call_durations)
+
+        if energy_tracker.source == "rapl":
+            self.report.call.power_timeline = energy_tracker.get_power_timeline()
+
     def run_inference_energy_tracking(self, backend: Backend[BackendConfigT]):
         LOGGER.info("\t+ Running energy tracking")
-        energy_tracker = EnergyTracker(
-            backend=backend.config.name, device=backend.config.device, device_ids=backend.config.device_ids
-        )
+        energy_tracker = self.create_energy_tracker(backend)
+        iteration_tracker = self.create_iteration_tracker(backend)
 
         count = 0
         elapsed = 0
@@ -400,7 +869,9 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
 
         with energy_tracker.track(file_prefix="forward"):
             while elapsed < self.config.duration or count < self.config.iterations:
-                _ = backend.forward(self.inputs, self.config.forward_kwargs)
+                heartbeat()
+                with self.track_iteration(iteration_tracker):
+                    _ = backend.forward(self.inputs, self.config.forward_kwargs)
                 elapsed = time.perf_counter() - start_time
                 count += 1
 
@@ -412,6 +883,26 @@ class InferenceBenchmark(Benchmark[InferenceConfig]):
             forward_energy, forward_volume, unit=INFERENCE_EFFICIENCY_UNIT
         )
 
+        if energy_tracker.get_idle_power() is not None:
+            forward_net_energy = energy_tracker.get_net_energy() / count
+
+            self.report.forward.idle_power = energy_tracker.get_idle_power()
+            self.report.forward.net_energy = forward_net_energy
+            self.report.forward.net_efficiency = Efficiency.from_energy(
+                forward_net_energy, forward_volume, unit=INFERENCE_EFFICIENCY_UNIT
+            )
+
+        if iteration_tracker is not None:
+            forward_energies, forward_durations = self.get_iterations_energy(energy_tracker, iteration_tracker)
+
+            self.report.forward.energy_distribution = EnergyDistribution.from_values(
+                [energy.total for energy in forward_energies], unit=ENERGY_UNIT
+            )
+            self.report.forward.power = Power.from_energies(forward_energies, forward_durations)
+
+        if energy_tracker.source == "rapl":
+            self.report.forward.power_timeline = energy_tracker.get_power_timeline()
+
     @property
     def atomic_forward_volume(self) -> int:  # in samples
         return self.config.input_shapes["batch_size"]
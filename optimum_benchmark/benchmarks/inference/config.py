@@ -40,9 +40,44 @@ class InferenceConfig(BenchmarkConfig):
     )
 
     # tracking options
+    combined: bool = field(
+        default=False,
+        metadata={"help": "Run a single timed loop under all enabled trackers instead of one loop per tracker"},
+    )
+    combined_overhead_runs: int = field(
+        default=10,
+        metadata={
+            "help": "Number of runs with latency tracking only, used to measure the overhead of the memory and energy "
+            "trackers in combined mode, set to 0 to disable"
+        },
+    )
     latency: bool = field(default=True, metadata={"help": "Measure latencies and throughputs"})
     memory: bool = field(default=False, metadata={"help": "Measure max memory usage"})
     energy: bool = field(default=False, metadata={"help": "Measure energy usage and efficiency"})
+    energy_source: str = field(
+        default="codecarbon",
+        metadata={"help": "Energy measurement source, either 'codecarbon' or 'rapl' (CPU packages and DRAM counters)"},
+    )
+    energy_sampling_interval: Optional[float] = field(
+        default=None,
+        metadata={"help": "Interval (in seconds) at which RAPL counters are sampled, by default only at start/stop"},
+    )
+    energy_per_iteration: bool = field(
+        default=False,
+        metadata={"help": "Attribute sampled energy to each iteration and report its distribution and average power"},
+    )
+    energy_baseline_duration: float = field(
+        default=0,
+        metadata={"help": "Duration (in seconds) of the idle power measurement to subtract, set to 0 to disable"},
+    )
+    compilation: bool = field(
+        default=False,
+        metadata={"help": "Track torch.compile's compile time, graph breaks and recompilations per phase"},
+    )
+    memory_breakdown: bool = field(
+        default=False,
+        metadata={"help": "Decompose max memory usage into weights, kv cache, activations and allocator overhead"},
+    )
 
     # methods kwargs
     forward_kwargs: Dict[str, Any] = field(
@@ -91,5 +126,20 @@ class InferenceConfig(BenchmarkConfig):
             )
             self.generate_kwargs["max_new_tokens"] = self.generate_kwargs["min_new_tokens"]
 
-        if self.energy and is_rocm_system():
+        if self.memory_breakdown and not self.memory:
+            raise ValueError("Memory breakdown requires memory tracking. Please set `memory` to True.")
+
+        if self.energy_source not in ["codecarbon", "rapl"]:
+            raise ValueError(f"`energy_source` must be either 'codecarbon' or 'rapl', got {self.energy_source}")
+
+        if self.energy_per_iteration and self.energy_source != "rapl":
+            raise ValueError("Per-iteration energy requires sampled energy counters. Please set `energy_source=rapl`.")
+
+        if self.energy_per_iteration and self.energy_sampling_interval is None:
+            LOGGER.warning(
+                "Per-iteration energy requires sampled energy counters. Setting `energy_sampling_interval` to 0.01."
+            )
+            self.energy_sampling_interval = 0.01
+
+        if self.energy and self.energy_source == "codecarbon" and is_rocm_system():
             raise ValueError("Energy measurement through codecarbon is not yet available on ROCm-powered devices.")
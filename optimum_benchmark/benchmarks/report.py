@@ -1,11 +1,15 @@
-from dataclasses import dataclass, make_dataclass
+from dataclasses import dataclass, fields, make_dataclass
 from logging import getLogger
 from typing import Any, Dict, List, Optional
 
+from ..heartbeat_utils import Timeout
 from ..hub_utils import PushToHubMixin, classproperty
-from ..trackers.energy import Efficiency, Energy
-from ..trackers.latency import Latency, Throughput
-from ..trackers.memory import Memory
+from ..trackers.compile import Compilation
+from ..trackers.energy import Efficiency, Energy, EnergyDistribution, Power, PowerTimeline
+from ..trackers.latency import Latency, RankLatency, Throughput, TrackingOverhead
+from ..trackers.memory import Memory, MemoryBreakdown
+from ..trackers.memory_estimator import MemoryEstimate, get_measured_peak_memory
+from ..trackers.stage import Artifact, ProcessActivity
 
 LOGGER = getLogger("report")
 
@@ -14,14 +18,35 @@ LOGGER = getLogger("report")
 class BenchmarkMeasurements:
     memory: Optional[Memory] = None
     latency: Optional[Latency] = None
+    rank_latency: Optional[RankLatency] = None
     throughput: Optional[Throughput] = None
     energy: Optional[Energy] = None
     efficiency: Optional[Efficiency] = None
+    memory_estimate: Optional[MemoryEstimate] = None
+    memory_breakdown: Optional[MemoryBreakdown] = None
+    idle_power: Optional[Power] = None
+    net_energy: Optional[Energy] = None
+    net_efficiency: Optional[Efficiency] = None
+    energy_distribution: Optional[EnergyDistribution] = None
+    power: Optional[Power] = None
+    power_timeline: Optional[PowerTimeline] = None
+    tracking_overhead: Optional[TrackingOverhead] = None
+    activity: Optional[ProcessActivity] = None
+    artifact: Optional[Artifact] = None
+    compilation: Optional[Compilation] = None
+    warmup_compilation: Optional[Compilation] = None
+    timeout: Optional[Timeout] = None
 
     @staticmethod
     def aggregate(measurements: List["BenchmarkMeasurements"]) -> "BenchmarkMeasurements":
         memory = Memory.aggregate([m.memory for m in measurements]) if measurements[0].memory is not None else None
-        latency = Latency.aggregate([m.latency for m in measurements]) if measurements[0].latency is not None else None
+        # measurements are aggregated across the ranks of a distributed run, whose latency is the slowest rank's
+        rank_latency = (
+            RankLatency.from_latencies([m.latency for m in measurements])
+            if measurements[0].latency is not None
+            else None
+        )
+        latency = rank_latency.max if rank_latency is not None else None
         throughput = (
             Throughput.aggregate([m.throughput for m in measurements if m.throughput is not None])
             if measurements[0].throughput is not None
@@ -37,9 +62,89 @@ class BenchmarkMeasurements:
             if measurements[0].efficiency is not None
             else None
         )
+        memory_breakdown = (
+            MemoryBreakdown.aggregate([m.memory_breakdown for m in measurements])
+            if measurements[0].memory_breakdown is not None
+            else None
+        )
+        idle_power = (
+            Power.aggregate([m.idle_power for m in measurements if m.idle_power is not None])
+            if measurements[0].idle_power is not None
+            else None
+        )
+        net_energy = (
+            Energy.aggregate([m.net_energy for m in measurements if m.net_energy is not None])
+            if measurements[0].net_energy is not None
+            else None
+        )
+        net_efficiency = (
+            Efficiency.aggregate([m.net_efficiency for m in measurements if m.net_efficiency is not None])
+            if measurements[0].net_efficiency is not None
+            else None
+        )
+        energy_distribution = (
+            EnergyDistribution.aggregate([m.energy_distribution for m in measurements])
+            if measurements[0].energy_distribution is not None
+            else None
+        )
+        power = (
+            Power.aggregate([m.power for m in measurements if m.power is not None])
+            if measurements[0].power is not None
+            else None
+        )
+        power_timeline = (
+            PowerTimeline.aggregate([m.power_timeline for m in measurements if m.power_timeline is not None])
+            if measurements[0].power_timeline is not None
+            else None
+        )
+        tracking_overhead = (
+            TrackingOverhead.aggregate([m.tracking_overhead for m in measurements])
+            if measurements[0].tracking_overhead is not None
+            else None
+        )
+        activity = (
+            ProcessActivity.aggregate([m.activity for m in measurements])
+            if measurements[0].activity is not None
+            else None
+        )
+        artifact = (
+            Artifact.aggregate([m.artifact for m in measurements]) if measurements[0].artifact is not None else None
+        )
+        compilation = (
+            Compilation.aggregate([m.compilation for m in measurements])
+            if measurements[0].compilation is not None
+            else None
+        )
+        warmup_compilation = (
+            Compilation.aggregate([m.warmup_compilation for m in measurements])
+            if measurements[0].warmup_compilation is not None
+            else None
+        )
+        timeout = Timeout.aggregate([m.timeout for m in measurements]) if measurements[0].timeout is not None else None
+        # estimates are computed once per experiment, they are the same for all processes
+        memory_estimate = measurements[0].memory_estimate
 
         return BenchmarkMeasurements(
-            memory=memory, latency=latency, throughput=throughput, energy=energy, efficiency=efficiency
+            memory=memory,
+            latency=latency,
+            rank_latency=rank_latency,
+            throughput=throughput,
+            energy=energy,
+            efficiency=efficiency,
+            memory_estimate=memory_estimate,
+            memory_breakdown=memory_breakdown,
+            idle_power=idle_power,
+            net_energy=net_energy,
+            net_efficiency=net_efficiency,
+            energy_distribution=energy_distribution,
+            power=power,
+            power_timeline=power_timeline,
+            tracking_overhead=tracking_overhead,
+            activity=activity,
+            artifact=artifact,
+            compilation=compilation,
+            warmup_compilation=warmup_compilation,
+            timeout=timeout,
         )
 
 
@@ -52,7 +157,13 @@ class BenchmarkReport(PushToHubMixin):
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "PushToHubMixin":
         return make_dataclass(
-            cls_name="report", fields=[(target, BenchmarkMeasurements) for target in data.keys()], bases=(cls,)
+            cls_name="report",
+            fields=[(target, BenchmarkMeasurements) for target in data.keys()],
+            bases=(cls,),
+            # the class is dynamic and can't be pickled by reference (e.g. to be sent by a launcher's worker)
+            namespace={
+                "__reduce__": lambda self: (cls.from_dict, ({f.name: getattr(self, f.name) for f in fields(self)},))
+            },
         )(**data)
 
     def log_memory(self):
@@ -60,12 +171,22 @@ class BenchmarkReport(PushToHubMixin):
             measurements: BenchmarkMeasurements = getattr(self, target)
             if measurements.memory is not None:
                 measurements.memory.log(prefix=target)
+            if measurements.memory_breakdown is not None:
+                measurements.memory_breakdown.log(prefix=target)
 
     def log_latency(self):
         for target in self.to_dict().keys():
             measurements: BenchmarkMeasurements = getattr(self, target)
             if measurements.latency is not None:
                 measurements.latency.log(prefix=target)
+            if measurements.rank_latency is not None:
+                measurements.rank_latency.log(prefix=target)
+            if measurements.tracking_overhead is not None:
+                measurements.tracking_overhead.log(prefix=target)
+            if measurements.warmup_compilation is not None:
+                measurements.warmup_compilation.log(prefix=f"{target} warmup")
+            if measurements.compilation is not None:
+                measurements.compilation.log(prefix=target)
 
     def log_throughput(self):
         for target in self.to_dict().keys():
@@ -78,6 +199,16 @@ class BenchmarkReport(PushToHubMixin):
             measurements: BenchmarkMeasurements = getattr(self, target)
             if measurements.energy is not None:
                 measurements.energy.log(prefix=target)
+            if measurements.idle_power is not None:
+                measurements.idle_power.log(prefix=f"{target} idle")
+            if measurements.net_energy is not None:
+                measurements.net_energy.log(prefix=f"{target} net")
+            if measurements.energy_distribution is not None:
+                measurements.energy_distribution.log(prefix=target)
+            if measurements.power is not None:
+                measurements.power.log(prefix=target)
+            if measurements.power_timeline is not None:
+                measurements.power_timeline.log(prefix=target)
 
     def log_efficiency(self):
         for target in self.to_dict().keys():
@@ -85,19 +216,59 @@ class BenchmarkReport(PushToHubMixin):
             if measurements.efficiency is not None:
                 measurements.efficiency.log(prefix=target)
 
+    def log_memory_estimate(self):
+        for target in self.to_dict().keys():
+            measurements: BenchmarkMeasurements = getattr(self, target)
+            if measurements.memory_estimate is not None:
+                measurements.memory_estimate.log(prefix=target)
+
+                measured = get_measured_peak_memory(measurements.memory) if measurements.memory else None
+                if measured is not None and measured > 0:
+                    LOGGER.info(
+                        f"\t\t+ {target} estimated / measured memory: {measurements.memory_estimate.total / measured:f}"
+                    )
+
     def log(self):
         for target in self.to_dict().keys():
             measurements: BenchmarkMeasurements = getattr(self, target)
             if measurements.memory is not None:
                 measurements.memory.log(prefix=target)
+            if measurements.memory_breakdown is not None:
+                measurements.memory_breakdown.log(prefix=target)
             if measurements.latency is not None:
                 measurements.latency.log(prefix=target)
+            if measurements.rank_latency is not None:
+                measurements.rank_latency.log(prefix=target)
             if measurements.throughput is not None:
                 measurements.throughput.log(prefix=target)
             if measurements.energy is not None:
                 measurements.energy.log(prefix=target)
             if measurements.efficiency is not None:
                 measurements.efficiency.log(prefix=target)
+            if measurements.idle_power is not None:
+                measurements.idle_power.log(prefix=f"{target} idle")
+            if measurements.net_energy is not None:
+                measurements.net_energy.log(prefix=f"{target} net")
+            if measurements.net_efficiency is not None:
+                measurements.net_efficiency.log(prefix=f"{target} net")
+            if measurements.energy_distribution is not None:
+                measurements.energy_distribution.log(prefix=target)
+            if measurements.power is not None:
+                measurements.power.log(prefix=target)
+            if measurements.power_timeline is not None:
+                measurements.power_timeline.log(prefix=target)
+            if measurements.tracking_overhead is not None:
+                measurements.tracking_overhead.log(prefix=target)
+            if measurements.activity is not None:
+                measurements.activity.log(prefix=target)
+            if measurements.artifact is not None:
+                measurements.artifact.log(prefix=target)
+            if measurements.warmup_compilation is not None:
+                measurements.warmup_compilation.log(prefix=f"{target} warmup")
+            if measurements.compilation is not None:
+                measurements.compilation.log(prefix=target)
+            if measurements.timeout is not None:
+                measurements.timeout.log(prefix=target)
 
     @classmethod
     def aggregate(cls, reports: List["BenchmarkReport"]) -> "BenchmarkReport":
@@ -0,0 +1,192 @@
+import json
+import subprocess
+import sys
+import time
+from logging import getLogger
+from typing import List, Tuple, Type
+
+import numpy as np
+from hydra.utils import get_class
+
+from ...backends.base import Backend, BackendConfigT
+from ...backends.config import BackendConfig
+from ...generators.input_generator import InputGenerator
+from ...task_utils import IMAGE_DIFFUSION_TASKS, TEXT_GENERATION_TASKS
+from ...trackers.latency import LATENCY_UNIT, Latency, LatencyTracker
+from ...trackers.stage import ACTIVITY_UNIT, ProcessActivity, StageTracker
+from ..base import Benchmark
+from ..inference.benchmark import IMAGE_DIFFUSION_DEFAULT_KWARGS, TEXT_GENERATION_DEFAULT_KWARGS
+from ..report import BenchmarkMeasurements, BenchmarkReport
+from .config import StartupConfig
+
+LOGGER = getLogger("startup")
+
+# time from the start of the benchmark process' work to the end of the first inference
+FIRST_RESPONSE_TARGET = "first_response"
+# suffix of the targets holding the time per sample of the stages that processed samples (e.g. calibration)
+PER_SAMPLE_SUFFIX = "_per_sample"
+
+# imports a class in a fresh interpreter and prints the time it took, with the page faults and reads it caused
+COLD_IMPORT_SCRIPT = """
+import json, os, sys, time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def current():
+    activity = {}
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        activity["minor_page_faults"], activity["major_page_faults"] = usage.ru_minflt, usage.ru_majflt
+    if os.path.isfile("/proc/self/io"):
+        with open("/proc/self/io") as f:
+            io = dict(line.split(": ") for line in f.read().splitlines())
+        activity["storage_read"], activity["total_read"] = int(io["read_bytes"]) / 1e6, int(io["rchar"]) / 1e6
+    return activity
+
+start_activity, start = current(), time.perf_counter()
+module_name, class_name = sys.argv[1].rsplit(".", 1)
+getattr(__import__(module_name, fromlist=[class_name]), class_name)
+duration, end_activity = time.perf_counter() - start, current()
+print(json.dumps({"duration": duration, **{name: end_activity[name] - start_activity[name] for name in end_activity}}))
+"""
+
+
+class StartupBenchmark(Benchmark[StartupConfig]):
+    """
+    Times the cold start of a backend stage by stage: imports, config/processor resolution, weights loading, device
+    move, export/compilation, first inference and the time it takes to reach a steady state latency afterwards.
+    The imports are timed in a fresh interpreter, since the benchmark process has already imported most of the
+    backend's dependencies (e.g. torch, transformers).
+    """
+
+    NAME = "startup"
+
+    def __init__(self, config: StartupConfig) -> None:
+        super().__init__(config)
+
+    def allocate_backend(self, backend_config: BackendConfig) -> Backend:
+        LOGGER.info("\t+ Creating stage tracker")
+        self.stage_tracker = StageTracker(
+            device=backend_config.device,
+            backend=backend_config.name,
+            device_ids=backend_config.device_ids,
+            memory=self.config.memory,
+        )
+
+        start = time.perf_counter()
+        duration, activity = time_cold_import(backend_config._target_)
+        self.stage_tracker.record("imports", duration, activity, elapsed=time.perf_counter() - start)
+
+        backend_factory: Type[Backend] = get_class(backend_config._target_)
+
+        with self.stage_tracker.activate():
+            backend: Backend = backend_factory(backend_config)
+
+        return backend
+
+    def run(self, backend: Backend[BackendConfigT]) -> None:
+        LOGGER.info("\t+ Creating input generator")
+        self.input_generator = InputGenerator(
+            task=backend.config.task, model_shapes=backend.model_shapes, input_shapes=self.config.input_shapes
+        )
+
+        if backend.config.task in TEXT_GENERATION_TASKS:
+            LOGGER.info("\t+ Updating Text Generation kwargs with default values")
+            self.config.generate_kwargs = {**TEXT_GENERATION_DEFAULT_KWARGS, **self.config.generate_kwargs}
+        elif backend.config.task in IMAGE_DIFFUSION_TASKS:
+            LOGGER.info("\t+ Updating Image Diffusion kwargs with default values")
+            self.config.call_kwargs = {**IMAGE_DIFFUSION_DEFAULT_KWARGS, **self.config.call_kwargs}
+
+        LOGGER.info("\t+ Generating inputs")
+        self.inputs = self.input_generator()
+
+        with self.stage_tracker.activate():
+            with self.stage_tracker.track("prepare_inputs"):
+                self.inputs = backend.prepare_inputs(self.inputs)
+
+            with self.stage_tracker.track("prepare_for_inference"):
+                backend.prepare_for_inference(
+                    **backend.model_shapes,
+                    **self.config.input_shapes,
+                    **self.config.generate_kwargs,
+                    **self.config.forward_kwargs,
+                    **self.config.call_kwargs,
+                )
+
+            with self.stage_tracker.track("first_inference"):
+                self.run_inference(backend)
+
+            with self.stage_tracker.track("steady_state"):
+                self.run_steady_state_tracking(backend)
+
+        self.report = get_stages_report(
+            self.stage_tracker, self.stage_tracker.get_stages(), extra_targets=[FIRST_RESPONSE_TARGET]
+        )
+        self.report.first_response.latency = Latency.from_values(
+            [self.stage_tracker.get_end_time("first_inference")], unit=LATENCY_UNIT
+        )
+
+        self.report.log()
+
+    def run_inference(self, backend: Backend[BackendConfigT]) -> None:
+        if backend.config.task in TEXT_GENERATION_TASKS:
+            _ = backend.generate(self.inputs, self.config.generate_kwargs)
+        elif backend.config.task in IMAGE_DIFFUSION_TASKS:
+            _ = backend.call(self.inputs, self.config.call_kwargs)
+        else:
+            _ = backend.forward(self.inputs, self.config.forward_kwargs)
+
+    def run_steady_state_tracking(self, backend: Backend[BackendConfigT]) -> None:
+        LOGGER.info("\t+ Running inference until steady state")
+        latency_tracker = LatencyTracker(backend=backend.config.name, device=backend.config.device)
+
+        while latency_tracker.count() < self.config.max_steady_state_runs:
+            with latency_tracker.track():
+                self.run_inference(backend)
+
+            if latency_tracker.count() >= self.config.steady_state_window:
+                window = latency_tracker.get_latency().values[-self.config.steady_state_window :]
+                if np.std(window) <= self.config.steady_state_tolerance * np.mean(window):
+                    LOGGER.info(f"\t+ Reached steady state after {latency_tracker.count()} runs")
+                    return
+
+        LOGGER.warning(f"\t+ Steady state not reached after {self.config.max_steady_state_runs} runs")
+
+    def get_report(self) -> BenchmarkReport:
+        return self.report
+
+
+def time_cold_import(target: str) -> Tuple[float, ProcessActivity]:
+    """Returns the time (in seconds) it takes to import a class in a fresh interpreter, and the activity it causes."""
+
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_IMPORT_SCRIPT, target], capture_output=True, text=True, check=True
+    ).stdout
+    # the imported modules can print to stdout, the measurements are on the last line
+    measurements = json.loads(output.strip().splitlines()[-1])
+
+    return measurements.pop("duration"), ProcessActivity(unit=ACTIVITY_UNIT, **measurements)
+
+
+def get_stages_report(stage_tracker: StageTracker, stages: List[str], extra_targets: List[str]) -> BenchmarkReport:
+    per_sample_stages = [stage for stage in stages if stage_tracker.get_samples(stage) is not None]
+    report = BenchmarkReport.from_targets(
+        [*stages, *[f"{stage}{PER_SAMPLE_SUFFIX}" for stage in per_sample_stages], *extra_targets]
+    )
+
+    for stage in stages:
+        measurements: BenchmarkMeasurements = getattr(report, stage)
+        measurements.latency = Latency.from_values([stage_tracker.get_duration(stage)], unit=LATENCY_UNIT)
+        measurements.memory = stage_tracker.get_max_memory(stage)
+        measurements.activity = stage_tracker.get_activity(stage)
+        measurements.artifact = stage_tracker.get_artifact(stage)
+
+    for stage in per_sample_stages:
+        getattr(report, f"{stage}{PER_SAMPLE_SUFFIX}").latency = Latency.from_values(
+            [stage_tracker.get_duration(stage) / stage_tracker.get_samples(stage)], unit=LATENCY_UNIT
+        )
+
+    return report
@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any, ClassVar, Dict
+
+from ..config import BenchmarkConfig
+from ..inference.config import INPUT_SHAPES
+
+LOGGER = getLogger("startup")
+
+
+@dataclass
+class StartupConfig(BenchmarkConfig):
+    name: str = "startup"
+    _target_: str = "optimum_benchmark.benchmarks.startup.benchmark.StartupBenchmark"
+
+    # measures the backend allocation
+    backend_reusable: ClassVar[bool] = False
+
+    # input/output config
+    input_shapes: Dict[str, Any] = field(
+        default_factory=dict,
+        metadata={"help": "Input shapes for the model. Missing keys will be filled with default values."},
+    )
+
+    # tracking options
+    memory: bool = field(default=True, metadata={"help": "Measure the max memory usage of each stage"})
+
+    # steady state options
+    steady_state_window: int = field(
+        default=5,
+        metadata={"help": "Number of consecutive runs whose latencies are compared to detect the steady state"},
+    )
+    steady_state_tolerance: float = field(
+        default=0.05,
+        metadata={"help": "Maximum relative standard deviation of the latencies of the window in steady state"},
+    )
+    max_steady_state_runs: int = field(
+        default=100,
+        metadata={"help": "Maximum number of runs after the first inference to reach the steady state"},
+    )
+
+    # methods kwargs
+    forward_kwargs: Dict[str, Any] = field(
+        default_factory=dict, metadata={"help": "Keyword arguments to pass to the forward method of the backend."}
+    )
+    generate_kwargs: Dict[str, Any] = field(
+        default_factory=dict, metadata={"help": "Keyword arguments to pass to the generate method of the backend."}
+    )
+    call_kwargs: Dict[str, Any] = field(
+        default_factory=dict, metadata={"help": "Keyword arguments to pass to the call method of the backend."}
+    )
+
+    def __post_init__(self):
+        super().__post_init__()
+
+        self.input_shapes = {**INPUT_SHAPES, **self.input_shapes}
+
+        if self.steady_state_window < 2:
+            raise ValueError(f"`steady_state_window` must be at least 2, got {self.steady_state_window}")
+
+        if self.max_steady_state_runs < self.steady_state_window:
+            raise ValueError(
+                "`max_steady_state_runs` must be greater than or equal to `steady_state_window`, "
+                f"got {self.max_steady_state_runs} and {self.steady_state_window}"
+            )
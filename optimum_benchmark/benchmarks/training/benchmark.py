@@ -2,13 +2,14 @@ from contextlib import ExitStack
 from dataclasses import dataclass
 from logging import getLogger
 
-from transformers import default_data_collator
+from transformers import TrainerCallback, default_data_collator
 
 from ...backends.base import Backend, BackendConfigT
 from ...generators.dataset_generator import DatasetGenerator
+from ...heartbeat_utils import heartbeat
 from ...trackers.energy import Efficiency, EnergyTracker
 from ...trackers.latency import StepLatencyTrainerCallback, Throughput
-from ...trackers.memory import MemoryTracker
+from ...trackers.memory import StepMemoryTrainerCallback
 from ..base import Benchmark
 from ..report import BenchmarkMeasurements, BenchmarkReport
 from .config import TrainingConfig
@@ -26,6 +27,19 @@ class TrainingReport(BenchmarkReport):
     train: BenchmarkMeasurements
 
 
+class HeartbeatTrainerCallback(TrainerCallback):
+    """Signals the launcher's watchdog that training makes progress, and when it goes from warmup to measured steps."""
+
+    def __init__(self, warmup_steps: int) -> None:
+        self.warmup_steps = warmup_steps
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        heartbeat()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        heartbeat("measure" if state.global_step == self.warmup_steps else None)
+
+
 class TrainingBenchmark(Benchmark[TrainingConfig]):
     NAME = "training"
 
@@ -46,25 +60,39 @@ class TrainingBenchmark(Benchmark[TrainingConfig]):
             overall=BenchmarkMeasurements(), warmup=BenchmarkMeasurements(), train=BenchmarkMeasurements()
         )
 
-        training_callbackes = []
+        training_callbackes = [HeartbeatTrainerCallback(warmup_steps=self.config.warmup_steps)]
         if self.config.latency:
             LOGGER.info("\t+ Adding latency measuring callback")
             latency_callback = StepLatencyTrainerCallback(device=backend.config.device, backend=backend.config.name)
             training_callbackes.append(latency_callback)
 
-        training_trackers = []
         if self.config.memory:
-            LOGGER.info("\t+ Adding memory tracking context manager")
-            memory_tracker = MemoryTracker(
-                device=backend.config.device, backend=backend.config.name, device_ids=backend.config.device_ids
+            LOGGER.info("\t+ Adding memory tracking callback")
+            memory_callback = StepMemoryTrainerCallback(
+                device=backend.config.device,
+                backend=backend.config.name,
+                device_ids=backend.config.device_ids,
+                warmup_steps=self.config.warmup_steps,
             )
-            training_trackers.append(memory_tracker.track())
+            training_callbackes.append(memory_callback)
 
+        training_trackers = []
         if self.config.energy:
             LOGGER.info("\t+ Adding energy tracking context manager")
-            energy_tracker = EnergyTracker(device=backend.config.device, device_ids=backend.config.device_ids)
+            energy_tracker = EnergyTracker(
+                backend=backend.config.name,
+                device=backend.config.device,
+                device_ids=backend.config.device_ids,
+                source=self.config.energy_source,
+                sampling_interval=self.config.energy_sampling_interval,
+            )
+
+            if self.config.energy_baseline_duration > 0:
+                energy_tracker.calibrate(duration=self.config.energy_baseline_duration)
+
             training_trackers.append(energy_tracker.track())
 
+        heartbeat("warmup" if self.config.warmup_steps > 0 else "measure")
         with ExitStack() as stack:
             for tracker in training_trackers:
                 stack.enter_context(tracker)
@@ -91,9 +119,13 @@ class TrainingBenchmark(Benchmark[TrainingConfig]):
             )
 
         if self.config.memory:
-            self.report.overall.memory = memory_tracker.get_max_memory()
-            self.report.warmup.memory = memory_tracker.get_max_memory()
-            self.report.train.memory = memory_tracker.get_max_memory()
+            self.report.overall.memory = memory_callback.get_max_memory()
+            self.report.overall.memory_breakdown = memory_callback.get_max_memory_breakdown()
+            if self.config.warmup_steps > 0:
+                self.report.warmup.memory = memory_callback.get_phase_memory("warmup")
+                self.report.warmup.memory_breakdown = memory_callback.get_phase_memory_breakdown("warmup")
+            self.report.train.memory = memory_callback.get_phase_memory("train")
+            self.report.train.memory_breakdown = memory_callback.get_phase_memory_breakdown("train")
 
         if self.config.energy:
             # can only get overall energy consumption
@@ -102,6 +134,13 @@ class TrainingBenchmark(Benchmark[TrainingConfig]):
                 self.report.overall.energy, volume=self.overall_volume, unit=TRAIN_EFFICIENCY_UNIT
             )
 
+            if energy_tracker.get_idle_power() is not None:
+                self.report.overall.idle_power = energy_tracker.get_idle_power()
+                self.report.overall.net_energy = energy_tracker.get_net_energy()
+                self.report.overall.net_efficiency = Efficiency.from_energy(
+                    self.report.overall.net_energy, volume=self.overall_volume, unit=TRAIN_EFFICIENCY_UNIT
+                )
+
     @property
     def overall_volume(self) -> int:
         return (
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from logging import getLogger
-from typing import Any, Dict
+from typing import Any, ClassVar, Dict, Optional
 
 from ..config import BenchmarkConfig
 
@@ -33,6 +33,9 @@ class TrainingConfig(BenchmarkConfig):
     name: str = "training"
     _target_: str = "optimum_benchmark.benchmarks.training.benchmark.TrainingBenchmark"
 
+    # modifies the model weights
+    backend_reusable: ClassVar[bool] = False
+
     # training options
     max_steps: int = 140
     warmup_steps: int = 40
@@ -46,6 +49,18 @@ class TrainingConfig(BenchmarkConfig):
     latency: bool = field(default=True, metadata={"help": "Measure latencies and throughputs"})
     memory: bool = field(default=False, metadata={"help": "Measure max memory usage"})
     energy: bool = field(default=False, metadata={"help": "Measure energy usage"})
+    energy_source: str = field(
+        default="codecarbon",
+        metadata={"help": "Energy measurement source, either 'codecarbon' or 'rapl' (CPU packages and DRAM counters)"},
+    )
+    energy_sampling_interval: Optional[float] = field(
+        default=None,
+        metadata={"help": "Interval (in seconds) at which RAPL counters are sampled, by default only at start/stop"},
+    )
+    energy_baseline_duration: float = field(
+        default=0,
+        metadata={"help": "Duration (in seconds) of the idle power measurement to subtract, set to 0 to disable"},
+    )
 
     def __post_init__(self):
         super().__post_init__()
@@ -64,6 +79,9 @@ class TrainingConfig(BenchmarkConfig):
             )
             self.max_steps = self.training_arguments["max_steps"]
 
+        if self.energy_source not in ["codecarbon", "rapl"]:
+            raise ValueError(f"`energy_source` must be either 'codecarbon' or 'rapl', got {self.energy_source}")
+
         if self.warmup_steps > self.max_steps:
             raise ValueError(
                 f"`benchmark.warmup_steps` ({self.warmup_steps}) must be smaller than `benchmark.max_steps` ({self.max_steps})"
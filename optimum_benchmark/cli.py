@@ -14,12 +14,16 @@ from .backends.py_txi.config import PyTXIConfig
 from .backends.pytorch.config import PyTorchConfig
 from .backends.tensorrt_llm.config import TRTLLMConfig
 from .backends.torch_ort.config import TorchORTConfig
+from .benchmarks.build.config import BuildConfig
 from .benchmarks.energy_star.config import EnergyStarConfig
 from .benchmarks.inference.config import InferenceConfig
 from .benchmarks.report import BenchmarkReport
+from .benchmarks.startup.config import StartupConfig
 from .benchmarks.training.config import TrainingConfig
 from .experiment import ExperimentConfig, launch
+from .journal import Journal
 from .launchers.inline.config import InlineConfig
+from .launchers.pool.config import PoolConfig
 from .launchers.process.config import ProcessConfig
 from .launchers.torchrun.config import TorchrunConfig
 
@@ -41,10 +45,13 @@ cs.store(group="backend", name=LLMSwarmConfig.name, node=LLMSwarmConfig)
 cs.store(group="benchmark", name=TrainingConfig.name, node=TrainingConfig)
 cs.store(group="benchmark", name=InferenceConfig.name, node=InferenceConfig)
 cs.store(group="benchmark", name=EnergyStarConfig.name, node=EnergyStarConfig)
+cs.store(group="benchmark", name=StartupConfig.name, node=StartupConfig)
+cs.store(group="benchmark", name=BuildConfig.name, node=BuildConfig)
 # launchers configurations
 cs.store(group="launcher", name=InlineConfig.name, node=InlineConfig)
 cs.store(group="launcher", name=ProcessConfig.name, node=ProcessConfig)
 cs.store(group="launcher", name=TorchrunConfig.name, node=TorchrunConfig)
+cs.store(group="launcher", name=PoolConfig.name, node=PoolConfig)
 
 
 # optimum-benchmark
@@ -60,7 +67,27 @@ def benchmark_cli(experiment_config: DictConfig) -> None:
 
     # Instantiate the experiment configuration and trigger its __post_init__
     experiment_config: ExperimentConfig = OmegaConf.to_object(experiment_config)
+
+    if os.environ.get("BENCHMARK_JOURNAL", None) is not None:
+        # the journal is shared by the runs of a sweep, which change the working directory
+        journal = Journal(hydra.utils.to_absolute_path(os.environ["BENCHMARK_JOURNAL"]))
+
+        if not journal.should_run(experiment_config) and os.environ.get("OVERRIDE_BENCHMARKS", "0") != "1":
+            LOGGER.warning(
+                "Experiment is done or failed recently according to the journal. If you want to override it, "
+                "set the environment variable OVERRIDE_BENCHMARKS=1"
+            )
+            return
+    else:
+        journal = None
+
     experiment_config.save_json("experiment_config.json")
 
-    benchmark_report: BenchmarkReport = launch(experiment_config=experiment_config)
-    benchmark_report.save_json("benchmark_report.json")
+    if journal is not None:
+        # the experiment is only done once its report is saved
+        with journal.record(experiment_config) as record:
+            record.report = launch(experiment_config=experiment_config)
+            record.report.save_json("benchmark_report.json")
+    else:
+        benchmark_report: BenchmarkReport = launch(experiment_config=experiment_config)
+        benchmark_report.save_json("benchmark_report.json")
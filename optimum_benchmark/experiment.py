@@ -1,16 +1,30 @@
+import gc
+import hashlib
+import json
 import os
-from dataclasses import dataclass, field
+import pickle
+import sys
+from dataclasses import asdict, dataclass, field
 from logging import getLogger
 from tempfile import TemporaryDirectory
-from typing import TYPE_CHECKING, Any, Dict, Type
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, Union
 
 from .backends.config import BackendConfig
 from .benchmarks.config import BenchmarkConfig
 from .benchmarks.report import BenchmarkReport
+from .heartbeat_utils import heartbeat, heartbeats
 from .hub_utils import PushToHubMixin, classproperty
 from .import_utils import get_hf_libs_info
 from .launchers.config import LauncherConfig
-from .system_utils import get_system_info
+from .metadata_cache import log_metadata_cache_stats
+from .system_utils import get_noise_audit, get_system_info, screen_noise
+from .trackers.memory_estimator import (
+    MemoryEstimate,
+    estimate_memory,
+    get_available_memory,
+    get_required_memory,
+    screen_memory,
+)
 
 if TYPE_CHECKING:
     # avoid importing any torch to be able to set
@@ -50,26 +64,202 @@ def run(benchmark_config: BenchmarkConfig, backend_config: BackendConfig) -> Ben
     Runs a benchmark using specified backend and benchmark configurations
     """
 
-    # Allocate requested backend
-    backend_factory: Type[Backend] = get_class(backend_config._target_)
-    backend: Backend = backend_factory(backend_config)
-
     # Allocate requested benchmark
     benchmark_factory: Type[Benchmark] = get_class(benchmark_config._target_)
     benchmark: Benchmark = benchmark_factory(benchmark_config)
 
+    # Allocate requested backend (through the benchmark, which can track its startup)
+    heartbeat("load")
+    with heartbeats():
+        backend: Backend = benchmark.allocate_backend(backend_config)
+
     # Benchmark the backend
+    heartbeat("measure")
     benchmark.run(backend)
     report = benchmark.get_report()
 
+    if is_worker_process():
+        log_metadata_cache_stats()
+
     return report
 
 
-def launch(experiment_config: ExperimentConfig) -> BenchmarkReport:
+def run_group(
+    benchmark_configs: List[BenchmarkConfig], backend_config: BackendConfig, reports_dir: Optional[str] = None
+) -> List[BenchmarkReport]:
     """
-    Runs an experiment using specified launcher configuration/logic
+    Runs several benchmarks on the same backend, which is only allocated once (through the first benchmark), the report
+    of each benchmark is also saved in `reports_dir` as soon as it completes, to be recovered if the group is killed
     """
 
+    backend: Backend = None
+    reports: List[BenchmarkReport] = []
+
+    for benchmark_config in benchmark_configs:
+        # Allocate requested benchmark
+        benchmark_factory: Type[Benchmark] = get_class(benchmark_config._target_)
+        benchmark: Benchmark = benchmark_factory(benchmark_config)
+
+        if backend is None:
+            heartbeat("load")
+            with heartbeats():
+                backend = benchmark.allocate_backend(backend_config)
+        else:
+            LOGGER.info("Resetting backend state for the next benchmark.")
+            reset_backend_state(backend)
+
+        # Benchmark the backend
+        heartbeat("measure")
+        benchmark.run(backend)
+        reports.append(benchmark.get_report())
+
+        if reports_dir is not None:
+            save_group_report(reports_dir, len(reports) - 1, reports[-1])
+
+    if is_worker_process():
+        log_metadata_cache_stats()
+
+    return reports
+
+
+def is_worker_process() -> bool:
+    # whether the benchmark runs in a process spawned by the launcher, rather than in the main benchmark process
+    return os.getpid() != int(os.environ.get("BENCHMARK_PID", os.getpid()))
+
+
+def save_group_report(reports_dir: str, index: int, report: BenchmarkReport) -> None:
+    # each rank of a distributed launcher saves its own report, they're merged when loaded
+    report_path = os.path.join(reports_dir, f"{index}.{os.environ.get('RANK', '0')}.pkl")
+
+    with open(f"{report_path}.tmp", "wb") as f:
+        pickle.dump(report, f)
+    os.replace(f"{report_path}.tmp", report_path)
+
+
+def load_group_report(reports_dir: str, index: int) -> Optional[BenchmarkReport]:
+    """
+    Loads the report saved by `run_group` for the benchmark at the given index, merged across ranks, None if the
+    benchmark didn't complete
+    """
+
+    report_files = [name for name in os.listdir(reports_dir) if name.startswith(f"{index}.") and name.endswith(".pkl")]
+    reports = []
+
+    for report_file in sorted(report_files, key=lambda name: int(name.split(".")[1])):
+        with open(os.path.join(reports_dir, report_file), "rb") as f:
+            reports.append(pickle.load(f))
+
+    if len(reports) == 0:
+        return None
+
+    return reports[0].aggregate(reports) if len(reports) > 1 else reports[0]
+
+
+def reset_backend_state(backend: "Backend") -> None:
+    """
+    Resets the state a benchmark can leave behind it (random generators, garbage, cached device memory and its peak
+    statistics), trackers are created by each benchmark
+    """
+
+    backend.seed()
+    gc.collect()
+
+    if "torch" in sys.modules:
+        import torch
+
+        if torch.cuda.is_initialized():
+            torch.cuda.synchronize()
+            torch.cuda.empty_cache()
+            torch.cuda.reset_peak_memory_stats()
+
+
+def get_experiment_group_key(experiment_config: ExperimentConfig) -> str:
+    """
+    Returns the canonical hash of the backend and launcher configs of an experiment, experiments with the same key can
+    share a backend (unless their benchmark modifies it or measures its allocation)
+    """
+
+    key = {"backend": asdict(experiment_config.backend), "launcher": asdict(experiment_config.launcher)}
+
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def group_experiments(experiment_configs: List[ExperimentConfig]) -> List[List[int]]:
+    """
+    Groups the indices of the experiments that can share a backend, in the order of their first experiment
+    """
+
+    groups: Dict[str, List[int]] = {}
+
+    for index, experiment_config in enumerate(experiment_configs):
+        if experiment_config.benchmark.backend_reusable:
+            key = get_experiment_group_key(experiment_config)
+        else:
+            key = f"experiment-{index}"
+
+        groups.setdefault(key, []).append(index)
+
+    return list(groups.values())
+
+
+def screen(experiment_config: ExperimentConfig) -> Dict[str, MemoryEstimate]:
+    """
+    Estimates the peak memory of an experiment and checks it against the available memory
+    """
+
+    LOGGER.info("Screening experiment's memory requirements.")
+
+    try:
+        memory_estimates = estimate_memory(experiment_config.backend, experiment_config.benchmark)
+    except Exception as e:
+        LOGGER.warning(f"\t+ Could not estimate memory requirements: {e}")
+        return {}
+
+    if memory_estimates:
+        required_memory = get_required_memory(memory_estimates, experiment_config.launcher)
+        available_memory = get_available_memory(experiment_config.backend)
+        screen_memory(required_memory, available_memory, action=experiment_config.launcher.memory_screening_action)
+
+    return memory_estimates
+
+
+def launch(
+    experiment_config: Union[ExperimentConfig, List[ExperimentConfig]],
+) -> Union[BenchmarkReport, List[Union[BenchmarkReport, Exception]]]:
+    """
+    Runs an experiment using specified launcher configuration/logic, or a list of experiments, in which case those
+    with the same backend and launcher configs are run on a backend that's only loaded once, and returns their reports.
+    A group of experiments that fails (e.g. screened out) doesn't stop the others, its experiments get its error
+    instead of a report
+    """
+
+    if isinstance(experiment_config, list):
+        reports: List[Union[BenchmarkReport, Exception]] = [None] * len(experiment_config)
+
+        for group in group_experiments(experiment_config):
+            LOGGER.info(f"Launching group of {len(group)} experiment(s) sharing a backend.")
+
+            try:
+                group_reports = launch_group([experiment_config[index] for index in group])
+            except Exception as error:
+                LOGGER.error(f"\t+ Group of {len(group)} experiment(s) failed: {error}")
+                group_reports = [error] * len(group)
+
+            for index, report in zip(group, group_reports):
+                reports[index] = report
+
+        return reports
+
+    return launch_group([experiment_config])[0]
+
+
+def launch_group(experiment_configs: List[ExperimentConfig]) -> List[BenchmarkReport]:
+    """
+    Runs experiments with the same backend and launcher configs in a single launch
+    """
+
+    experiment_config = experiment_configs[0]
+
     # We keep track of the main benchmark process PID to be able to
     # track its memory usage in isolated and distributed setups
     os.environ["BENCHMARK_PID"] = str(os.getpid())
@@ -83,11 +273,54 @@ def launch(experiment_config: ExperimentConfig) -> BenchmarkReport:
         os.chdir(tmpdir.name)
 
     try:
-        # Allocate requested launcher
         launcher_config: LauncherConfig = experiment_config.launcher
+
+        if launcher_config.noise_screening:
+            # Audit the host right before launching, the audit of the environment can be stale in a sweep
+            LOGGER.info("Screening host's noise sources.")
+            noise_audit = get_noise_audit()
+            for config in experiment_configs:
+                config.environment["noise_audit"] = noise_audit
+            screen_noise(
+                noise_audit,
+                threshold=launcher_config.noise_screening_threshold,
+                action=launcher_config.noise_screening_action,
+            )
+
+        if launcher_config.memory_screening:
+            # Screen the experiments before any model is loaded
+            memory_estimates = [screen(config) for config in experiment_configs]
+        else:
+            memory_estimates = [{} for _ in experiment_configs]
+
+        # Allocate requested launcher
         launcher_factory: Type[Launcher] = get_class(launcher_config._target_)
         launcher: Launcher = launcher_factory(experiment_config.launcher)
-        report = launcher.launch(run, experiment_config.benchmark, experiment_config.backend)
+
+        if len(experiment_configs) == 1:
+            reports = [launcher.launch(run, experiment_config.benchmark, experiment_config.backend)]
+        else:
+            benchmark_configs = [config.benchmark for config in experiment_configs]
+
+            with TemporaryDirectory() as reports_dir:
+                reports = launcher.launch(run_group, benchmark_configs, experiment_config.backend, reports_dir)
+
+                if not isinstance(reports, list):
+                    # the group's worker was killed, the experiments that completed before saved their reports
+                    timeout = reports.experiment.timeout
+                    reports = [load_group_report(reports_dir, index) for index in range(len(experiment_configs))]
+                    reports = [report or launcher.get_timeout_report(timeout) for report in reports]
+
+        # workers log the metadata resolved while allocating the backend, the main process the one resolved by configs
+        log_metadata_cache_stats()
+
+        for report, experiment_memory_estimates in zip(reports, memory_estimates):
+            if experiment_memory_estimates:
+                for target, memory_estimate in experiment_memory_estimates.items():
+                    if hasattr(report, target):
+                        getattr(report, target).memory_estimate = memory_estimate
+                report.log_memory_estimate()
+
         error = None
     except Exception as e:
         LOGGER.error("Error during experiment")
@@ -101,4 +334,4 @@ def launch(experiment_config: ExperimentConfig) -> BenchmarkReport:
     if error is not None:
         raise error
 
-    return report
+    return reports
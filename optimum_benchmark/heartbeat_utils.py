@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from logging import getLogger
+from typing import List, Literal, Optional
+
+LOGGER = getLogger("heartbeat")
+
+# phases of an experiment's worker, declared with `heartbeat(phase)`
+PHASES = ["load", "warmup", "measure"]
+
+# directory in which the workers write their heartbeats, set by the watchdog of the launcher
+HEARTBEAT_DIR_ENV = "BENCHMARK_HEARTBEAT_DIR"
+# heartbeats without a phase are written at most once per interval
+HEARTBEAT_INTERVAL = 1.0
+
+TIMEOUT_UNIT = "s"
+Timeout_Unit_Literal = Literal["s"]
+
+
+@dataclass
+class Timeout:
+    unit: Timeout_Unit_Literal
+
+    phase: str
+    # either "phase" (the phase took longer than its timeout) or "heartbeat" (the worker stopped making progress)
+    reason: str
+    limit: float
+    elapsed: float
+
+    @staticmethod
+    def aggregate(timeouts: List["Timeout"]) -> "Timeout":
+        if len(timeouts) == 0:
+            raise ValueError("No timeouts to aggregate")
+        elif any(timeout is None for timeout in timeouts):
+            raise ValueError("Some timeouts are missing")
+
+        return max(timeouts, key=lambda timeout: timeout.elapsed)
+
+    def log(self, prefix: str = "experiment"):
+        LOGGER.info(f"\t\t+ {prefix} timeout:")
+        LOGGER.info(f"\t\t\t- phase: {self.phase}")
+        LOGGER.info(f"\t\t\t- reason: {self.reason}")
+        LOGGER.info(f"\t\t\t- limit: {self.limit:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t- elapsed: {self.elapsed:f} ({self.unit})")
+
+
+# heartbeat state of the worker process
+CURRENT_PHASE: Optional[str] = None
+PHASE_START: Optional[float] = None
+LAST_HEARTBEAT = 0.0
+
+
+def heartbeat(phase: Optional[str] = None) -> None:
+    """
+    Signals the launcher's watchdog that the worker is alive and making progress, and optionally that it started a
+    phase (e.g. load, warmup or measure), whose timeout starts over even if it's the same phase as before (e.g. the
+    measure phase of the next benchmark of a group). This is a no-op unless the launcher has a watchdog, and is cheap
+    enough to be called after every iteration of a benchmark since heartbeats without a phase are rate limited.
+    """
+
+    global CURRENT_PHASE, PHASE_START, LAST_HEARTBEAT
+
+    now = time.time()
+
+    if phase is None and now - LAST_HEARTBEAT < HEARTBEAT_INTERVAL:
+        return
+
+    heartbeat_dir = os.environ.get(HEARTBEAT_DIR_ENV, None)
+
+    if heartbeat_dir is None or not os.path.isdir(heartbeat_dir):
+        return
+
+    if phase is not None:
+        CURRENT_PHASE, PHASE_START = phase, now
+
+    LAST_HEARTBEAT = now
+
+    heartbeat_file = os.path.join(heartbeat_dir, f"{os.getpid()}.json")
+    with open(f"{heartbeat_file}.{threading.get_ident()}.tmp", "w") as f:
+        json.dump({"phase": CURRENT_PHASE, "phase_start": PHASE_START, "time": now}, f)
+    os.replace(f"{heartbeat_file}.{threading.get_ident()}.tmp", heartbeat_file)
+
+
+@contextmanager
+def heartbeats(interval: float = HEARTBEAT_INTERVAL):
+    """
+    Sends heartbeats from a background thread while inside the context, for steps that can't send them themselves
+    (e.g. loading a model), so that only the timeout of their phase applies to them.
+    """
+
+    if os.environ.get(HEARTBEAT_DIR_ENV, None) is None:
+        yield
+        return
+
+    stop = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(interval):
+            heartbeat()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, fields
+from logging import getLogger
+from typing import Iterator, List, Optional
+
+from .benchmarks.report import BenchmarkReport
+from .experiment import ExperimentConfig
+
+LOGGER = getLogger("journal")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    hash TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    queued_at REAL,
+    started_at REAL,
+    ended_at REAL,
+    duration REAL,
+    error TEXT
+)
+"""
+
+
+@dataclass
+class JournalEntry:
+    hash: str
+    name: str
+    state: str
+    attempts: int
+    queued_at: Optional[float]
+    started_at: Optional[float]
+    ended_at: Optional[float]
+    duration: Optional[float]
+    error: Optional[str]
+
+
+@dataclass
+class JournalRecord:
+    # report of the recorded experiment, an experiment whose report timed out is recorded as failed
+    report: Optional[BenchmarkReport] = None
+
+
+def get_report_error(report: BenchmarkReport) -> Optional[str]:
+    """Returns the error of a report whose experiment was killed by the launcher's watchdog, None otherwise."""
+
+    for target in fields(report):
+        timeout = getattr(getattr(report, target.name), "timeout", None)
+        if timeout is not None:
+            return f"Timeout: {timeout.phase} phase ({timeout.reason}) after {timeout.elapsed:.0f}{timeout.unit}"
+
+    return None
+
+
+def get_experiment_hash(experiment_config: ExperimentConfig) -> str:
+    """
+    Canonical hash of an experiment's backend, launcher and benchmark configs (and name), without its environment, so
+    that a sweep can be resumed on the same machine after its libraries' commits or available memory changed.
+    """
+
+    key = {name: value for name, value in experiment_config.to_dict().items() if name != "environment"}
+
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class Journal:
+    """
+    Local SQLite journal of a sweep's experiments, keyed by their canonical config hash, recording their state (queued,
+    running, done or failed), number of attempts and timings. It lets an interrupted sweep skip its done experiments
+    without any network call, and retry its failed ones with an exponential backoff. Experiments left in the running
+    state were interrupted and are run again. Connections are opened per operation, the journal can be shared by the
+    processes of a sweep.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, backoff: float = 60.0):
+        self.path = path
+        # number of attempts after which a failed experiment is not retried anymore
+        self.max_attempts = max_attempts
+        # delay (in seconds) before retrying an experiment after its first failure, doubled after each failure
+        self.backoff = backoff
+
+        with self.connect() as connection:
+            connection.execute(JOURNAL_SCHEMA)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=60)) as connection:
+            # commits on success and rolls back on error
+            with connection:
+                yield connection
+
+    def get_entry(self, experiment_config: ExperimentConfig) -> Optional[JournalEntry]:
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT * FROM experiments WHERE hash = ?", (get_experiment_hash(experiment_config),)
+            ).fetchone()
+
+        return JournalEntry(*row) if row is not None else None
+
+    def get_entries(self, state: Optional[str] = None) -> List[JournalEntry]:
+        with self.connect() as connection:
+            if state is None:
+                rows = connection.execute("SELECT * FROM experiments").fetchall()
+            else:
+                rows = connection.execute("SELECT * FROM experiments WHERE state = ?", (state,)).fetchall()
+
+        return [JournalEntry(*row) for row in rows]
+
+    def queue(self, experiment_config: ExperimentConfig) -> None:
+        # experiments that are already journaled keep their state
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO experiments (hash, name, state, queued_at) VALUES (?, ?, ?, ?)",
+                (get_experiment_hash(experiment_config), experiment_config.experiment_name, QUEUED, time.time()),
+            )
+
+    def start(self, experiment_config: ExperimentConfig) -> None:
+        self.queue(experiment_config)
+
+        with self.connect() as connection:
+            connection.execute(
+                "UPDATE experiments SET state = ?, attempts = attempts + 1, started_at = ?, ended_at = NULL, "
+                "duration = NULL, error = NULL WHERE hash = ?",
+                (RUNNING, time.time(), get_experiment_hash(experiment_config)),
+            )
+
+    def finish(
+        self,
+        experiment_config: ExperimentConfig,
+        error: Optional[str] = None,
+        report: Optional[BenchmarkReport] = None,
+    ) -> None:
+        ended_at = time.time()
+
+        if error is None and report is not None:
+            error = get_report_error(report)
+
+        with self.connect() as connection:
+            connection.execute(
+                "UPDATE experiments SET state = ?, ended_at = ?, duration = ? - started_at, error = ? WHERE hash = ?",
+                (DONE if error is None else FAILED, ended_at, ended_at, error, get_experiment_hash(experiment_config)),
+            )
+
+    @contextmanager
+    def record(self, experiment_config: ExperimentConfig) -> Iterator[JournalRecord]:
+        """
+        Records an experiment as running, then as done or failed (with its error, which is re-raised). The report set
+        on the yielded record is checked for timeouts, which don't raise.
+        """
+
+        record = JournalRecord()
+        self.start(experiment_config)
+
+        try:
+            yield record
+        except Exception as error:
+            self.finish(experiment_config, error=f"{type(error).__name__}: {error}")
+            raise
+
+        self.finish(experiment_config, report=record.report)
+
+    def should_run(self, experiment_config: ExperimentConfig) -> bool:
+        entry = self.get_entry(experiment_config)
+
+        if entry is None or entry.state in [QUEUED, RUNNING]:
+            return True
+        elif entry.state == DONE:
+            LOGGER.info(f"\t+ Experiment {entry.name} ({entry.hash}) is already done")
+            return False
+        elif entry.attempts >= self.max_attempts:
+            LOGGER.info(f"\t+ Experiment {entry.name} ({entry.hash}) failed {entry.attempts} times, not retrying it")
+            return False
+
+        retry_at = entry.ended_at + self.backoff * 2 ** (entry.attempts - 1)
+        if time.time() < retry_at:
+            LOGGER.info(f"\t+ Experiment {entry.name} ({entry.hash}) failed, retrying it after {time.ctime(retry_at)}")
+            return False
+
+        return True
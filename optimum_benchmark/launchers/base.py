@@ -1,13 +1,20 @@
 from abc import ABC
+from dataclasses import dataclass
 from logging import getLogger
 from typing import Callable, ClassVar, Generic
 
-from ..benchmarks.report import BenchmarkReport
+from ..benchmarks.report import BenchmarkMeasurements, BenchmarkReport
+from ..heartbeat_utils import Timeout
 from .config import LauncherConfigT
 
 LOGGER = getLogger("launcher")
 
 
+@dataclass
+class TimeoutReport(BenchmarkReport):
+    experiment: BenchmarkMeasurements
+
+
 class Launcher(Generic[LauncherConfigT], ABC):
     NAME: ClassVar[str]
 
@@ -19,3 +26,11 @@ class Launcher(Generic[LauncherConfigT], ABC):
 
     def launch(self, worker: Callable, *worker_args) -> BenchmarkReport:
         raise NotImplementedError("Launcher must implement launch method")
+
+    def get_timeout_report(self, timeout: Timeout) -> BenchmarkReport:
+        """Report of an experiment whose worker was killed by the watchdog, the timed out phase is in its timeout."""
+
+        report = TimeoutReport(experiment=BenchmarkMeasurements(timeout=timeout))
+        report.log()
+
+        return report
@@ -1,8 +1,10 @@
+import os
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from logging import getLogger
-from typing import Optional, TypeVar
+from typing import Dict, Optional, TypeVar
 
+from ..heartbeat_utils import PHASES
 from ..system_utils import is_nvidia_system, is_rocm_system
 
 LOGGER = getLogger("launcher")
@@ -15,6 +17,26 @@ class LauncherConfig(ABC):
 
     device_isolation: bool = False
     device_isolation_action: Optional[str] = None
+    # time (in seconds) between two checks of the processes running on the devices
+    device_isolation_interval: float = 0.5
+
+    # monitors the load of other processes on the benchmark's cpus, with the same action as device isolation
+    cpu_isolation: bool = False
+    # percentage of the benchmark's cpus' capacity used by other processes above which the action is triggered
+    cpu_isolation_threshold: float = 10.0
+
+    memory_screening: bool = False
+    memory_screening_action: str = "error"
+
+    # audits the host's noise sources (governor, turbo, smt, thp, numa balancing, load) before launching
+    noise_screening: bool = False
+    noise_screening_threshold: float = 2.0
+    noise_screening_action: str = "error"
+
+    # per-phase timeouts (in seconds) of the workers, e.g. {"load": 600, "measure": 300}
+    timeouts: Dict[str, float] = field(default_factory=dict)
+    # maximum time (in seconds) without heartbeat from a worker before it's considered hung
+    heartbeat_timeout: Optional[float] = None
 
     def __post_init__(self):
         if self.device_isolation and not is_nvidia_system() and not is_rocm_system():
@@ -24,18 +46,53 @@ class LauncherConfig(ABC):
                 "are correctly installed by running `nvidia-smi` or `rocm-smi`."
             )
 
-        if self.device_isolation and self.device_isolation_action is None:
+        if self.device_isolation and self.device_isolation_interval <= 0:
+            raise ValueError(f"`device_isolation_interval` must be positive, got {self.device_isolation_interval}")
+
+        if self.cpu_isolation and not os.path.isfile("/proc/stat"):
+            raise ValueError(
+                "CPU isolation is only supported on Linux systems (it reads /proc/stat). "
+                "Please set `cpu_isolation` to False."
+            )
+
+        if self.cpu_isolation and not 0 < self.cpu_isolation_threshold <= 100:
+            raise ValueError(
+                f"`cpu_isolation_threshold` must be a percentage in (0, 100], got {self.cpu_isolation_threshold}"
+            )
+
+        if (self.device_isolation or self.cpu_isolation) and self.device_isolation_action is None:
             LOGGER.warning(
-                "Device isolation is enabled but no action is specified. "
+                "Device or CPU isolation is enabled but no action is specified. "
                 "Please set `device_isolation_action` to either 'error' or 'warn' "
                 "to specify the action. Defaulting to 'warn'."
             )
             self.device_isolation_action = "warn"
-        elif self.device_isolation and self.device_isolation_action not in {"error", "warn"}:
+        elif (self.device_isolation or self.cpu_isolation) and self.device_isolation_action not in {"error", "warn"}:
             raise ValueError(
                 f"Unsupported device isolation action {self.device_isolation_action}. "
                 "Please set `device_isolation_action` to either 'error' or 'warn'."
             )
 
+        if self.memory_screening and self.memory_screening_action not in {"error", "warn"}:
+            raise ValueError(
+                f"Unsupported memory screening action {self.memory_screening_action}. "
+                "Please set `memory_screening_action` to either 'error' or 'warn'."
+            )
+
+        if self.noise_screening and self.noise_screening_action not in {"error", "warn"}:
+            raise ValueError(
+                f"Unsupported noise screening action {self.noise_screening_action}. "
+                "Please set `noise_screening_action` to either 'error' or 'warn'."
+            )
+
+        for phase, timeout in self.timeouts.items():
+            if phase not in PHASES:
+                raise ValueError(f"Unsupported timeout phase {phase}. Please use one of {PHASES}.")
+            if timeout <= 0:
+                raise ValueError(f"`timeouts.{phase}` must be positive, got {timeout}")
+
+        if self.heartbeat_timeout is not None and self.heartbeat_timeout <= 0:
+            raise ValueError(f"`heartbeat_timeout` must be positive, got {self.heartbeat_timeout}")
+
 
 LauncherConfigT = TypeVar("LauncherConfigT", bound=LauncherConfig)
@@ -13,3 +13,9 @@ class InlineConfig(LauncherConfig):
 
     def __post_init__(self):
         super().__post_init__()
+
+        if self.timeouts or self.heartbeat_timeout is not None:
+            raise ValueError(
+                "Timeouts are not supported by the inline launcher since it can't kill its own process. "
+                "Please use the process, pool or torchrun launcher instead."
+            )
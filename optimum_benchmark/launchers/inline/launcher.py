@@ -4,7 +4,7 @@ from typing import Callable
 
 from ...benchmarks.report import BenchmarkReport
 from ..base import Launcher
-from ..isolation_utils import device_isolation
+from ..isolation_utils import cpu_isolation, device_isolation
 from .config import InlineConfig
 
 LOGGER = getLogger("inline")
@@ -21,8 +21,15 @@ class InlineLauncher(Launcher[InlineConfig]):
             isolated_pid=os.getpid(),
             enabled=self.config.device_isolation,
             action=self.config.device_isolation_action,
+            interval=self.config.device_isolation_interval,
         ):
-            LOGGER.info("\t+ Launching benchmark in the main process.")
-            report = worker(*worker_args)
+            with cpu_isolation(
+                isolated_pid=os.getpid(),
+                enabled=self.config.cpu_isolation,
+                action=self.config.device_isolation_action,
+                threshold=self.config.cpu_isolation_threshold,
+            ):
+                LOGGER.info("\t+ Launching benchmark in the main process.")
+                report = worker(*worker_args)
 
         return report
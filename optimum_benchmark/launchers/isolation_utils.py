@@ -4,7 +4,7 @@ import time
 from contextlib import contextmanager
 from logging import getLogger
 from multiprocessing import Process
-from typing import Set
+from typing import Dict, List, Set, Union
 
 from ..import_utils import is_amdsmi_available, is_psutil_available, is_pynvml_available
 from ..logging_utils import setup_logging
@@ -37,64 +37,98 @@ signal.signal(signal.SIGUSR1, isolation_error_signal_handler)
 signal.signal(signal.SIGUSR2, isolation_warn_signal_handler)
 
 
-def get_nvidia_devices_pids(device_ids: str) -> Set[int]:
-    if not is_pynvml_available():
-        raise ValueError(
-            "The library pynvml is required to get the pids running on NVIDIA GPUs, but is not installed. "
-            "Please install the official and NVIDIA maintained PyNVML library through `pip install nvidia-ml-py`."
-        )
+class NvidiaDevicesMonitor:
+    """Lists the pids running on NVIDIA GPUs, NVML is initialized and the devices' handles are fetched once."""
 
-    pynvml.nvmlInit()
+    def __init__(self, device_ids: str):
+        if not is_pynvml_available():
+            raise ValueError(
+                "The library pynvml is required to get the pids running on NVIDIA GPUs, but is not installed. "
+                "Please install the official and NVIDIA maintained PyNVML library through `pip install nvidia-ml-py`."
+            )
 
-    devices_pids = set()
-    devices_ids = list(map(int, device_ids.split(",")))
+        pynvml.nvmlInit()
+        self.device_handles = [
+            pynvml.nvmlDeviceGetHandleByIndex(device_id) for device_id in map(int, device_ids.split(","))
+        ]
 
-    for device_id in devices_ids:
-        device_handle = pynvml.nvmlDeviceGetHandleByIndex(device_id)
-        device_processes = pynvml.nvmlDeviceGetComputeRunningProcesses(device_handle)
-        for device_process in device_processes:
-            devices_pids.add(device_process.pid)
+    def get_pids(self) -> Set[int]:
+        devices_pids = set()
 
-    pynvml.nvmlShutdown()
+        for device_handle in self.device_handles:
+            for device_process in pynvml.nvmlDeviceGetComputeRunningProcesses(device_handle):
+                devices_pids.add(device_process.pid)
 
-    return devices_pids
+        return devices_pids
 
+    def close(self):
+        pynvml.nvmlShutdown()
 
-def get_amd_devices_pids(device_ids: str) -> Set[int]:
-    if not is_amdsmi_available():
-        raise ValueError(
-            "The library amdsmi is required to get the pids running on AMD GPUs, but is not installed. "
-            "Please install the official and AMD maintained amdsmi library from https://github.com/ROCm/amdsmi."
-        )
 
-    amdsmi.amdsmi_init()
+class AMDDevicesMonitor:
+    """Lists the pids running on AMD GPUs, amdsmi is initialized and the devices' handles are fetched once."""
 
-    devices_pids = set()
-    devices_ids = list(map(int, device_ids.split(",")))
+    def __init__(self, device_ids: str):
+        if not is_amdsmi_available():
+            raise ValueError(
+                "The library amdsmi is required to get the pids running on AMD GPUs, but is not installed. "
+                "Please install the official and AMD maintained amdsmi library from https://github.com/ROCm/amdsmi."
+            )
 
-    processor_handles = amdsmi.amdsmi_get_processor_handles()
-    for device_id in devices_ids:
-        processor_handle = processor_handles[device_id]
-        try:
-            # these functions fail a lot for no apparent reason
-            processes_handles = amdsmi.amdsmi_get_gpu_process_list(processor_handle)
-        except Exception:
-            continue
+        amdsmi.amdsmi_init()
+        processor_handles = amdsmi.amdsmi_get_processor_handles()
+        self.processor_handles = [processor_handles[device_id] for device_id in map(int, device_ids.split(","))]
 
-        for process_handle in processes_handles:
+    def get_pids(self) -> Set[int]:
+        devices_pids = set()
+
+        for processor_handle in self.processor_handles:
             try:
                 # these functions fail a lot for no apparent reason
-                info = amdsmi.amdsmi_get_gpu_process_info(processor_handle, process_handle)
+                processes_handles = amdsmi.amdsmi_get_gpu_process_list(processor_handle)
             except Exception:
                 continue
 
-            if info["memory_usage"]["vram_mem"] == 4096:
-                # not sure why these processes are always present
-                continue
+            for process_handle in processes_handles:
+                try:
+                    # these functions fail a lot for no apparent reason
+                    info = amdsmi.amdsmi_get_gpu_process_info(processor_handle, process_handle)
+                except Exception:
+                    continue
+
+                if info["memory_usage"]["vram_mem"] == 4096:
+                    # not sure why these processes are always present
+                    continue
 
-            devices_pids.add(info["pid"])
+                devices_pids.add(info["pid"])
 
-    amdsmi.amdsmi_shut_down()
+        return devices_pids
+
+    def close(self):
+        amdsmi.amdsmi_shut_down()
+
+
+def get_system_devices_monitor(device_ids: str) -> Union[NvidiaDevicesMonitor, AMDDevicesMonitor]:
+    if is_nvidia_system():
+        return NvidiaDevicesMonitor(device_ids)
+    elif is_rocm_system():
+        return AMDDevicesMonitor(device_ids)
+    else:
+        raise ValueError("get_system_devices_monitor is only supported on NVIDIA and AMD GPUs")
+
+
+def get_nvidia_devices_pids(device_ids: str) -> Set[int]:
+    monitor = NvidiaDevicesMonitor(device_ids)
+    devices_pids = monitor.get_pids()
+    monitor.close()
+
+    return devices_pids
+
+
+def get_amd_devices_pids(device_ids: str) -> Set[int]:
+    monitor = AMDDevicesMonitor(device_ids)
+    devices_pids = monitor.get_pids()
+    monitor.close()
 
     return devices_pids
 
@@ -111,7 +145,14 @@ def get_pids_running_on_system_devices(device_ids: str) -> Set[int]:
     return devices_pids
 
 
-def assert_system_devices_isolation(isolated_pid: int, device_ids: str, action: str):
+def is_descendant(pid: int, ancestor_pid: int) -> bool:
+    try:
+        return any(parent.pid == ancestor_pid for parent in psutil.Process(pid).parents())
+    except psutil.NoSuchProcess:
+        return False
+
+
+def assert_system_devices_isolation(isolated_pid: int, device_ids: str, action: str, interval: float = 1.0):
     setup_logging("WARNING")
 
     if action == "error":
@@ -121,24 +162,122 @@ def assert_system_devices_isolation(isolated_pid: int, device_ids: str, action:
     else:
         raise ValueError(f"Unsupported action {action}")
 
+    monitor = get_system_devices_monitor(device_ids)
+    # pids of the isolated process' tree running on the devices, only the new pids on the devices are checked
+    permitted_pids = {isolated_pid}
+
     while psutil.pid_exists(isolated_pid):
-        devices_pids = get_pids_running_on_system_devices(device_ids=device_ids)
-        devices_pids = {pid for pid in devices_pids if psutil.pid_exists(pid)}
-        permitted_pids = {isolated_pid} | {child.pid for child in psutil.Process(isolated_pid).children(recursive=True)}
-        non_permitted_pids = devices_pids - permitted_pids
+        devices_pids = monitor.get_pids()
+        # forgets the exited processes, their pids can be reused by other processes
+        permitted_pids = {isolated_pid} | (permitted_pids & devices_pids)
+        permitted_pids |= {pid for pid in devices_pids - permitted_pids if is_descendant(pid, isolated_pid)}
+        non_permitted_pids = {pid for pid in devices_pids - permitted_pids if psutil.pid_exists(pid)}
 
         if len(non_permitted_pids) > 0:
             LOGGER.warn(f"Found non-permitted process(es) running on system device(s): {non_permitted_pids}")
             LOGGER.warn(f"Sending an action signal `{action}` to the isolated process {isolated_pid}...")
             os.kill(isolated_pid, action_signal)
+            monitor.close()
             LOGGER.warn("Exiting...")
             exit(0)
 
+        time.sleep(interval)
+
+    monitor.close()
+
+
+def get_cpus_busy_time(cpus: List[int]) -> float:
+    """Returns the time (in seconds) the given cpu(s) spent busy since boot, read from /proc/stat."""
+
+    busy_ticks = 0
+
+    with open("/proc/stat", "r") as f:
+        for line in f:
+            name, *fields = line.split()
+            if not name.startswith("cpu") or name == "cpu" or int(name[3:]) not in cpus:
+                continue
+
+            # user, nice, system, idle, iowait, irq, softirq, steal (guest time is included in user time)
+            user, nice, system, _, _, irq, softirq, steal = map(int, fields[:8])
+            busy_ticks += user + nice + system + irq + softirq + steal
+
+    return busy_ticks / os.sysconf("SC_CLK_TCK")
+
+
+def get_processes_cpu_times(cpus: List[int]) -> Dict[int, float]:
+    """Returns the cpu time (in seconds) of the processes that can run on the given cpu(s)."""
+
+    processes_cpu_times = {}
+
+    for process in psutil.process_iter(["cpu_times", "cpu_affinity"]):
+        cpu_times, cpu_affinity = process.info["cpu_times"], process.info["cpu_affinity"]
+
+        if cpu_times is None or cpu_affinity is None or not set(cpu_affinity) & set(cpus):
+            continue
+
+        processes_cpu_times[process.pid] = cpu_times.user + cpu_times.system
+
+    return processes_cpu_times
+
+
+def assert_system_cpus_isolation(isolated_pid: int, action: str, threshold: float):
+    setup_logging("WARNING")
+
+    if action == "error":
+        action_signal = signal.SIGUSR1
+    elif action == "warn":
+        action_signal = signal.SIGUSR2
+    else:
+        raise ValueError(f"Unsupported action {action}")
+
+    cpus = psutil.Process(isolated_pid).cpu_affinity()
+
+    last_time = time.perf_counter()
+    last_busy_time = get_cpus_busy_time(cpus)
+    last_processes_cpu_times = get_processes_cpu_times(cpus)
+
+    while psutil.pid_exists(isolated_pid):
         time.sleep(1)
 
+        try:
+            permitted_pids = {os.getpid(), isolated_pid} | {
+                child.pid for child in psutil.Process(isolated_pid).children(recursive=True)
+            }
+        except psutil.NoSuchProcess:
+            break
+
+        current_time = time.perf_counter()
+        busy_time = get_cpus_busy_time(cpus)
+        processes_cpu_times = get_processes_cpu_times(cpus)
+
+        processes_load = {
+            pid: cpu_time - last_processes_cpu_times[pid]
+            for pid, cpu_time in processes_cpu_times.items()
+            if pid in last_processes_cpu_times
+        }
+        permitted_load = sum(load for pid, load in processes_load.items() if pid in permitted_pids)
+        non_permitted_load = {pid: load for pid, load in processes_load.items() if pid not in permitted_pids}
+
+        # the busy time of the cpus that isn't explained by the benchmark's processes overestimates the competing load
+        # when the benchmark's children exit, the cpu time of the other processes overestimates it when they run on
+        # other cpus, so the competing load is the smallest of the two
+        competing_load = min(busy_time - last_busy_time - permitted_load, sum(non_permitted_load.values()))
+        utilization = 100 * competing_load / ((current_time - last_time) * len(cpus))
+
+        if utilization > threshold:
+            competing_pids = sorted(non_permitted_load, key=non_permitted_load.get, reverse=True)[:5]
+            LOGGER.warn(f"Found non-permitted process(es) using {utilization:.1f}% of the system cpu(s) {cpus}")
+            LOGGER.warn(f"Most competing process(es): {competing_pids}")
+            LOGGER.warn(f"Sending an action signal `{action}` to the isolated process {isolated_pid}...")
+            os.kill(isolated_pid, action_signal)
+            LOGGER.warn("Exiting...")
+            exit(0)
+
+        last_time, last_busy_time, last_processes_cpu_times = current_time, busy_time, processes_cpu_times
+
 
 @contextmanager
-def device_isolation(isolated_pid: int, enabled: bool, action: str):
+def device_isolation(isolated_pid: int, enabled: bool, action: str, interval: float = 1.0):
     if not enabled:
         yield
         return
@@ -161,6 +300,7 @@ def device_isolation(isolated_pid: int, enabled: bool, action: str):
             "isolated_pid": isolated_pid,
             "device_ids": device_ids,
             "action": action,
+            "interval": interval,
         },
         daemon=True,
     )
@@ -176,3 +316,32 @@ def device_isolation(isolated_pid: int, enabled: bool, action: str):
         isolation_process.kill()
         isolation_process.join()
         isolation_process.close()
+
+
+@contextmanager
+def cpu_isolation(isolated_pid: int, enabled: bool, action: str, threshold: float):
+    if not enabled:
+        yield
+        return
+
+    isolation_process = Process(
+        target=assert_system_cpus_isolation,
+        kwargs={
+            "isolated_pid": isolated_pid,
+            "action": action,
+            "threshold": threshold,
+        },
+        daemon=True,
+    )
+    isolation_process.start()
+
+    LOGGER.info(f"\t+ Launched cpu(s) isolation process {isolation_process.pid}")
+    LOGGER.info(f"\t+ Isolating cpu(s) {psutil.Process(isolated_pid).cpu_affinity()} above {threshold}% utilization")
+
+    yield
+
+    if isolation_process.is_alive():
+        LOGGER.info("\t+ Closing cpu(s) isolation process...")
+        isolation_process.kill()
+        isolation_process.join()
+        isolation_process.close()
@@ -0,0 +1,28 @@
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import List, Optional
+
+from ..config import LauncherConfig
+
+LOGGER = getLogger("pool")
+
+PRELOAD_MODULES = ["torch", "transformers", "hydra", "optimum_benchmark.experiment"]
+
+
+@dataclass
+class PoolConfig(LauncherConfig):
+    name: str = "pool"
+    _target_: str = "optimum_benchmark.launchers.pool.launcher.PoolLauncher"
+
+    # a single worker process is kept alive across experiments, since a launch runs one experiment at a time
+    start_method: str = "forkserver"
+    # modules imported once by the forkserver, from which workers are forked
+    preload_modules: List[str] = field(default_factory=lambda: PRELOAD_MODULES)
+    # resident memory (in MB) after which a worker is replaced by a fresh one
+    max_worker_memory: Optional[float] = None
+
+    def __post_init__(self):
+        super().__post_init__()
+
+        if self.start_method not in ["forkserver", "spawn"]:
+            raise ValueError(f"start_method must be one of ['forkserver', 'spawn'], got {self.start_method}")
@@ -0,0 +1,226 @@
+import atexit
+import gc
+import os
+import sys
+import traceback
+from logging import getLogger
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import psutil
+import torch.multiprocessing as mp
+
+from ...benchmarks.report import BenchmarkReport
+from ...logging_utils import setup_logging
+from ..base import Launcher
+from ..isolation_utils import cpu_isolation, device_isolation
+from ..watchdog_utils import watchdog
+from .config import PoolConfig
+
+LOGGER = getLogger("pool")
+
+# environment variables read once by the device runtimes, workers can't switch devices once initialized
+VISIBLE_DEVICES_VARS = ["CUDA_VISIBLE_DEVICES", "ROCR_VISIBLE_DEVICES"]
+
+# worker pools, kept alive across experiments and shared by the launchers of a process with the same pool settings
+WORKER_POOLS: Dict[Tuple, "WorkerPool"] = {}
+
+
+class PoolWorker:
+    def __init__(self, ctx, log_level: int):
+        self.experiments = 0
+        self.visible_devices: Optional[Dict[str, Optional[str]]] = None
+
+        self.connection, worker_connection = ctx.Pipe()
+        self.process = ctx.Process(target=worker_loop, args=(worker_connection, log_level), daemon=True)
+        self.process.start()
+        worker_connection.close()
+
+    def memory(self) -> float:  # in MB
+        return psutil.Process(self.process.pid).memory_info().rss / 1e6
+
+    def run(self, worker: Callable, worker_args: tuple) -> Any:
+        self.connection.send((worker, worker_args, dict(os.environ), os.getcwd()))
+        self.experiments += 1
+
+        # the worker may die without sending anything back (e.g. segfault or oom kill)
+        while not self.connection.poll(1):
+            if not self.process.is_alive():
+                break
+
+        try:
+            status, output = self.connection.recv()
+        except EOFError:
+            self.process.join()
+            raise RuntimeError(f"Pool worker crashed with exit code {self.process.exitcode}")
+
+        if status == "error":
+            raise output
+
+        return output
+
+    def close(self) -> None:
+        if self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=10)
+
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+        self.connection.close()
+
+
+class WorkerPool:
+    """
+    A worker process that stays alive across experiments, to only pay the cost of importing torch, transformers, etc.
+    once per pool instead of once per experiment. The worker is forked from a forkserver that preloads these modules,
+    and is replaced after a crash, a failed experiment, a change of visible devices or when its memory grows past a
+    threshold. Launches are synchronous (experiments run one at a time), so the pool keeps a single warm worker,
+    concurrent experiments are run by separate launches (e.g. jobs of the scheduler), each with its own pool.
+    """
+
+    def __init__(self, config: PoolConfig, log_level: int):
+        self.config = config
+        self.log_level = log_level
+        self.ctx = mp.get_context(self.config.start_method)
+
+        if self.config.start_method == "forkserver":
+            LOGGER.info(f"\t+ Preloading modules {self.config.preload_modules} in forkserver")
+            self.ctx.set_forkserver_preload(self.config.preload_modules)
+
+        self.worker = self.start_worker()
+
+    def start_worker(self) -> PoolWorker:
+        worker = PoolWorker(self.ctx, self.log_level)
+        LOGGER.info(f"\t+ Started pool worker in process {worker.process.pid}")
+        return worker
+
+    def recycle_worker(self, reason: str) -> None:
+        LOGGER.info(f"\t+ Recycling pool worker ({reason})")
+        self.worker.close()
+        self.worker = self.start_worker()
+
+    def run(self, worker: Callable, worker_args: tuple) -> Any:
+        visible_devices = {var: os.environ.get(var, None) for var in VISIBLE_DEVICES_VARS}
+
+        if not self.worker.process.is_alive():
+            self.recycle_worker(reason="dead")
+        elif self.worker.visible_devices is not None and self.worker.visible_devices != visible_devices:
+            self.recycle_worker(reason="visible devices changed")
+
+        self.worker.visible_devices = visible_devices
+        LOGGER.info(f"\t+ Dispatching experiment to pool worker (process {self.worker.process.pid})")
+
+        try:
+            output = self.worker.run(worker, worker_args)
+        except Exception:
+            self.recycle_worker(reason="experiment failed")
+            raise
+
+        if self.config.max_worker_memory is not None and self.worker.memory() > self.config.max_worker_memory:
+            self.recycle_worker(reason=f"memory above {self.config.max_worker_memory} MB")
+
+        return output
+
+    def close(self) -> None:
+        self.worker.close()
+
+
+class PoolLauncher(Launcher[PoolConfig]):
+    NAME = "pool"
+
+    def __init__(self, config: PoolConfig):
+        super().__init__(config)
+
+    def launch(self, worker: Callable, *worker_args) -> BenchmarkReport:
+        pool = get_worker_pool(self.config, log_level=getLogger().getEffectiveLevel())
+
+        with watchdog(self.config.timeouts, self.config.heartbeat_timeout) as dog:
+            with device_isolation(
+                isolated_pid=os.getpid(),
+                enabled=self.config.device_isolation,
+                action=self.config.device_isolation_action,
+                interval=self.config.device_isolation_interval,
+            ):
+                with cpu_isolation(
+                    isolated_pid=os.getpid(),
+                    enabled=self.config.cpu_isolation,
+                    action=self.config.device_isolation_action,
+                    threshold=self.config.cpu_isolation_threshold,
+                ):
+                    try:
+                        report: BenchmarkReport = pool.run(worker, worker_args)
+                    except RuntimeError:
+                        # the killed worker is recycled by the pool
+                        if dog is None or dog.timeout is None:
+                            raise
+
+        if dog is not None and dog.timeout is not None:
+            return self.get_timeout_report(dog.timeout)
+
+        return report
+
+
+def get_worker_pool(config: PoolConfig, log_level: int) -> WorkerPool:
+    key = (config.start_method, tuple(config.preload_modules), config.max_worker_memory)
+
+    if key not in WORKER_POOLS:
+        LOGGER.info("\t+ Creating worker pool")
+        WORKER_POOLS[key] = WorkerPool(config, log_level)
+
+    return WORKER_POOLS[key]
+
+
+@atexit.register
+def close_worker_pools() -> None:
+    for pool in WORKER_POOLS.values():
+        pool.close()
+
+    WORKER_POOLS.clear()
+
+
+def worker_loop(connection, log_level: int) -> None:
+    """
+    Runs the experiments sent by the pool until it's closed, in the environment and working directory of the main
+    process at the time of dispatch, and sends back their output or their exception.
+    """
+
+    setup_logging(log_level, prefix="POOL")
+
+    while True:
+        task = connection.recv()
+
+        if task is None:
+            break
+
+        worker, worker_args, environ, cwd = task
+        os.environ.clear()
+        os.environ.update(environ)
+        os.chdir(cwd)
+
+        try:
+            output = worker(*worker_args)
+        except Exception as error:
+            error_message = f"Experiment failed in pool worker:\n{traceback.format_exc()}"
+            try:
+                connection.send(("error", type(error)(error_message)))
+            except Exception:
+                # the exception can't be pickled or rebuilt from a message
+                connection.send(("error", RuntimeError(error_message)))
+        else:
+            connection.send(("report", output))
+
+        # state left by the experiment (e.g. compiled graphs) shouldn't leak into the next one
+        if "torch" in sys.modules:
+            import torch
+
+            torch._dynamo.reset()
+            if torch.cuda.is_initialized():
+                torch.cuda.empty_cache()
+
+        gc.collect()
+
+    connection.close()
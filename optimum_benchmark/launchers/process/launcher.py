@@ -7,7 +7,8 @@ import torch.multiprocessing as mp
 from ...benchmarks.report import BenchmarkReport
 from ...logging_utils import setup_logging
 from ..base import Launcher
-from ..isolation_utils import device_isolation
+from ..isolation_utils import cpu_isolation, device_isolation
+from ..watchdog_utils import watchdog
 from .config import ProcessConfig
 
 LOGGER = getLogger("process")
@@ -30,22 +31,37 @@ class ProcessLauncher(Launcher[ProcessConfig]):
         queue = ctx.Queue()
         lock = ctx.Lock()
 
-        with device_isolation(
-            isolated_pid=os.getpid(),
-            enabled=self.config.device_isolation,
-            action=self.config.device_isolation_action,
-        ):
-            process_context = mp.start_processes(
-                entrypoint,
-                args=(worker, queue, lock, log_level, *worker_args),
-                start_method=self.config.start_method,
-                daemon=False,
-                join=False,
-                nprocs=1,
-            )
-            LOGGER.info(f"\t+ Launched benchmark in isolated process {process_context.pids()[0]}.")
-            while not process_context.join():
-                pass
+        with watchdog(self.config.timeouts, self.config.heartbeat_timeout) as dog:
+            with device_isolation(
+                isolated_pid=os.getpid(),
+                enabled=self.config.device_isolation,
+                action=self.config.device_isolation_action,
+                interval=self.config.device_isolation_interval,
+            ):
+                with cpu_isolation(
+                    isolated_pid=os.getpid(),
+                    enabled=self.config.cpu_isolation,
+                    action=self.config.device_isolation_action,
+                    threshold=self.config.cpu_isolation_threshold,
+                ):
+                    process_context = mp.start_processes(
+                        entrypoint,
+                        args=(worker, queue, lock, log_level, *worker_args),
+                        start_method=self.config.start_method,
+                        daemon=False,
+                        join=False,
+                        nprocs=1,
+                    )
+                    LOGGER.info(f"\t+ Launched benchmark in isolated process {process_context.pids()[0]}.")
+                    try:
+                        while not process_context.join():
+                            pass
+                    except mp.ProcessExitedException:
+                        if dog is None or dog.timeout is None:
+                            raise
+
+        if dog is not None and dog.timeout is not None:
+            return self.get_timeout_report(dog.timeout)
 
         report: BenchmarkReport = queue.get()
 
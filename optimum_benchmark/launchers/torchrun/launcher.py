@@ -1,17 +1,18 @@
 import os
 from logging import getLogger
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Union
 
 import torch.distributed
 import torch.multiprocessing as mp
 from torch.distributed.elastic.multiprocessing import Std
-from torch.distributed.elastic.multiprocessing.errors import record
+from torch.distributed.elastic.multiprocessing.errors import ChildFailedError, record
 from torch.distributed.launcher.api import LaunchConfig, launch_agent
 
 from ...benchmarks.report import BenchmarkReport
 from ...logging_utils import setup_logging
 from ..base import Launcher
-from ..isolation_utils import device_isolation
+from ..isolation_utils import cpu_isolation, device_isolation
+from ..watchdog_utils import watchdog
 from .config import TorchrunConfig
 
 LOGGER = getLogger("torchrun")
@@ -52,33 +53,66 @@ class TorchrunLauncher(Launcher[TorchrunConfig]):
         queue = ctx.Queue()
         lock = ctx.Lock()
 
-        with device_isolation(
-            isolated_pid=os.getpid(),
-            enabled=self.config.device_isolation,
-            action=self.config.device_isolation_action,
-        ):
-            LOGGER.info(f"\t+ Launching torchrun agent with {self.config.nproc_per_node} worker processes")
-            launch_agent(
-                entrypoint=entrypoint, args=(worker, queue, lock, log_level, *worker_args), config=launch_config
-            )
-
-        reports: List[BenchmarkReport] = []
-
-        while not queue.empty():
-            reports.append(queue.get())
-
-        if len(reports) > 1:
-            LOGGER.info(f"\t+ Merging benchmark reports from {len(reports)} workers")
-            report = reports[0].aggregate(reports)
-        elif len(reports) == 1:
-            report = reports[0]
-        else:
+        with watchdog(self.config.timeouts, self.config.heartbeat_timeout) as dog:
+            with device_isolation(
+                isolated_pid=os.getpid(),
+                enabled=self.config.device_isolation,
+                action=self.config.device_isolation_action,
+                interval=self.config.device_isolation_interval,
+            ):
+                with cpu_isolation(
+                    isolated_pid=os.getpid(),
+                    enabled=self.config.cpu_isolation,
+                    action=self.config.device_isolation_action,
+                    threshold=self.config.cpu_isolation_threshold,
+                ):
+                    LOGGER.info(f"\t+ Launching torchrun agent with {self.config.nproc_per_node} worker processes")
+                    try:
+                        launch_agent(
+                            entrypoint=entrypoint,
+                            args=(worker, queue, lock, log_level, *worker_args),
+                            config=launch_config,
+                        )
+                    except ChildFailedError:
+                        if dog is None or dog.timeout is None:
+                            raise
+
+        if dog is not None and dog.timeout is not None:
+            return self.get_timeout_report(dog.timeout)
+
+        if queue.empty():
+            raise ValueError("No benchmark report was returned by the workers (they're gathered on the node of rank 0)")
+
+        # outputs of all the workers, in rank order
+        outputs: List[Union[BenchmarkReport, List[BenchmarkReport]]] = queue.get()
+
+        if len(outputs) == 0:
             raise ValueError("No benchmark report was returned by the workers")
 
-        # Log the final report
-        report.log()
+        output = merge_outputs(outputs)
 
-        return report
+        # Log the final report(s)
+        for report in output if isinstance(output, list) else [output]:
+            report.log()
+
+        return output
+
+
+def merge_outputs(
+    outputs: List[Union[BenchmarkReport, List[BenchmarkReport]]],
+) -> Union[BenchmarkReport, List[BenchmarkReport]]:
+    """
+    Merges the reports returned by the workers, in rank order, per experiment if they ran a group of experiments
+    """
+
+    if isinstance(outputs[0], list):
+        return [merge_outputs(list(reports)) for reports in zip(*outputs)]
+
+    if len(outputs) > 1:
+        LOGGER.info(f"\t+ Merging benchmark reports from {len(outputs)} workers")
+        return outputs[0].aggregate(outputs)
+
+    return outputs[0]
 
 
 @record
@@ -97,8 +131,14 @@ def entrypoint(worker, queue, lock, log_level, *worker_args):
     output = worker(*worker_args)
 
     torch.distributed.barrier()
+
+    # the reports are gathered on rank 0 in rank order, for the per-rank aggregation of their measurements
+    outputs = [None] * torch.distributed.get_world_size() if rank == 0 else None
+    torch.distributed.gather_object(output, outputs, dst=0)
+
     torch.distributed.destroy_process_group()
 
-    lock.acquire()
-    queue.put(output)
-    lock.release()
+    if rank == 0:
+        lock.acquire()
+        queue.put(outputs)
+        lock.release()
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging import getLogger
+from tempfile import TemporaryDirectory
+from typing import Dict, Optional
+
+import psutil
+
+from ..heartbeat_utils import HEARTBEAT_DIR_ENV, TIMEOUT_UNIT, Timeout
+
+LOGGER = getLogger("watchdog")
+
+WATCHDOG_INTERVAL = 1.0
+
+
+class Watchdog:
+    """
+    Checks the heartbeats of the workers of a launcher: a worker that spent more than its phase's timeout in a phase,
+    or that didn't send a heartbeat for more than the heartbeat timeout, is considered hung, and is killed along with
+    its children (e.g. containers' clients, compile workers) so that the launcher can return a timeout report.
+    """
+
+    def __init__(self, heartbeat_dir: str, timeouts: Dict[str, float], heartbeat_timeout: Optional[float] = None):
+        self.heartbeat_dir = heartbeat_dir
+        self.timeouts = timeouts
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self.timeout: Optional[Timeout] = None
+
+    def check(self) -> None:
+        now = time.time()
+
+        for heartbeat_file in os.listdir(self.heartbeat_dir):
+            if not heartbeat_file.endswith(".json"):
+                continue
+
+            pid = int(heartbeat_file[: -len(".json")])
+            if not psutil.pid_exists(pid):
+                continue
+
+            try:
+                with open(os.path.join(self.heartbeat_dir, heartbeat_file), "r") as f:
+                    beat = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            phase = beat["phase"]
+
+            if phase in self.timeouts and now - beat["phase_start"] > self.timeouts[phase]:
+                timeout = Timeout(
+                    unit=TIMEOUT_UNIT,
+                    phase=phase,
+                    reason="phase",
+                    limit=self.timeouts[phase],
+                    elapsed=now - beat["phase_start"],
+                )
+            elif self.heartbeat_timeout is not None and now - beat["time"] > self.heartbeat_timeout:
+                timeout = Timeout(
+                    unit=TIMEOUT_UNIT,
+                    phase=phase,
+                    reason="heartbeat",
+                    limit=self.heartbeat_timeout,
+                    elapsed=now - beat["time"],
+                )
+            else:
+                continue
+
+            LOGGER.error(f"\t+ Worker {pid} timed out in {phase} phase ({timeout.reason}), killing its process tree")
+            self.timeout = timeout
+            kill_process_tree(pid)
+            return
+
+
+def kill_process_tree(pid: int) -> None:
+    try:
+        process = psutil.Process(pid)
+        processes = process.children(recursive=True) + [process]
+    except psutil.NoSuchProcess:
+        return
+
+    for process in processes:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+    psutil.wait_procs(processes, timeout=10)
+
+
+@contextmanager
+def watchdog(timeouts: Dict[str, float], heartbeat_timeout: Optional[float] = None):
+    """
+    Watches the heartbeats of the workers started inside the context (which inherit the heartbeat directory through
+    the environment) in a background thread. Yields the watchdog, whose `timeout` is set if a worker was killed, or
+    None if no timeout is configured.
+    """
+
+    if not timeouts and heartbeat_timeout is None:
+        yield None
+        return
+
+    heartbeat_dir = TemporaryDirectory()
+    os.environ[HEARTBEAT_DIR_ENV] = heartbeat_dir.name
+
+    watcher = Watchdog(heartbeat_dir.name, timeouts=timeouts, heartbeat_timeout=heartbeat_timeout)
+    stop = threading.Event()
+
+    def watch() -> None:
+        while not stop.wait(WATCHDOG_INTERVAL) and watcher.timeout is None:
+            watcher.check()
+
+    thread = threading.Thread(target=watch, daemon=True)
+    thread.start()
+    LOGGER.info(f"\t+ Watching workers with timeouts {timeouts} and heartbeat timeout {heartbeat_timeout}")
+
+    try:
+        yield watcher
+    finally:
+        stop.set()
+        thread.join()
+        os.environ.pop(HEARTBEAT_DIR_ENV, None)
+        heartbeat_dir.cleanup()
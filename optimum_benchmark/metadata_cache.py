@@ -0,0 +1,153 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+import time
+from logging import getLogger
+from typing import Any, Callable, Dict, Optional
+
+LOGGER = getLogger("metadata-cache")
+
+# the cache is enabled by setting METADATA_CACHE_DIR, entries are refreshed after METADATA_CACHE_TTL seconds
+# unless in offline mode (METADATA_CACHE_OFFLINE=1 or HF_HUB_OFFLINE=1), where entries never expire
+DEFAULT_METADATA_CACHE_TTL = 24 * 60 * 60
+METADATA_CACHE_ENTRY_FILE = "entry.json"
+METADATA_CACHE_VALUE_FILE = "value.json"
+# credentials aren't written in the cache, only their hash is part of the entry's key
+METADATA_CACHE_SECRET_KWARGS = ["token", "use_auth_token"]
+
+# number and total duration of cache hits and misses, per metadata name
+METADATA_CACHE_STATS: Dict[str, Dict[str, float]] = {}
+
+
+def get_metadata_cache_dir() -> Optional[str]:
+    return os.environ.get("METADATA_CACHE_DIR", None)
+
+
+def get_metadata_cache_ttl() -> float:
+    return float(os.environ.get("METADATA_CACHE_TTL", DEFAULT_METADATA_CACHE_TTL))
+
+
+def is_metadata_cache_offline() -> bool:
+    return os.environ.get("METADATA_CACHE_OFFLINE", "0") == "1" or os.environ.get("HF_HUB_OFFLINE", "0") == "1"
+
+
+def get_metadata_cache_stats() -> Dict[str, Dict[str, float]]:
+    return METADATA_CACHE_STATS
+
+
+def log_metadata_cache_stats() -> None:
+    for name, stats in METADATA_CACHE_STATS.items():
+        LOGGER.info(
+            f"\t+ Metadata cache {name}: {stats['hits']} hit(s) in {stats['hits_time']:.3f}s, "
+            f"{stats['misses']} miss(es) in {stats['misses_time']:.3f}s"
+        )
+
+
+def save_json(value: Any, path: str) -> None:
+    with open(os.path.join(path, METADATA_CACHE_VALUE_FILE), "w") as f:
+        json.dump(value, f)
+
+
+def load_json(path: str, **kwargs) -> Any:
+    with open(os.path.join(path, METADATA_CACHE_VALUE_FILE), "r") as f:
+        return json.load(f)
+
+
+def save_pretrained(value: Any, path: str) -> None:
+    value.save_pretrained(path)
+
+
+def record(name: str, outcome: str, duration: float) -> None:
+    stats = METADATA_CACHE_STATS.setdefault(name, {"hits": 0, "misses": 0, "hits_time": 0.0, "misses_time": 0.0})
+    stats[outcome] += 1
+    stats[f"{outcome}_time"] += duration
+
+
+def is_fresh(entry_dir: str) -> bool:
+    entry_file = os.path.join(entry_dir, METADATA_CACHE_ENTRY_FILE)
+
+    if not os.path.isfile(entry_file):
+        return False
+
+    if is_metadata_cache_offline():
+        return True
+
+    with open(entry_file, "r") as f:
+        created = json.load(f)["created"]
+
+    return time.time() - created < get_metadata_cache_ttl()
+
+
+def store(entry_dir: str, key: Dict[str, Any], value: Any, save: Callable[[Any, str], None]) -> None:
+    tmp_entry_dir = f"{entry_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_entry_dir, ignore_errors=True)
+    os.makedirs(tmp_entry_dir)
+
+    save(value, tmp_entry_dir)
+    with open(os.path.join(tmp_entry_dir, METADATA_CACHE_ENTRY_FILE), "w") as f:
+        json.dump({"key": key, "created": time.time()}, f, default=str)
+
+    # replaces the stale entry, if any
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    try:
+        os.rename(tmp_entry_dir, entry_dir)
+    except OSError:
+        # already stored by a concurrent run
+        shutil.rmtree(tmp_entry_dir, ignore_errors=True)
+
+
+def cached_metadata(
+    name: str, save: Callable[[Any, str], None] = save_json, load: Callable[..., Any] = load_json
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Caches the metadata (e.g. config, processor, inferred task) resolved from the Hugging Face Hub by a function whose
+    first argument is a model id, in a local directory keyed by the function's arguments (credentials such as `token`
+    are part of the key's hash but never written to the cache). Values are stored with `save`
+    and loaded back with `load(path, **kwargs)`. Local models, forced downloads and failed resolutions aren't cached.
+    """
+
+    def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(function)
+        def wrapper(model: str, *args, **kwargs) -> Any:
+            cache_dir = get_metadata_cache_dir()
+
+            if cache_dir is None or os.path.exists(model) or kwargs.get("force_download", False):
+                return function(model, *args, **kwargs)
+
+            secrets = {kwarg: value for kwarg, value in kwargs.items() if kwarg in METADATA_CACHE_SECRET_KWARGS}
+            public_kwargs = {kwarg: value for kwarg, value in kwargs.items() if kwarg not in secrets}
+            key = {"name": name, "model": model, "args": args, "kwargs": public_kwargs}
+            key_hash = hashlib.sha256(
+                json.dumps({**key, "secrets": secrets}, sort_keys=True, default=str).encode()
+            ).hexdigest()[:16]
+            entry_dir = os.path.join(cache_dir, name, key_hash)
+
+            start = time.perf_counter()
+            if is_fresh(entry_dir):
+                try:
+                    value = load(entry_dir, **kwargs)
+                except Exception as error:
+                    LOGGER.warning(f"\t+ Could not load {name} of {model} from metadata cache: {error}")
+                else:
+                    duration = time.perf_counter() - start
+                    LOGGER.info(f"\t+ Loaded {name} of {model} from metadata cache in {duration:.3f}s")
+                    record(name, "hits", duration)
+                    return value
+
+            value = function(model, *args, **kwargs)
+            duration = time.perf_counter() - start
+            LOGGER.info(f"\t+ Resolved {name} of {model} in {duration:.3f}s (metadata cache miss)")
+            record(name, "misses", duration)
+
+            try:
+                store(entry_dir, key, value, save)
+            except Exception as error:
+                LOGGER.warning(f"\t+ Could not store {name} of {model} in metadata cache: {error}")
+
+            return value
+
+        return wrapper
+
+    return decorator
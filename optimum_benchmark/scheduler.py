@@ -0,0 +1,249 @@
+import os
+import queue
+import time
+import traceback
+from dataclasses import dataclass, field
+from logging import getLogger
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional
+
+from .benchmarks.report import BenchmarkReport
+from .experiment import ExperimentConfig, launch
+from .journal import Journal
+from .logging_utils import setup_logging
+from .system_utils import get_cpu_available_ram_mb, get_system_gpu_device_ids, is_nvidia_system, is_rocm_system
+from .trackers.memory_estimator import estimate_memory, get_required_memory
+
+LOGGER = getLogger("scheduler")
+
+
+@dataclass
+class Job:
+    experiment_config: ExperimentConfig
+
+    # number of cpu cores the job is pinned to
+    cpus: int = 1
+    # ram reserved for the job (in MB), estimated from the model's config for cpu experiments if not specified
+    memory: Optional[float] = None
+    # number of devices the job gets, defaults to the number of device ids of its backend on cuda
+    devices: Optional[int] = None
+
+    def __post_init__(self):
+        if self.cpus < 1:
+            raise ValueError(f"`cpus` must be at least 1, got {self.cpus}")
+
+        backend_config = self.experiment_config.backend
+
+        if self.devices is None:
+            if backend_config.device == "cuda":
+                self.devices = len(backend_config.device_ids.split(","))
+            else:
+                self.devices = 0
+
+        if self.memory is None:
+            self.memory = 0.0
+
+            if backend_config.device == "cpu":
+                try:
+                    estimates = estimate_memory(backend_config, self.experiment_config.benchmark)
+                except Exception as e:
+                    LOGGER.warning(f"\t+ Could not estimate memory requirements of a job: {e}")
+                    estimates = {}
+
+                if estimates:
+                    self.memory = get_required_memory(estimates, self.experiment_config.launcher)
+
+
+@dataclass
+class JobResult:
+    job: Job
+    index: int
+
+    cores: List[int]
+    device_ids: Optional[str]
+    duration: float  # in seconds
+
+    report: Optional[BenchmarkReport] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Allocation:
+    cores: List[int]
+    memory: float
+    device_ids: List[str] = field(default_factory=list)
+
+
+class Scheduler:
+    """
+    Runs experiments concurrently on disjoint resources of the host: each job gets its own cpu cores (through cpu
+    affinity), ram budget and devices (through CUDA_VISIBLE_DEVICES/ROCR_VISIBLE_DEVICES), and runs in its own process.
+    Jobs are started in order as soon as their resources are free (later jobs that fit can start before earlier ones
+    that don't), and their results are yielded as they finish. With a journal, jobs that are done (or failed recently)
+    are skipped and the state of the others is recorded, which makes the sweep resumable.
+    """
+
+    def __init__(
+        self,
+        jobs: List[Job],
+        cores: Optional[List[int]] = None,
+        memory: Optional[float] = None,
+        device_ids: Optional[str] = None,
+        journal: Optional[Journal] = None,
+    ):
+        self.jobs = jobs
+        self.journal = journal
+
+        if cores is None:
+            cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count()))
+        if memory is None:
+            memory = get_cpu_available_ram_mb()
+        if device_ids is None:
+            # the visible devices of this process were overwritten by the jobs' backend configs
+            device_ids = get_system_gpu_device_ids() if any(job.devices > 0 for job in jobs) else ""
+
+        self.free_cores = list(cores)
+        self.free_memory = memory
+        self.free_device_ids = [device_id for device_id in device_ids.split(",") if device_id != ""]
+
+        for job in self.jobs:
+            if job.cpus > len(cores) or job.memory > memory or job.devices > len(self.free_device_ids):
+                raise ValueError(
+                    f"Job {job.experiment_config.experiment_name} requires {job.cpus} cores, {job.memory} MB of RAM "
+                    f"and {job.devices} devices, which is more than the host's {len(cores)} cores, {memory} MB of RAM "
+                    f"and {len(self.free_device_ids)} devices."
+                )
+
+    def allocate(self, job: Job) -> Optional[Allocation]:
+        if job.cpus > len(self.free_cores) or job.memory > self.free_memory or job.devices > len(self.free_device_ids):
+            return None
+
+        allocation = Allocation(
+            cores=self.free_cores[: job.cpus],
+            memory=job.memory,
+            device_ids=self.free_device_ids[: job.devices],
+        )
+
+        self.free_cores = self.free_cores[job.cpus :]
+        self.free_memory -= job.memory
+        self.free_device_ids = self.free_device_ids[job.devices :]
+
+        return allocation
+
+    def release(self, allocation: Allocation) -> None:
+        self.free_cores = sorted(self.free_cores + allocation.cores)
+        self.free_memory += allocation.memory
+        self.free_device_ids = sorted(self.free_device_ids + allocation.device_ids, key=int)
+
+    def run(self) -> Iterator[JobResult]:
+        ctx = get_context("spawn")
+        results = ctx.Queue()
+        log_level = getLogger().getEffectiveLevel()
+
+        pending = list(range(len(self.jobs)))
+        running: Dict[int, tuple] = {}
+
+        if self.journal is not None:
+            pending = [index for index in pending if self.journal.should_run(self.jobs[index].experiment_config)]
+            for index in pending:
+                self.journal.queue(self.jobs[index].experiment_config)
+
+        while pending or running:
+            for index in list(pending):
+                allocation = self.allocate(self.jobs[index])
+
+                if allocation is None:
+                    continue
+
+                LOGGER.info(
+                    f"\t+ Starting job {index} ({self.jobs[index].experiment_config.experiment_name}) "
+                    f"on cores {allocation.cores} and devices {allocation.device_ids}"
+                )
+                # not a daemon since the experiment's launcher can start its own processes
+                process = ctx.Process(
+                    target=run_job,
+                    args=(index, self.jobs[index], allocation.cores, allocation.device_ids, results, log_level),
+                )
+                process.start()
+
+                if self.journal is not None:
+                    self.journal.start(self.jobs[index].experiment_config)
+
+                pending.remove(index)
+                running[index] = (process, allocation, time.perf_counter())
+
+            try:
+                index, report, error = results.get(timeout=1)
+            except queue.Empty:
+                # jobs that died without sending a result (e.g. oom kill), their processes are checked before the
+                # queue is drained, since a job can send its result and exit while we wait on the queue
+                dead = [index for index, (process, _, _) in running.items() if not process.is_alive()]
+                if not dead:
+                    continue
+
+                try:
+                    index, report, error = results.get(timeout=1)
+                except queue.Empty:
+                    index, report = dead[0], None
+                    error = f"Job process exited with code {running[index][0].exitcode}"
+
+            if index not in running:
+                LOGGER.warning(f"\t+ Ignoring result of job {index}, which isn't running anymore")
+                continue
+
+            process, allocation, start = running.pop(index)
+            process.join()
+            self.release(allocation)
+
+            if self.journal is not None:
+                self.journal.finish(self.jobs[index].experiment_config, error=error, report=report)
+
+            result = JobResult(
+                job=self.jobs[index],
+                index=index,
+                cores=allocation.cores,
+                device_ids=",".join(allocation.device_ids) or None,
+                duration=time.perf_counter() - start,
+                report=report,
+                error=error,
+            )
+
+            if error is None:
+                LOGGER.info(f"\t+ Job {index} finished in {result.duration:.2f}s")
+            else:
+                LOGGER.error(f"\t+ Job {index} failed: {error}")
+
+            yield result
+
+
+def run_job(index: int, job: Job, cores: List[int], device_ids: List[str], results, log_level: int) -> None:
+    """
+    Runs a job's experiment pinned to its cores and restricted to its devices, and puts its report (or error) into the
+    results queue. The experiment's own processes (e.g. launcher, device isolation) inherit the affinity and devices.
+    """
+
+    setup_logging(log_level, prefix=f"JOB-{index}")
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    # thread pools are sized to the job's cores instead of the host's
+    os.environ["OMP_NUM_THREADS"] = str(len(cores))
+    os.environ["MKL_NUM_THREADS"] = str(len(cores))
+
+    experiment_config = job.experiment_config
+
+    if len(device_ids) > 0:
+        experiment_config.backend.device_ids = ",".join(device_ids)
+
+        if is_nvidia_system():
+            os.environ["CUDA_DEVICE_ORDER"] = "PCI_BUS_ID"
+            os.environ["CUDA_VISIBLE_DEVICES"] = experiment_config.backend.device_ids
+        elif is_rocm_system():
+            os.environ["ROCR_VISIBLE_DEVICES"] = experiment_config.backend.device_ids
+
+    try:
+        report = launch(experiment_config)
+        results.put((index, report, None))
+    except Exception:
+        results.put((index, None, traceback.format_exc()))
@@ -2,12 +2,16 @@ import os
 import platform
 import re
 import subprocess
-from typing import List, Optional
+from glob import glob
+from logging import getLogger
+from typing import Any, Dict, List, Optional
 
 import psutil
 
 from .import_utils import is_amdsmi_available, is_pynvml_available, is_pyrsmi_available
 
+LOGGER = getLogger("system")
+
 
 ## CPU related stuff
 def get_cpu() -> Optional[str]:
@@ -34,6 +38,90 @@ def get_cpu_ram_mb():
     return psutil.virtual_memory().total / 1e6
 
 
+def get_cpu_available_ram_mb():
+    return psutil.virtual_memory().available / 1e6
+
+
+## Noise related stuff
+def read_system_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def get_noise_audit() -> Dict[str, Any]:
+    """
+    Audits the host settings that make measurements vary between hosts and runs (read from sysfs/procfs): cpu frequency
+    governor, turbo, SMT, transparent huge pages, automatic NUMA balancing and load average. The noise score counts the
+    noisy settings (those that can't be read don't count) plus the 1-minute load average per cpu.
+    """
+
+    governors = {read_system_file(path) for path in glob("/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_governor")}
+    governors = sorted(governor for governor in governors if governor is not None)
+    no_turbo = read_system_file("/sys/devices/system/cpu/intel_pstate/no_turbo")
+    boost = read_system_file("/sys/devices/system/cpu/cpufreq/boost")
+    smt_active = read_system_file("/sys/devices/system/cpu/smt/active")
+    transparent_hugepage = read_system_file("/sys/kernel/mm/transparent_hugepage/enabled")
+    numa_balancing = read_system_file("/proc/sys/kernel/numa_balancing")
+
+    if no_turbo is not None:
+        turbo = no_turbo == "0"
+    elif boost is not None:
+        turbo = boost == "1"
+    else:
+        turbo = None
+
+    if transparent_hugepage is not None:
+        # the active mode is the bracketed one, e.g. "always [madvise] never"
+        transparent_hugepage = re.search(r"\[(\w+)\]", transparent_hugepage).group(1)
+
+    audit = {
+        "scaling_governor": ",".join(governors) if governors else None,
+        "turbo": turbo,
+        "smt": smt_active == "1" if smt_active is not None else None,
+        "transparent_hugepage": transparent_hugepage,
+        "numa_balancing": numa_balancing != "0" if numa_balancing is not None else None,
+        "load_average": os.getloadavg()[0] / os.cpu_count() if hasattr(os, "getloadavg") else None,
+    }
+
+    noise_sources = []
+    if audit["scaling_governor"] is not None and audit["scaling_governor"] != "performance":
+        noise_sources.append("scaling_governor")
+    if audit["turbo"]:
+        noise_sources.append("turbo")
+    if audit["smt"]:
+        noise_sources.append("smt")
+    if audit["transparent_hugepage"] == "always":
+        noise_sources.append("transparent_hugepage")
+    if audit["numa_balancing"]:
+        noise_sources.append("numa_balancing")
+
+    audit["noise_sources"] = noise_sources
+    audit["noise_score"] = len(noise_sources) + (audit["load_average"] or 0.0)
+
+    return audit
+
+
+def screen_noise(audit: Dict[str, Any], threshold: float, action: str) -> None:
+    if audit["noise_score"] <= threshold:
+        LOGGER.info(f"\t+ Host noise score ({audit['noise_score']:.2f}) is below threshold ({threshold:.2f})")
+        return
+
+    message = (
+        f"Host noise score ({audit['noise_score']:.2f}) exceeds threshold ({threshold:.2f}), "
+        f"noisy settings: {audit['noise_sources']}, load average per cpu: {audit['load_average']}. "
+    )
+
+    if action == "error":
+        raise RuntimeError(message + "Skipping experiment.")
+    elif action == "warn":
+        LOGGER.warning(message + "Measurements will probably be noisy.")
+    else:
+        raise ValueError(f"Unsupported noise screening action {action}")
+
+
 ## GPU related stuff
 try:
     subprocess.check_output("nvidia-smi")
@@ -159,21 +247,63 @@ def get_gpu_vram_mb() -> List[int]:
     return sum(vrams)
 
 
+def get_gpu_available_vram_mb(device_ids: List[int]) -> List[float]:
+    """Returns the amount of free VRAM of each of the given devices, in MB."""
+
+    if is_nvidia_system():
+        if not is_pynvml_available():
+            raise ValueError(
+                "The library PyNVML is required to get available GPU VRAM, but is not installed. "
+                "Please install the official and NVIDIA maintained PyNVML library through `pip install nvidia-ml-py`."
+            )
+
+        pynvml.nvmlInit()
+        vrams = [
+            pynvml.nvmlDeviceGetMemoryInfo(pynvml.nvmlDeviceGetHandleByIndex(device_id)).free
+            for device_id in device_ids
+        ]
+        pynvml.nvmlShutdown()
+
+    elif is_rocm_system():
+        if not is_amdsmi_available() and not is_pyrsmi_available():
+            raise ValueError(
+                "Either the library AMD SMI or PyRSMI is required to get available GPU VRAM, but neither is installed. "
+                "Please install the official and AMD maintained AMD SMI library from https://github.com/ROCm/amdsmi "
+                "or PyRSMI library from https://github.com/ROCm/pyrsmi."
+            )
+
+        if is_amdsmi_available():
+            amdsmi.amdsmi_init()
+            processor_handles = amdsmi.amdsmi_get_processor_handles()
+            vrams = [
+                amdsmi.amdsmi_get_gpu_memory_total(processor_handles[device_id], mem_type=amdsmi.AmdSmiMemoryType.VRAM)
+                - amdsmi.amdsmi_get_gpu_memory_usage(
+                    processor_handles[device_id], mem_type=amdsmi.AmdSmiMemoryType.VRAM
+                )
+                for device_id in device_ids
+            ]
+            amdsmi.amdsmi_shut_down()
+
+        elif is_pyrsmi_available():
+            rocml.smi_initialize()
+            vrams = [
+                rocml.smi_get_device_memory_total(device_id) - rocml.smi_get_device_memory_used(device_id)
+                for device_id in device_ids
+            ]
+            rocml.smi_shutdown()
+
+    else:
+        raise ValueError("No NVIDIA or ROCm GPUs found.")
+
+    return [vram / 1e6 for vram in vrams]
+
+
 def get_gpu_device_ids() -> str:
     if is_nvidia_system():
         if os.environ.get("CUDA_VISIBLE_DEVICES", None) is not None:
             device_ids = os.environ["CUDA_VISIBLE_DEVICES"]
         else:
-            if not is_pynvml_available():
-                raise ValueError(
-                    "The library PyNVML is required to get GPU device ids, but is not installed. "
-                    "Please install the official and NVIDIA maintained PyNVML library through `pip install nvidia-ml-py`."
-                )
-
-            pynvml.nvmlInit()
-            device_ids = list(range(pynvml.nvmlDeviceGetCount()))
-            device_ids = ",".join(str(i) for i in device_ids)
-            pynvml.nvmlShutdown()
+            device_ids = get_system_gpu_device_ids()
     elif is_rocm_system():
         if os.environ.get("GPU_DEVICE_ORDINAL", None) is not None:
             device_ids = os.environ["GPU_DEVICE_ORDINAL"]
@@ -182,24 +312,47 @@ def get_gpu_device_ids() -> str:
         elif os.environ.get("ROCR_VISIBLE_DEVICES", None) is not None:
             device_ids = os.environ["ROCR_VISIBLE_DEVICES"]
         else:
-            if not is_amdsmi_available() or not is_pyrsmi_available():
-                raise ValueError(
-                    "Either the library AMD SMI or PyRSMI is required to get GPU device ids, but neither is installed. "
-                    "Please install the official and AMD maintained AMD SMI library from https://github.com/ROCm/amdsmi "
-                    "or PyRSMI library from https://github.com/ROCm/pyrsmi."
-                )
+            device_ids = get_system_gpu_device_ids()
+    else:
+        raise ValueError("Couldn't infer GPU device ids.")
+
+    return device_ids
+
+
+def get_system_gpu_device_ids() -> str:
+    """Returns the ids of all the GPUs of the system, regardless of the visible devices of the process (which are set
+    by the backend configs)."""
+
+    if is_nvidia_system():
+        if not is_pynvml_available():
+            raise ValueError(
+                "The library PyNVML is required to get GPU device ids, but is not installed. "
+                "Please install the official and NVIDIA maintained PyNVML library through `pip install nvidia-ml-py`."
+            )
 
-            if is_amdsmi_available():
-                amdsmi.amdsmi_init()
-                device_ids = list(range(len(amdsmi.amdsmi_get_processor_handles())))
-                device_ids = ",".join(str(i) for i in device_ids)
-                amdsmi.amdsmi_shut_down()
-
-            elif is_pyrsmi_available():
-                rocml.smi_initialize()
-                device_ids = list(range(rocml.smi_get_device_count()))
-                device_ids = ",".join(str(i) for i in device_ids)
-                rocml.smi_shutdown()
+        pynvml.nvmlInit()
+        device_ids = list(range(pynvml.nvmlDeviceGetCount()))
+        device_ids = ",".join(str(i) for i in device_ids)
+        pynvml.nvmlShutdown()
+    elif is_rocm_system():
+        if not is_amdsmi_available() and not is_pyrsmi_available():
+            raise ValueError(
+                "Either the library AMD SMI or PyRSMI is required to get GPU device ids, but neither is installed. "
+                "Please install the official and AMD maintained AMD SMI library from https://github.com/ROCm/amdsmi "
+                "or PyRSMI library from https://github.com/ROCm/pyrsmi."
+            )
+
+        if is_amdsmi_available():
+            amdsmi.amdsmi_init()
+            device_ids = list(range(len(amdsmi.amdsmi_get_processor_handles())))
+            device_ids = ",".join(str(i) for i in device_ids)
+            amdsmi.amdsmi_shut_down()
+
+        elif is_pyrsmi_available():
+            rocml.smi_initialize()
+            device_ids = list(range(rocml.smi_get_device_count()))
+            device_ids = ",".join(str(i) for i in device_ids)
+            rocml.smi_shutdown()
     else:
         raise ValueError("Couldn't infer GPU device ids.")
 
@@ -217,6 +370,7 @@ def get_system_info() -> dict:
         "platform": platform.platform(),
         "processor": platform.processor(),
         "python_version": platform.python_version(),
+        "noise_audit": get_noise_audit(),
     }
 
     if is_nvidia_system() or is_rocm_system():
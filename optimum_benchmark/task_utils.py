@@ -4,6 +4,8 @@ from typing import Optional
 
 import huggingface_hub
 
+from .metadata_cache import cached_metadata
+
 _TRANSFORMERS_TASKS_TO_MODEL_LOADERS = {
     # text processing
     "feature-extraction": "AutoModel",
@@ -109,6 +111,7 @@ def map_from_synonym(task: str) -> str:
     return task
 
 
+@cached_metadata("library")
 def infer_library_from_model_name_or_path(model_name_or_path: str, revision: Optional[str] = None) -> str:
     is_local = os.path.isdir(model_name_or_path)
 
@@ -126,6 +129,7 @@ def infer_library_from_model_name_or_path(model_name_or_path: str, revision: Opt
 
 
 # adapted from https://github.com/huggingface/optimum/blob/main/optimum/exporters/tasks.py without torch dependency
+@cached_metadata("task")
 def infer_task_from_model_name_or_path(model_name_or_path: str, revision: Optional[str] = None) -> str:
     is_local = os.path.isdir(model_name_or_path)
 
@@ -0,0 +1,201 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Dict, List, Literal, Optional
+
+from ..import_utils import is_torch_available
+
+if is_torch_available():
+    from torch._dynamo.utils import counters
+
+    try:
+        from torch._dynamo.callback import callback_handler
+    except ImportError:
+        # compile event hooks are not available in older versions of torch
+        callback_handler = None
+
+LOGGER = getLogger("compile")
+
+COMPILE_TIME_UNIT = "s"
+Compile_Time_Unit_Literal = Literal["s"]
+
+
+@dataclass
+class Compilation:
+    unit: Compile_Time_Unit_Literal
+
+    compilations: int
+    unique_graphs: int
+    graph_breaks: int
+    cache_hits: int = 0
+    cache_misses: int = 0
+    compile_time: Optional[float] = None
+    # compile time saved by the persistent compile cache, compared to the phase's recorded cold compile time
+    time_saved: Optional[float] = None
+    recompilations: Optional[int] = None
+    # indices of the phase's iterations during which a compilation was triggered
+    compiling_iterations: List[int] = field(default_factory=list)
+
+    @staticmethod
+    def aggregate(compilations: List["Compilation"]) -> "Compilation":
+        if len(compilations) == 0:
+            raise ValueError("No compilation measurements to aggregate")
+        elif any(compilation is None for compilation in compilations):
+            raise ValueError("Some compilation measurements are missing")
+
+        # processes compile the same graphs in parallel
+        def peak(attr: str) -> Optional[float]:
+            values = [getattr(compilation, attr) for compilation in compilations]
+            return max(values) if all(value is not None for value in values) else None
+
+        return Compilation(
+            unit=compilations[0].unit,
+            compilations=peak("compilations"),
+            unique_graphs=peak("unique_graphs"),
+            graph_breaks=peak("graph_breaks"),
+            cache_hits=peak("cache_hits"),
+            cache_misses=peak("cache_misses"),
+            compile_time=peak("compile_time"),
+            time_saved=peak("time_saved"),
+            recompilations=peak("recompilations"),
+            compiling_iterations=sorted(
+                set(sum((compilation.compiling_iterations for compilation in compilations), []))
+            ),
+        )
+
+    def log(self, prefix: str = "forward"):
+        LOGGER.info(f"\t\t+ {prefix} compilation:")
+        LOGGER.info(f"\t\t\t- compilations: {self.compilations}")
+        if self.recompilations is not None:
+            LOGGER.info(f"\t\t\t- recompilations: {self.recompilations}")
+        LOGGER.info(f"\t\t\t- unique graphs: {self.unique_graphs}")
+        LOGGER.info(f"\t\t\t- graph breaks: {self.graph_breaks}")
+        if self.cache_hits > 0 or self.cache_misses > 0:
+            LOGGER.info(f"\t\t\t- cache hits: {self.cache_hits}")
+            LOGGER.info(f"\t\t\t- cache misses: {self.cache_misses}")
+        if self.compile_time is not None:
+            LOGGER.info(f"\t\t\t- compile time: {self.compile_time:f} ({self.unit})")
+        if self.time_saved is not None:
+            LOGGER.info(f"\t\t\t- time saved: {self.time_saved:f} ({self.unit})")
+        if len(self.compiling_iterations) > 0:
+            LOGGER.info(f"\t\t\t- compiling iterations: {self.compiling_iterations}")
+
+
+class CompileTracker:
+    """
+    Tracks torch.compile's work per phase (e.g. warmup, prefill, decode) through dynamo's counters and compile event
+    hooks: compile time, number of (re)compilations, unique graphs and graph breaks, as well as the iterations of the
+    phase that triggered a compilation (e.g. a recompilation caused by a new sequence length).
+
+    When given the persistent compile cache directory, the compile time of cold phases (only cache misses) is recorded
+    in it, and the time saved by cache hits in later runs is reported against it.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.phase: Optional[str] = None
+        self.compilations: Dict[str, Compilation] = {}
+
+        # (start, end, compile id) of the compilations of the current phase
+        self.events: List[List] = []
+        self.iteration = 0
+        self.compiling_iterations: List[int] = []
+        self.start_counters: Dict[str, int] = {}
+
+    def on_compile_start(self, *args) -> None:
+        # older versions of torch call the hooks without arguments
+        compile_id = str(args[0].compile_id) if len(args) > 0 and hasattr(args[0], "compile_id") else None
+        self.events.append([time.perf_counter(), None, compile_id])
+
+    def on_compile_end(self, *args) -> None:
+        if len(self.events) > 0 and self.events[-1][1] is None:
+            self.events[-1][1] = time.perf_counter()
+
+    def get_counters(self) -> Dict[str, int]:
+        return {
+            "compilations": counters["frames"]["total"],
+            "unique_graphs": counters["stats"]["unique_graphs"],
+            "graph_breaks": sum(counters["graph_break"].values()),
+            "cache_hits": counters["inductor"]["fxgraph_cache_hit"],
+            "cache_misses": counters["inductor"]["fxgraph_cache_miss"],
+        }
+
+    @contextmanager
+    def track(self, phase: str):
+        self.phase = phase
+        self.events = []
+        self.iteration = 0
+        self.compiling_iterations = []
+        self.start_counters = self.get_counters()
+
+        if callback_handler is not None:
+            callback_handler.register_start_callback(self.on_compile_start)
+            callback_handler.register_end_callback(self.on_compile_end)
+
+        try:
+            yield
+        finally:
+            if callback_handler is not None:
+                callback_handler.remove_start_callback(self.on_compile_start)
+                callback_handler.remove_end_callback(self.on_compile_end)
+
+        end_counters = self.get_counters()
+
+        compilation = Compilation(
+            unit=COMPILE_TIME_UNIT,
+            compiling_iterations=self.compiling_iterations,
+            **{name: end_counters[name] - self.start_counters[name] for name in end_counters},
+        )
+
+        if callback_handler is not None:
+            compilation.compile_time = sum(end - start for start, end, _ in self.events if end is not None)
+
+            compile_ids = [compile_id for _, _, compile_id in self.events]
+            if all(compile_id is not None for compile_id in compile_ids):
+                # compile ids are formatted as {frame id}/{attempt}, attempts after the first one are recompilations
+                compilation.recompilations = sum(compile_id.split("/")[-1] != "0" for compile_id in compile_ids)
+
+        if self.cache_dir is not None and compilation.compile_time is not None:
+            compilation.time_saved = self.get_time_saved(phase, compilation)
+
+        self.compilations[phase] = compilation
+        self.phase = None
+
+    @contextmanager
+    def track_iteration(self):
+        compilations = counters["frames"]["total"]
+
+        yield
+
+        if counters["frames"]["total"] > compilations:
+            self.compiling_iterations.append(self.iteration)
+
+        self.iteration += 1
+
+    def get_time_saved(self, phase: str, compilation: Compilation) -> Optional[float]:
+        compile_times_file = os.path.join(self.cache_dir, "compile_times.json")
+
+        compile_times = {}
+        if os.path.exists(compile_times_file):
+            with open(compile_times_file) as f:
+                compile_times = json.load(f)
+
+        if compilation.cache_misses > 0 and compilation.cache_hits == 0:
+            LOGGER.info(f"\t+ Recording cold compile time of the {phase} phase")
+            compile_times[phase] = compilation.compile_time
+            # written atomically since processes of the same run share the cache directory
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(f"{compile_times_file}.{os.getpid()}", "w") as f:
+                json.dump(compile_times, f)
+            os.replace(f"{compile_times_file}.{os.getpid()}", compile_times_file)
+            return 0.0
+        elif compilation.cache_hits > 0 and phase in compile_times:
+            return compile_times[phase] - compilation.compile_time
+
+        return None
+
+    def get_compilation(self, phase: str) -> Compilation:
+        return self.compilations[phase]
@@ -1,12 +1,22 @@
+import bisect
 import os
+import time
 from contextlib import contextmanager
 from dataclasses import asdict, dataclass
 from json import dump
 from logging import getLogger
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Tuple
 
-from ..import_utils import is_codecarbon_available, is_torch_available, is_torch_distributed_available
-from ..system_utils import get_gpu_device_ids
+import numpy as np
+
+from ..import_utils import (
+    is_codecarbon_available,
+    is_pynvml_available,
+    is_torch_available,
+    is_torch_distributed_available,
+)
+from ..system_utils import get_gpu_device_ids, is_nvidia_system
+from .rapl import MICROJOULES_PER_KWH, SYSFS_ROOT, NVMLDomain, RAPLReader
 
 if is_torch_available():
     import torch
@@ -18,14 +28,20 @@ if is_codecarbon_available():
     from codecarbon import EmissionsTracker, OfflineEmissionsTracker
     from codecarbon.output import EmissionsData
 
+if is_nvidia_system() and is_pynvml_available():
+    import pynvml
+
 LOGGER = getLogger("energy")
 
 POWER_UNIT = "W"
 ENERGY_UNIT = "kWh"
+Power_Unit_Literal = Literal["W"]
 Energy_Unit_Literal = Literal["kWh"]
 Efficiency_Unit_Literal = Literal["samples/kWh", "tokens/kWh", "images/kWh"]
 
 POWER_CONSUMPTION_SAMPLING_RATE = 1  # in seconds
+SECONDS_PER_HOUR = 3600
+ENERGY_SOURCES = ["codecarbon", "rapl"]
 
 
 @dataclass
@@ -83,6 +99,187 @@ class Energy:
         )
 
 
+@dataclass
+class EnergyDistribution:
+    unit: Energy_Unit_Literal
+
+    count: int
+    total: float
+    mean: float
+    stdev: float
+    p50: float
+    p90: float
+    p95: float
+    p99: float
+
+    values: List[float]
+
+    def __sub__(self, energy: "EnergyDistribution") -> "EnergyDistribution":
+        if not isinstance(energy, EnergyDistribution):
+            raise ValueError(f"Cannot subtract {type(energy)} from EnergyDistribution")
+
+        return EnergyDistribution.from_values(values=[e - energy.mean for e in self.values], unit=self.unit)
+
+    @staticmethod
+    def aggregate(distributions: List["EnergyDistribution"]) -> "EnergyDistribution":
+        if len(distributions) == 0 or all(distribution is None for distribution in distributions):
+            return None
+        elif any(distribution is None for distribution in distributions):
+            raise ValueError("Some energy distributions are missing")
+
+        unit = distributions[0].unit
+        values = sum((distribution.values for distribution in distributions), [])
+        return EnergyDistribution.from_values(values=values, unit=unit)
+
+    @staticmethod
+    def from_values(values: List[float], unit: str) -> "EnergyDistribution":
+        return EnergyDistribution(
+            unit=unit,
+            count=len(values),
+            total=sum(values),
+            mean=np.mean(values),
+            stdev=np.std(values),
+            p50=np.percentile(values, 50),
+            p90=np.percentile(values, 90),
+            p95=np.percentile(values, 95),
+            p99=np.percentile(values, 99),
+            values=values,
+        )
+
+    def log(self, prefix: str = "forward"):
+        stdev_percentage = 100 * self.stdev / self.mean if self.mean > 0 else 0
+        LOGGER.info(f"\t\t+ {prefix} per-iteration energy:")
+        LOGGER.info(f"\t\t\t+ count: {self.count}")
+        LOGGER.info(f"\t\t\t+ mean: {self.mean:e} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ stdev: {self.stdev:e} ({self.unit}) ({stdev_percentage:.2f}%)")
+        LOGGER.info(f"\t\t\t+ p50: {self.p50:e} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ p90: {self.p90:e} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ p95: {self.p95:e} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ p99: {self.p99:e} ({self.unit})")
+
+
+@dataclass
+class Power:
+    unit: Power_Unit_Literal
+
+    cpu: float
+    ram: float
+    gpu: float
+    total: float
+    stdev: float
+
+    @staticmethod
+    def aggregate(powers: List["Power"]) -> "Power":
+        if len(powers) == 0 or all(power is None for power in powers):
+            return None
+        elif any(power is None for power in powers):
+            raise ValueError("Some power measurements are missing")
+
+        # since measurements are machine-level, we just take the average
+        cpu = sum(power.cpu for power in powers) / len(powers)
+        gpu = sum(power.gpu for power in powers) / len(powers)
+        ram = sum(power.ram for power in powers) / len(powers)
+        total = sum(power.total for power in powers) / len(powers)
+        stdev = sum(power.stdev for power in powers) / len(powers)
+
+        return Power(cpu=cpu, gpu=gpu, ram=ram, total=total, stdev=stdev, unit=POWER_UNIT)
+
+    @staticmethod
+    def from_energies(energies: List["Energy"], durations: List[float]) -> "Power":
+        def power(attr: str) -> List[float]:
+            # kWh over seconds to W
+            return [getattr(e, attr) * 1e3 * SECONDS_PER_HOUR / d for e, d in zip(energies, durations)]
+
+        total = power("total")
+        mean = sum(total) / len(total)
+        stdev = (sum((p - mean) ** 2 for p in total) / len(total)) ** 0.5
+
+        return Power(
+            cpu=sum(power("cpu")) / len(energies),
+            gpu=sum(power("gpu")) / len(energies),
+            ram=sum(power("ram")) / len(energies),
+            total=mean,
+            stdev=stdev,
+            unit=POWER_UNIT,
+        )
+
+    def to_energy(self, duration: float) -> "Energy":
+        # W over seconds to kWh
+        return Energy(
+            cpu=self.cpu * duration / SECONDS_PER_HOUR / 1e3,
+            gpu=self.gpu * duration / SECONDS_PER_HOUR / 1e3,
+            ram=self.ram * duration / SECONDS_PER_HOUR / 1e3,
+            total=self.total * duration / SECONDS_PER_HOUR / 1e3,
+            unit=ENERGY_UNIT,
+        )
+
+    def log(self, prefix: str = "idle"):
+        LOGGER.info(f"\t\t+ {prefix} power:")
+        LOGGER.info(f"\t\t\t+ CPU: {self.cpu:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ GPU: {self.gpu:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ RAM: {self.ram:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ total: {self.total:f} ({self.unit})")
+        LOGGER.info(
+            f"\t\t\t+ stdev: {self.stdev:f} ({self.unit}) ({self.stdev / self.total * 100 if self.total else 0:.2f}%)"
+        )
+
+
+@dataclass
+class PowerTimeline:
+    unit: Power_Unit_Literal
+
+    # summary of the total power sampled over a phase, between consecutive samples of the energy counters
+    count: int
+    mean: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+
+    @staticmethod
+    def aggregate(timelines: List["PowerTimeline"]) -> "PowerTimeline":
+        if len(timelines) == 0 or all(timeline is None for timeline in timelines):
+            return None
+        elif any(timeline is None for timeline in timelines):
+            raise ValueError("Some power timelines are missing")
+
+        # since measurements are machine-level, we just take the average
+        return PowerTimeline(
+            unit=timelines[0].unit,
+            count=timelines[0].count,
+            mean=sum(timeline.mean for timeline in timelines) / len(timelines),
+            min=sum(timeline.min for timeline in timelines) / len(timelines),
+            max=sum(timeline.max for timeline in timelines) / len(timelines),
+            p50=sum(timeline.p50 for timeline in timelines) / len(timelines),
+            p90=sum(timeline.p90 for timeline in timelines) / len(timelines),
+            p99=sum(timeline.p99 for timeline in timelines) / len(timelines),
+        )
+
+    @staticmethod
+    def from_values(values: List[float], unit: str) -> "PowerTimeline":
+        return PowerTimeline(
+            unit=unit,
+            count=len(values),
+            mean=np.mean(values),
+            min=np.min(values),
+            max=np.max(values),
+            p50=np.percentile(values, 50),
+            p90=np.percentile(values, 90),
+            p99=np.percentile(values, 99),
+        )
+
+    def log(self, prefix: str = "forward"):
+        LOGGER.info(f"\t\t+ {prefix} sampled power:")
+        LOGGER.info(f"\t\t\t+ count: {self.count}")
+        LOGGER.info(f"\t\t\t+ mean: {self.mean:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ min: {self.min:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ max: {self.max:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ p50: {self.p50:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ p90: {self.p90:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t+ p99: {self.p99:f} ({self.unit})")
+
+
 @dataclass
 class Efficiency:
     unit: Efficiency_Unit_Literal
@@ -110,10 +307,19 @@ class Efficiency:
 
 
 class EnergyTracker:
-    def __init__(self, backend: str, device: str, device_ids: Optional[str] = None):
+    def __init__(
+        self,
+        backend: str,
+        device: str,
+        device_ids: Optional[str] = None,
+        source: str = "codecarbon",
+        sampling_interval: Optional[float] = None,
+        sysfs_root: str = SYSFS_ROOT,
+    ):
         self.device = device
         self.backend = backend
         self.device_ids = device_ids
+        self.source = source
         self.asynchronous = backend == "pytorch" and device == "cuda"
         self.distributed = is_torch_distributed_available() and torch.distributed.is_initialized()
 
@@ -125,6 +331,60 @@ class EnergyTracker:
             self.device_ids = list(map(int, self.device_ids.split(",")))
             LOGGER.info(f"\t+ Tracking GPU energy on devices {self.device_ids}")
 
+        if self.source not in ENERGY_SOURCES:
+            raise ValueError(f"Unsupported energy source {self.source}. Please use one of {ENERGY_SOURCES}.")
+
+        self.cpu_energy = None
+        self.gpu_energy = None
+        self.ram_energy = None
+        self.total_energy = None
+        self.duration = None
+        self.idle_power = None
+        self.nvml_initialized = False
+
+        if self.source == "rapl":
+            self.init_rapl_tracker(sampling_interval=sampling_interval, sysfs_root=sysfs_root)
+        else:
+            self.init_codecarbon_tracker()
+
+    def init_rapl_tracker(self, sampling_interval: Optional[float], sysfs_root: str):
+        LOGGER.info("\t+ Tracking CPU and RAM energy with RAPL counters")
+
+        gpu_domains = []
+        if self.device == "cuda":
+            if is_nvidia_system() and is_pynvml_available():
+                LOGGER.info("\t+ Tracking GPU energy with NVML counters")
+                pynvml.nvmlInit()
+                self.nvml_initialized = True
+                gpu_domains = [
+                    NVMLDomain(
+                        name=f"gpu-{device_id}", counter_path=None, handle=pynvml.nvmlDeviceGetHandleByIndex(device_id)
+                    )
+                    for device_id in self.device_ids
+                ]
+            else:
+                LOGGER.warning(
+                    "\t+ GPU energy can only be tracked through NVML alongside RAPL counters. "
+                    "GPU energy will be reported as 0."
+                )
+
+        self.rapl_reader = RAPLReader(
+            sysfs_root=sysfs_root, sampling_interval=sampling_interval, extra_domains=gpu_domains
+        )
+
+    def close(self):
+        """Releases NVML (initialized to read the GPU energy counters), its handles can't be used afterwards."""
+
+        if self.nvml_initialized:
+            pynvml.nvmlShutdown()
+            self.nvml_initialized = False
+
+    def __del__(self):
+        # the tracker may be garbage collected before its initialization completed
+        if getattr(self, "nvml_initialized", False):
+            self.close()
+
+    def init_codecarbon_tracker(self):
         if not is_codecarbon_available():
             raise ValueError(
                 "The library codecarbon is required to run energy benchmark, but is not installed. "
@@ -157,11 +417,6 @@ class EnergyTracker:
                 country_iso_code=os.environ.get("COUNTRY_ISO_CODE", "USA"),
             )
 
-        self.cpu_energy = None
-        self.gpu_energy = None
-        self.ram_energy = None
-        self.total_energy = None
-
     @contextmanager
     def track(self, file_prefix: str = "task"):
         if self.asynchronous:
@@ -170,6 +425,54 @@ class EnergyTracker:
         if self.distributed:
             torch.distributed.barrier()
 
+        if self.source == "rapl":
+            yield from self._rapl_energy(file_prefix)
+        else:
+            yield from self._codecarbon_energy(file_prefix)
+
+        if self.distributed:
+            torch.distributed.barrier()
+
+        if self.asynchronous:
+            torch.cuda.synchronize()
+
+    def _rapl_energy(self, file_prefix: str):
+        self.rapl_reader.start()
+
+        yield
+
+        if self.asynchronous:
+            torch.cuda.synchronize()
+
+        self.rapl_reader.stop()
+
+        self.duration = self.rapl_reader.timestamps[-1] - self.rapl_reader.timestamps[0]
+
+        power_timeline = self.rapl_reader.get_power_timeline()
+        start_time = self.rapl_reader.timestamps[0]
+
+        rapl_data = {
+            "duration": self.duration,
+            "domains_energy": self.rapl_reader.get_domains_energy(),
+            "unit": ENERGY_UNIT,
+            # power of each domain (in W) between consecutive samples, timestamped from the start of the window
+            "power_timeline": {
+                "timestamps": [timestamp - start_time for timestamp in power_timeline["timestamps"]],
+                "power": power_timeline["power"],
+                "unit": POWER_UNIT,
+            },
+        }
+
+        with open(f"{file_prefix}_rapl.json", "w") as f:
+            LOGGER.info(f"\t+ Saving RAPL energy data to {file_prefix}_rapl.json")
+            dump(rapl_data, f, indent=4)
+
+        self.cpu_energy = self.rapl_reader.get_cpu_energy()
+        self.ram_energy = self.rapl_reader.get_ram_energy()
+        self.gpu_energy = self.rapl_reader.get_gpu_energy()
+        self.total_energy = self.cpu_energy + self.ram_energy + self.gpu_energy
+
+    def _codecarbon_energy(self, file_prefix: str):
         self.emission_tracker.start_task()
 
         yield
@@ -180,18 +483,92 @@ class EnergyTracker:
             LOGGER.info(f"\t+ Saving codecarbon emission data to {file_prefix}_codecarbon.json")
             dump(asdict(emission_data), f, indent=4)
 
-        if self.distributed:
-            torch.distributed.barrier()
-
-        if self.asynchronous:
-            torch.cuda.synchronize()
-
+        self.duration = emission_data.duration
         self.cpu_energy = emission_data.cpu_energy
         self.gpu_energy = emission_data.gpu_energy
         self.ram_energy = emission_data.ram_energy
         self.total_energy = emission_data.energy_consumed
 
+    def calibrate(self, duration: float, interval: Optional[float] = None) -> Power:
+        """
+        Measures the idle power of the machine over consecutive windows of `interval` seconds
+        (defaults to the sampling rate of the energy source) spanning `duration` seconds.
+        """
+
+        if interval is None:
+            interval = POWER_CONSUMPTION_SAMPLING_RATE if self.source == "codecarbon" else min(duration, 0.1)
+
+        LOGGER.info(f"\t+ Measuring idle power for {duration} seconds")
+
+        energies, durations = [], []
+        for _ in range(max(int(duration / interval), 1)):
+            with self.track(file_prefix="idle"):
+                time.sleep(interval)
+            energies.append(self.get_energy())
+            durations.append(self.duration)
+
+        self.idle_power = Power.from_energies(energies, durations)
+        self.idle_power.log(prefix="idle")
+
+        return self.idle_power
+
     def get_energy(self) -> Energy:
         return Energy(
             unit=ENERGY_UNIT, cpu=self.cpu_energy, gpu=self.gpu_energy, ram=self.ram_energy, total=self.total_energy
         )
+
+    def get_intervals_energy(self, intervals: List[Tuple[float, float]]) -> List[Energy]:
+        """
+        Attributes the energy of the last tracked window to each of the given (start, end) intervals
+        (e.g. iterations timed by a LatencyTracker) by interpolating the sampled energy counters.
+        """
+
+        if self.source != "rapl":
+            raise ValueError("Energy can only be attributed to intervals with the RAPL energy source")
+
+        energies = []
+        for start, end in intervals:
+            domains_energy = self.rapl_reader.get_interval_energies(start, end)
+            cpu = sum(domains_energy[d.name] for d in self.rapl_reader.domains if d.is_package) / MICROJOULES_PER_KWH
+            ram = sum(domains_energy[d.name] for d in self.rapl_reader.domains if d.is_dram) / MICROJOULES_PER_KWH
+            gpu = sum(domains_energy[d.name] for d in self.rapl_reader.domains if d.is_gpu) / MICROJOULES_PER_KWH
+            energies.append(Energy(unit=ENERGY_UNIT, cpu=cpu, ram=ram, gpu=gpu, total=cpu + ram + gpu))
+
+        return energies
+
+    def get_power_timeline(self, intervals: Optional[List[Tuple[float, float]]] = None) -> Optional[PowerTimeline]:
+        """
+        Summarizes the total power sampled during the last tracked window, or only during the given (start, end)
+        intervals (e.g. the decode phase of each generation), by the samples that end within them. Returns None if
+        there are no such samples (e.g. when the sampling interval is longer than the intervals).
+        """
+
+        if self.source != "rapl":
+            raise ValueError("The power timeline can only be sampled with the RAPL energy source")
+
+        power_timeline = self.rapl_reader.get_power_timeline()
+        intervals = sorted(intervals) if intervals is not None else None
+        starts = [start for start, _ in intervals] if intervals is not None else None
+
+        values = []
+        for index, timestamp in enumerate(power_timeline["timestamps"]):
+            if intervals is not None:
+                # the last interval starting before the sample
+                position = bisect.bisect_right(starts, timestamp) - 1
+                if position < 0 or timestamp > intervals[position][1]:
+                    continue
+
+            values.append(sum(power[index] for power in power_timeline["power"].values()))
+
+        return PowerTimeline.from_values(values, unit=POWER_UNIT) if len(values) > 0 else None
+
+    def get_net_energy(self) -> Energy:
+        """Returns the energy of the last tracked window minus the idle energy over the same duration."""
+
+        if self.idle_power is None:
+            raise ValueError("Idle power was not measured, please call calibrate() before tracking")
+
+        return self.get_energy() - self.idle_power.to_energy(self.duration)
+
+    def get_idle_power(self) -> Power:
+        return self.idle_power
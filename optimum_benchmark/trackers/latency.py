@@ -2,8 +2,9 @@ import time
 from contextlib import contextmanager
 from dataclasses import dataclass
 from logging import getLogger
-from typing import List, Literal, Optional, Union
+from typing import List, Literal, Optional, Tuple, Union
 
+from ..heartbeat_utils import heartbeat
 from ..import_utils import is_torch_distributed_available
 
 if is_torch_distributed_available():
@@ -119,6 +120,106 @@ class Throughput:
         LOGGER.info(f"\t\t+ {prefix} throughput: {self.value:f} {self.unit}")
 
 
+@dataclass
+class TrackingOverhead:
+    """Latency added by the memory and energy trackers, relative to a reference run with latency tracking only."""
+
+    unit: Latency_Unit_Literal
+
+    tracked: float
+    untracked: float
+    overhead: float
+    percentage: float
+
+    @staticmethod
+    def aggregate(overheads: List["TrackingOverhead"]) -> "TrackingOverhead":
+        if len(overheads) == 0 or all(overhead is None for overhead in overheads):
+            return None
+        elif any(overhead is None for overhead in overheads):
+            raise ValueError("Some tracking overhead measurements are missing")
+
+        tracked = np.mean([overhead.tracked for overhead in overheads])
+        untracked = np.mean([overhead.untracked for overhead in overheads])
+        return TrackingOverhead.from_latencies(tracked=tracked, untracked=untracked, unit=overheads[0].unit)
+
+    @staticmethod
+    def from_latencies(tracked: float, untracked: float, unit: str) -> "TrackingOverhead":
+        overhead = tracked - untracked
+        percentage = 100 * overhead / untracked if untracked > 0 else 0
+        return TrackingOverhead(
+            unit=unit, tracked=tracked, untracked=untracked, overhead=overhead, percentage=percentage
+        )
+
+    def log(self, prefix: str = "method"):
+        LOGGER.info(f"\t\t+ {prefix} tracking overhead:")
+        LOGGER.info(f"\t\t\t+ tracked mean: {self.tracked:f} {self.unit}")
+        LOGGER.info(f"\t\t\t+ untracked mean: {self.untracked:f} {self.unit}")
+        LOGGER.info(f"\t\t\t+ overhead: {self.overhead:f} {self.unit} ({self.percentage:.2f}%)")
+
+
+# ranks whose mean latency exceeds the median of the ranks' mean latencies by this ratio are flagged as stragglers
+STRAGGLER_THRESHOLD = 0.1
+
+
+@dataclass
+class RankLatency:
+    """
+    Per-iteration latency across the ranks of a distributed run. Ranks are synchronized at each iteration, which lasts
+    as long as its slowest rank, so iterations are aligned by index across ranks (up to the smallest count).
+    """
+
+    unit: Latency_Unit_Literal
+
+    # per-iteration maximum, minimum and spread (maximum - minimum) across ranks
+    max: Latency
+    min: Latency
+    spread: Latency
+
+    # per-rank latencies, in rank order
+    ranks: List[Latency]
+    # number of iterations in which each rank was the slowest
+    slowest_counts: List[int]
+    stragglers: List[int]
+
+    @staticmethod
+    def from_latencies(latencies: List[Latency]) -> "RankLatency":
+        if len(latencies) == 0:
+            raise ValueError("No latency measurements to aggregate")
+        elif any(latency is None for latency in latencies):
+            raise ValueError("Some latency measurements are missing")
+
+        unit = latencies[0].unit
+        count = min(latency.count for latency in latencies)
+        # (ranks, iterations)
+        values = np.array([latency.values[:count] for latency in latencies])
+
+        ranks_mean = [latency.mean for latency in latencies]
+        median = np.median(ranks_mean)
+        stragglers = [rank for rank, mean in enumerate(ranks_mean) if mean > (1 + STRAGGLER_THRESHOLD) * median]
+
+        return RankLatency(
+            unit=unit,
+            max=Latency.from_values(values=values.max(axis=0).tolist(), unit=unit),
+            min=Latency.from_values(values=values.min(axis=0).tolist(), unit=unit),
+            spread=Latency.from_values(values=(values.max(axis=0) - values.min(axis=0)).tolist(), unit=unit),
+            ranks=latencies,
+            slowest_counts=np.bincount(values.argmax(axis=0), minlength=len(latencies)).tolist(),
+            stragglers=stragglers,
+        )
+
+    def log(self, prefix: str = "method"):
+        LOGGER.info(f"\t\t+ {prefix} latency across {len(self.ranks)} ranks:")
+        LOGGER.info(f"\t\t\t+ max mean: {self.max.mean:f} {self.unit}")
+        LOGGER.info(f"\t\t\t+ min mean: {self.min.mean:f} {self.unit}")
+        LOGGER.info(f"\t\t\t+ spread mean: {self.spread.mean:f} {self.unit} (p99: {self.spread.p99:f} {self.unit})")
+        for rank, (latency, slowest_count) in enumerate(zip(self.ranks, self.slowest_counts)):
+            LOGGER.info(
+                f"\t\t\t+ rank {rank}: mean {latency.mean:f} {self.unit}, slowest in {slowest_count} iteration(s)"
+            )
+        if self.stragglers:
+            LOGGER.warning(f"\t\t\t+ straggler rank(s): {self.stragglers}")
+
+
 class LatencyTracker:
     def __init__(self, device: str, backend: str):
         self.device = device
@@ -135,10 +236,16 @@ class LatencyTracker:
         self.start_events: List[Union[float, torch.cuda.Event]] = []
         self.end_events: List[Union[float, torch.cuda.Event]] = []
 
+        # host time of a reference event, to convert cuda events into host timestamps
+        self.reference_time: Optional[float] = None
+        self.reference_event: Optional[torch.cuda.Event] = None
+
     def reset(self):
         self.start_time = None
         self.start_events = []
         self.end_events = []
+        self.reference_time = None
+        self.reference_event = None
 
     @contextmanager
     def track(self):
@@ -153,7 +260,16 @@ class LatencyTracker:
         if self.distributed:
             torch.distributed.barrier()
 
+        heartbeat()
+
     def _pytorch_cuda_latency(self):
+        if self.reference_event is None:
+            torch.cuda.synchronize()
+            self.reference_event = torch.cuda.Event(enable_timing=True)
+            self.reference_event.record()
+            torch.cuda.synchronize()
+            self.reference_time = time.perf_counter()
+
         self.start_events.append(torch.cuda.Event(enable_timing=True))
         self.start_events[-1].record()
 
@@ -182,18 +298,33 @@ class LatencyTracker:
 
         return Latency.from_values(latencies_list, unit=LATENCY_UNIT)
 
+    def get_intervals(self) -> List[Tuple[float, float]]:
+        """Returns the (start, end) host timestamps (in time.perf_counter's reference) of the tracked calls."""
+
+        if self.asynchronous:
+            torch.cuda.synchronize()  # synchronize the device to make sure all events have been recorded
+            return [
+                (
+                    self.reference_time + self.reference_event.elapsed_time(start_event) / 1e3,
+                    self.reference_time + self.reference_event.elapsed_time(end_event) / 1e3,
+                )
+                for start_event, end_event in zip(self.start_events, self.end_events)
+            ]
+        else:
+            return list(zip(self.start_events, self.end_events))
+
     def count(self):
-        assert len(self.start_events) == len(
-            self.end_events
-        ), "Mismatched number of start and end events, count() should only be called outside of track() context"
+        assert len(self.start_events) == len(self.end_events), (
+            "Mismatched number of start and end events, count() should only be called outside of track() context"
+        )
 
         return len(self.start_events)
 
     def elapsed(self):
         if self.start_time is None:
-            assert (
-                len(self.start_events) == 0 and len(self.end_events) == 0
-            ), "Number of recorded events is not zero, make sure to reset() the tracker properly"
+            assert len(self.start_events) == 0 and len(self.end_events) == 0, (
+                "Number of recorded events is not zero, make sure to reset() the tracker properly"
+            )
 
             self.start_time = time.perf_counter()
 
@@ -227,6 +358,8 @@ class StepLatencyTrainerCallback(TrainerCallback):
         else:
             self.end_events.append(time.perf_counter())
 
+        heartbeat()
+
     def get_latency(self) -> Latency:
         if self.asynchronous:
             torch.cuda.synchronize()  # synchronize the device to make sure all events have been recorded
@@ -257,6 +390,10 @@ class PerTokenLatencyLogitsProcessor(LogitsProcessor):
         self.decode_start_events: List[Union[float, torch.cuda.Event]] = []
         self.decode_end_events: List[Union[float, torch.cuda.Event]] = []
 
+        # host time of a reference event, to convert cuda events into host timestamps
+        self.reference_time: Optional[float] = None
+        self.reference_event: Optional[torch.cuda.Event] = None
+
     def reset(self):
         self.start_time = None
         self.next_is_prefill_end_decode_start = None
@@ -266,12 +403,21 @@ class PerTokenLatencyLogitsProcessor(LogitsProcessor):
         self.prefill_end_events = []
         self.decode_start_events = []
         self.decode_end_events = []
+        self.reference_time = None
+        self.reference_event = None
 
     @contextmanager
     def track(self):
         if self.distributed:
             torch.distributed.barrier()
 
+        if self.asynchronous and self.reference_event is None:
+            torch.cuda.synchronize()
+            self.reference_event = torch.cuda.Event(enable_timing=True)
+            self.reference_event.record()
+            torch.cuda.synchronize()
+            self.reference_time = time.perf_counter()
+
         if self.asynchronous:
             self.prefill_start_events.append(torch.cuda.Event(enable_timing=True))
             self.prefill_start_events[-1].record()
@@ -293,10 +439,12 @@ class PerTokenLatencyLogitsProcessor(LogitsProcessor):
         if self.distributed:
             torch.distributed.barrier()
 
+        heartbeat()
+
     def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor):
-        assert (
-            self.next_is_prefill_end_decode_start is not None
-        ), "PerTokenLatencyLogitsProcessor should only be called inside of track() context"
+        assert self.next_is_prefill_end_decode_start is not None, (
+            "PerTokenLatencyLogitsProcessor should only be called inside of track() context"
+        )
 
         if self.asynchronous:
             event = torch.cuda.Event(enable_timing=True)
@@ -346,6 +494,31 @@ class PerTokenLatencyLogitsProcessor(LogitsProcessor):
 
         return Latency.from_values(latencies_list, unit=LATENCY_UNIT)
 
+    def get_intervals(
+        self, start_events: List[Union[float, torch.cuda.Event]], end_events: List[Union[float, torch.cuda.Event]]
+    ) -> List[Tuple[float, float]]:
+        if self.asynchronous:
+            torch.cuda.synchronize()  # synchronize the device to make sure all events have been recorded
+            return [
+                (
+                    self.reference_time + self.reference_event.elapsed_time(start_event) / 1e3,
+                    self.reference_time + self.reference_event.elapsed_time(end_event) / 1e3,
+                )
+                for start_event, end_event in zip(start_events, end_events)
+            ]
+        else:
+            return list(zip(start_events, end_events))
+
+    def get_prefill_intervals(self) -> List[Tuple[float, float]]:
+        """Returns the (start, end) host timestamps of the prefill phase of each tracked generation."""
+
+        return self.get_intervals(self.prefill_start_events, self.prefill_end_events)
+
+    def get_decode_intervals(self) -> List[Tuple[float, float]]:
+        """Returns the (start, end) host timestamps of the decode phase of each tracked generation."""
+
+        return self.get_intervals(self.decode_start_events, self.decode_end_events)
+
     def get_per_token_latency(self) -> Latency:
         if self.asynchronous:
             torch.cuda.synchronize()  # synchronize the device to make sure all events have been recorded
@@ -364,17 +537,17 @@ class PerTokenLatencyLogitsProcessor(LogitsProcessor):
         return Latency.from_values(latencies_list, unit=LATENCY_UNIT)
 
     def count(self):
-        assert len(self.prefill_start_events) == len(
-            self.prefill_end_events
-        ), "Mismatched number of start and end events, count() should only be called outside of track() context"
+        assert len(self.prefill_start_events) == len(self.prefill_end_events), (
+            "Mismatched number of start and end events, count() should only be called outside of track() context"
+        )
 
         return len(self.prefill_start_events)
 
     def elapsed(self):
         if self.start_time is None:
-            assert (
-                len(self.prefill_start_events) == 0 and len(self.prefill_end_events) == 0
-            ), "Number of recorded events is not zero, make sure to reset() the tracker properly"
+            assert len(self.prefill_start_events) == 0 and len(self.prefill_end_events) == 0, (
+                "Number of recorded events is not zero, make sure to reset() the tracker properly"
+            )
 
             self.start_time = time.perf_counter()
 
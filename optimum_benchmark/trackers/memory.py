@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from logging import getLogger
 from multiprocessing import Pipe, Process
 from multiprocessing.connection import Connection
-from typing import List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from ..import_utils import (
     is_amdsmi_available,
@@ -31,6 +31,7 @@ if is_torch_available():
     import torch
 
 import psutil
+from transformers import TrainerCallback
 
 LOGGER = getLogger("memory")
 
@@ -94,13 +95,70 @@ class Memory:
             LOGGER.info(f"\t\t\t- max allocated memory: {self.max_allocated:f} ({self.unit})")
 
 
+@dataclass
+class MemoryBreakdown:
+    unit: Memory_Unit_Literal
+
+    weights: Optional[float] = None
+    kv_cache: Optional[float] = None
+    gradients: Optional[float] = None
+    optimizer_state: Optional[float] = None
+    activations: Optional[float] = None
+    allocator_overhead: Optional[float] = None
+
+    @staticmethod
+    def aggregate(breakdowns: List["MemoryBreakdown"]) -> "MemoryBreakdown":
+        if len(breakdowns) == 0:
+            raise ValueError("No memory breakdowns to aggregate")
+        elif any(breakdown is None for breakdown in breakdowns):
+            raise ValueError("Some memory breakdowns are missing")
+
+        def total(attr: str) -> Optional[float]:
+            values = [getattr(breakdown, attr) for breakdown in breakdowns]
+            return sum(values) if all(value is not None for value in values) else None
+
+        return MemoryBreakdown(
+            unit=breakdowns[0].unit,
+            weights=total("weights"),
+            kv_cache=total("kv_cache"),
+            gradients=total("gradients"),
+            optimizer_state=total("optimizer_state"),
+            activations=total("activations"),
+            allocator_overhead=total("allocator_overhead"),
+        )
+
+    def log(self, prefix: str = "forward"):
+        LOGGER.info(f"\t\t+ {prefix} memory breakdown:")
+        if self.weights is not None:
+            LOGGER.info(f"\t\t\t- weights: {self.weights:f} ({self.unit})")
+        if self.kv_cache is not None:
+            LOGGER.info(f"\t\t\t- kv cache: {self.kv_cache:f} ({self.unit})")
+        if self.gradients is not None:
+            LOGGER.info(f"\t\t\t- gradients: {self.gradients:f} ({self.unit})")
+        if self.optimizer_state is not None:
+            LOGGER.info(f"\t\t\t- optimizer state: {self.optimizer_state:f} ({self.unit})")
+        if self.activations is not None:
+            LOGGER.info(f"\t\t\t- activations: {self.activations:f} ({self.unit})")
+        if self.allocator_overhead is not None:
+            LOGGER.info(f"\t\t\t- allocator overhead: {self.allocator_overhead:f} ({self.unit})")
+
+
 class MemoryTracker:
-    def __init__(self, device: str, backend: str, device_ids: Optional[str] = None):
+    def __init__(
+        self,
+        device: str,
+        backend: str,
+        device_ids: Optional[str] = None,
+        track_allocator: bool = True,
+        interval: Optional[float] = None,
+    ):
         self.device = device
         self.backend = backend
         self.device_ids = device_ids
+        # polling interval of the memory monitors, the monitors' defaults if None
+        self.monitor_kwargs = {"interval": interval} if interval is not None else {}
         self.monitored_pid = int(os.environ.get("BENCHMARK_PID", os.getpid()))
-        self.track_cuda_pytorch_memory = self.device == "cuda" and self.backend == "pytorch"
+        self.track_cuda_pytorch_memory = self.device == "cuda" and self.backend == "pytorch" and track_allocator
         self.distributed = is_torch_distributed_available() and torch.distributed.is_initialized()
 
         LOGGER.info("\t+ Tracking RAM memory")
@@ -123,8 +181,10 @@ class MemoryTracker:
         self.max_process_vram_memory = None
         self.max_reserved_memory = None
         self.max_allocated_memory = None
+        self.steady_memory = None
 
     def reset(self):
+        self.steady_memory = None
         self.max_ram_memory = None
         self.max_global_vram_memory = None
         self.max_process_vram_memory = None
@@ -156,6 +216,10 @@ class MemoryTracker:
             except Exception as e:
                 LOGGER.warning(f"\t\t+ Could not reset max memory stats for device {device}: {e}")
 
+        self.steady_memory = sum(
+            torch.cuda.memory_allocated(device=device) / 1e6 for device in range(self.num_pytorch_devices)
+        )
+
         yield from self._cuda_memory()
 
         self.max_allocated_memory = sum(
@@ -172,7 +236,10 @@ class MemoryTracker:
         child_connection, parent_connection = Pipe()
 
         memory_process = Process(
-            target=monitor_gpu_vram_memory, args=(self.monitored_pid, self.device_ids, child_connection), daemon=True
+            target=monitor_gpu_vram_memory,
+            args=(self.monitored_pid, self.device_ids, child_connection),
+            kwargs=self.monitor_kwargs,
+            daemon=True,
         )
         memory_process.start()
         parent_connection.recv()  # wait for memory process to be ready
@@ -184,9 +251,15 @@ class MemoryTracker:
         self.max_process_vram_memory = parent_connection.recv()
 
     def _cpu_memory(self):
+        if self.device == "cpu":
+            self.steady_memory = psutil.Process(self.monitored_pid).memory_info().rss / 1e6
+
         child_connection, parent_connection = Pipe()
         memory_process = Process(
-            target=monitor_cpu_ram_memory, args=(self.monitored_pid, child_connection), daemon=True
+            target=monitor_cpu_ram_memory,
+            args=(self.monitored_pid, child_connection),
+            kwargs=self.monitor_kwargs,
+            daemon=True,
         )
         memory_process.start()
         parent_connection.recv()  # wait for memory process to be ready
@@ -206,6 +279,270 @@ class MemoryTracker:
             max_allocated=self.max_allocated_memory,
         )
 
+    def get_memory_breakdown(
+        self, weights_memory: Optional[float] = None, kv_cache_memory: Optional[float] = None
+    ) -> MemoryBreakdown:
+        """
+        Decomposes the last tracked peak memory, activations are the transient memory on top of the
+        steady state (memory held before the tracked call) and the kv cache, while allocator overhead
+        is the memory reserved but not allocated by the caching allocator.
+        """
+
+        if self.max_allocated_memory is not None:
+            peak_memory = self.max_allocated_memory
+        elif self.device == "cpu":
+            peak_memory = self.max_ram_memory
+        else:
+            peak_memory = None
+
+        if peak_memory is not None and self.steady_memory is not None:
+            activations_memory = max(peak_memory - self.steady_memory - (kv_cache_memory or 0), 0)
+        else:
+            activations_memory = None
+
+        if self.max_reserved_memory is not None and self.max_allocated_memory is not None:
+            allocator_overhead_memory = self.max_reserved_memory - self.max_allocated_memory
+        else:
+            allocator_overhead_memory = None
+
+        return MemoryBreakdown(
+            unit=MEMORY_UNIT,
+            weights=weights_memory,
+            kv_cache=kv_cache_memory,
+            activations=activations_memory,
+            allocator_overhead=allocator_overhead_memory,
+        )
+
+
+class StepMemoryTrainerCallback(TrainerCallback):
+    """
+    Tracks the peak memory of the warmup and train phases separately, and attributes it to parameters,
+    gradients (measured before each optimizer step), optimizer state (measured after each optimizer step)
+    and activations (tensors saved for backward during each forward pass, excluding parameters).
+    """
+
+    def __init__(self, device: str, backend: str, warmup_steps: int, device_ids: Optional[str] = None) -> None:
+        self.device = device
+        self.backend = backend
+        self.warmup_steps = warmup_steps
+        self.track_cuda_pytorch_memory = self.device == "cuda" and self.backend == "pytorch"
+
+        self.memory_tracker = MemoryTracker(device=device, backend=backend, device_ids=device_ids)
+
+        self.step = 0
+        self.phase = None
+        self.phase_context = None
+        self.phases_memory: Dict[str, Memory] = {}
+        self.phases_breakdown: Dict[str, MemoryBreakdown] = {}
+
+        self.parameters_memory = None
+        self.parameters_pointers = set()
+        self.steps_max_allocated: List[float] = []
+        self.steps_max_reserved: List[float] = []
+        self.steps_gradients: List[float] = []
+        self.steps_optimizer_state: List[float] = []
+        self.steps_activations: List[float] = []
+
+        self.saved_tensors = {}
+        self.saved_tensors_hooks = None
+        self.hooks_handles = []
+
+    ## Hooks
+    def pack_hook(self, tensor):
+        storage = tensor.untyped_storage()
+        if storage.data_ptr() not in self.parameters_pointers:
+            self.saved_tensors[storage.data_ptr()] = storage.nbytes()
+        return tensor
+
+    def unpack_hook(self, tensor):
+        return tensor
+
+    def forward_pre_hook(self, *args, **kwargs):
+        self.saved_tensors = {}
+
+        self.saved_tensors_hooks = torch.autograd.graph.saved_tensors_hooks(self.pack_hook, self.unpack_hook)
+        self.saved_tensors_hooks.__enter__()
+
+    def forward_hook(self, *args, **kwargs):
+        self.saved_tensors_hooks.__exit__(None, None, None)
+        self.saved_tensors_hooks = None
+
+        # activations of gradient accumulation substeps are freed by their backward pass
+        self.step_activations = max(self.step_activations, sum(self.saved_tensors.values()) / 1e6)
+
+    def optimizer_pre_step_hook(self, optimizer, *args, **kwargs):
+        self.step_gradients = (
+            get_tensors_memory([param.grad for group in optimizer.param_groups for param in group["params"]]) or 0
+        )
+
+    def optimizer_post_step_hook(self, optimizer, *args, **kwargs):
+        self.step_optimizer_state = get_tensors_memory(list(optimizer.state.values())) or 0
+
+    ## Phases
+    def start_phase(self, phase: str):
+        self.phase = phase
+        self.phase_start_step = self.step
+        self.memory_tracker.reset()
+        self.phase_context = self.memory_tracker.track()
+        self.phase_context.__enter__()
+
+    def end_phase(self):
+        self.phase_context.__exit__(None, None, None)
+        self.phase_context = None
+
+        memory = self.memory_tracker.get_max_memory()
+        steps = slice(self.phase_start_step, self.step)
+
+        if self.track_cuda_pytorch_memory and len(self.steps_max_allocated[steps]) > 0:
+            # peak memory stats are reset at every step
+            memory.max_allocated = max(self.steps_max_allocated[steps])
+            memory.max_reserved = max(self.steps_max_reserved[steps])
+
+        self.phases_memory[self.phase] = memory
+        self.phases_breakdown[self.phase] = MemoryBreakdown(
+            unit=MEMORY_UNIT,
+            weights=self.parameters_memory,
+            gradients=max(self.steps_gradients[steps], default=None),
+            optimizer_state=max(self.steps_optimizer_state[steps], default=None),
+            activations=max(self.steps_activations[steps], default=None),
+            allocator_overhead=(
+                memory.max_reserved - memory.max_allocated
+                if memory.max_reserved is not None and memory.max_allocated is not None
+                else None
+            ),
+        )
+
+    ## Callbacks
+    def on_train_begin(self, args, state, control, model=None, optimizer=None, **kwargs):
+        self.parameters_memory = get_tensors_memory(model)
+        self.parameters_pointers = {param.untyped_storage().data_ptr() for param in model.parameters()}
+
+        self.hooks_handles.append(model.register_forward_pre_hook(self.forward_pre_hook))
+        self.hooks_handles.append(model.register_forward_hook(self.forward_hook))
+
+        if optimizer is not None:
+            # unwrap accelerate's optimizer
+            optimizer = getattr(optimizer, "optimizer", optimizer)
+            self.hooks_handles.append(optimizer.register_step_pre_hook(self.optimizer_pre_step_hook))
+            self.hooks_handles.append(optimizer.register_step_post_hook(self.optimizer_post_step_hook))
+
+        self.start_phase("warmup" if self.warmup_steps > 0 else "train")
+
+    def on_step_begin(self, *args, **kwargs):
+        self.step_gradients = 0
+        self.step_optimizer_state = 0
+        self.step_activations = 0
+
+        if self.track_cuda_pytorch_memory:
+            for device in range(torch.cuda.device_count()):
+                torch.cuda.reset_peak_memory_stats(device=device)
+
+    def on_step_end(self, *args, **kwargs):
+        if self.track_cuda_pytorch_memory:
+            self.steps_max_allocated.append(
+                sum(torch.cuda.max_memory_allocated(device=device) / 1e6 for device in range(torch.cuda.device_count()))
+            )
+            self.steps_max_reserved.append(
+                sum(torch.cuda.max_memory_reserved(device=device) / 1e6 for device in range(torch.cuda.device_count()))
+            )
+
+        self.steps_gradients.append(self.step_gradients)
+        self.steps_optimizer_state.append(self.step_optimizer_state)
+        self.steps_activations.append(self.step_activations)
+
+        self.step += 1
+
+        if self.step == self.warmup_steps:
+            self.end_phase()
+            self.start_phase("train")
+
+    def on_train_end(self, *args, **kwargs):
+        self.end_phase()
+
+        for handle in self.hooks_handles:
+            handle.remove()
+        self.hooks_handles = []
+
+    def get_phase_memory(self, phase: str) -> Memory:
+        return self.phases_memory[phase]
+
+    def get_phase_memory_breakdown(self, phase: str) -> MemoryBreakdown:
+        return self.phases_breakdown[phase]
+
+    def get_max_memory(self) -> Memory:
+        memories = list(self.phases_memory.values())
+
+        def peak(attr: str) -> Optional[float]:
+            values = [getattr(memory, attr) for memory in memories]
+            return max(values) if all(value is not None for value in values) else None
+
+        return Memory(
+            unit=MEMORY_UNIT,
+            max_ram=peak("max_ram"),
+            max_global_vram=peak("max_global_vram"),
+            max_process_vram=peak("max_process_vram"),
+            max_reserved=peak("max_reserved"),
+            max_allocated=peak("max_allocated"),
+        )
+
+    def get_max_memory_breakdown(self) -> MemoryBreakdown:
+        breakdowns = list(self.phases_breakdown.values())
+
+        def peak(attr: str) -> Optional[float]:
+            values = [getattr(breakdown, attr) for breakdown in breakdowns]
+            return max(values) if all(value is not None for value in values) else None
+
+        return MemoryBreakdown(
+            unit=MEMORY_UNIT,
+            weights=self.parameters_memory,
+            gradients=peak("gradients"),
+            optimizer_state=peak("optimizer_state"),
+            activations=peak("activations"),
+            allocator_overhead=peak("allocator_overhead"),
+        )
+
+
+def get_tensors_memory(obj: Any) -> Optional[float]:
+    """
+    Returns the memory (in MB) of all the tensors held by an object (model, cache, model outputs, etc.),
+    walking through its containers and attributes and counting shared tensors only once.
+    """
+
+    if not is_torch_available():
+        return None
+
+    storages = {}
+    visited = set()
+
+    def walk(obj: Any):
+        if id(obj) in visited or obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+            return
+        visited.add(id(obj))
+
+        if isinstance(obj, torch.Tensor):
+            storage = obj.untyped_storage()
+            storages[(obj.device, storage.data_ptr())] = storage.nbytes()
+        elif isinstance(obj, torch.nn.Module):
+            for tensor in obj.state_dict(keep_vars=True).values():
+                walk(tensor)
+        elif isinstance(obj, dict):
+            for value in obj.values():
+                walk(value)
+        elif isinstance(obj, (list, tuple, set)):
+            for value in obj:
+                walk(value)
+        elif hasattr(obj, "__dict__") and type(obj).__module__.startswith("transformers"):
+            # cache objects (DynamicCache, StaticCache, QuantizedCache, etc.)
+            for value in vars(obj).values():
+                walk(value)
+
+    walk(obj)
+
+    if len(storages) == 0:
+        return None
+
+    return sum(storages.values()) / 1e6
+
 
 def monitor_cpu_ram_memory(monitored_pid: int, connection: Connection, interval: float = 0.001):
     stop = False
@@ -0,0 +1,382 @@
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Dict, List, Literal, Optional
+
+from ..system_utils import get_cpu_available_ram_mb, get_gpu_available_vram_mb
+from ..task_utils import IMAGE_DIFFUSION_TASKS, TEXT_GENERATION_TASKS
+
+LOGGER = getLogger("memory-estimator")
+
+MEMORY_UNIT = "MB"
+Memory_Unit_Literal = Literal["MB"]
+
+DTYPES_BYTES = {"float64": 8, "float32": 4, "float16": 2, "bfloat16": 2, "int8": 1}
+
+# model types using a gated MLP (gate, up and down projections)
+GATED_MLP_MODEL_TYPES = [
+    "llama",
+    "mistral",
+    "mixtral",
+    "qwen2",
+    "qwen2_moe",
+    "gemma",
+    "gemma2",
+    "phi3",
+    "cohere",
+    "olmo",
+    "stablelm",
+    "dbrx",
+    "jamba",
+]
+
+# attributes only found in the configs of models using rotary position embeddings
+ROTARY_ATTRIBUTES = {"rope_theta", "rope_parameters", "rope_scaling", "rotary_dim", "rotary_pct", "rotary_emb_base"}
+
+# calibration constants, adjust them using the estimated vs measured memory in the reports
+RUNTIME_OVERHEAD = {"cpu": 1000, "cuda": 500}  # in MB, python runtime / cuda context
+ALLOCATOR_OVERHEAD_FACTOR = 0.1  # fragmentation of dynamic allocations (kv cache and activations)
+QUANTIZATION_OVERHEAD_FACTOR = 1.05  # scales and zero points of quantized weights
+OPTIMIZER_STATE_BYTES = 8  # AdamW keeps two float32 states per trainable parameter
+
+# backends serving the model from a container, whose memory isn't the one of the benchmark's process
+CONTAINERIZED_BACKENDS = ["py-txi", "llm-swarm"]
+
+
+@dataclass
+class MemoryEstimate:
+    unit: Memory_Unit_Literal
+
+    weights: float
+    kv_cache: float
+    activations: float
+    gradients: float
+    optimizer_state: float
+    overhead: float
+    total: float
+
+    @staticmethod
+    def from_components(
+        weights: float,
+        kv_cache: float = 0,
+        activations: float = 0,
+        gradients: float = 0,
+        optimizer_state: float = 0,
+        runtime_overhead: float = 0,
+    ) -> "MemoryEstimate":
+        overhead = runtime_overhead + ALLOCATOR_OVERHEAD_FACTOR * (kv_cache + activations)
+        total = weights + kv_cache + activations + gradients + optimizer_state + overhead
+
+        return MemoryEstimate(
+            unit=MEMORY_UNIT,
+            weights=weights,
+            kv_cache=kv_cache,
+            activations=activations,
+            gradients=gradients,
+            optimizer_state=optimizer_state,
+            overhead=overhead,
+            total=total,
+        )
+
+    def log(self, prefix: str = "forward"):
+        LOGGER.info(f"\t\t+ {prefix} estimated memory:")
+        LOGGER.info(f"\t\t\t- weights: {self.weights:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t- kv cache: {self.kv_cache:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t- activations: {self.activations:f} ({self.unit})")
+        if self.gradients > 0:
+            LOGGER.info(f"\t\t\t- gradients: {self.gradients:f} ({self.unit})")
+        if self.optimizer_state > 0:
+            LOGGER.info(f"\t\t\t- optimizer state: {self.optimizer_state:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t- overhead: {self.overhead:f} ({self.unit})")
+        LOGGER.info(f"\t\t\t- total: {self.total:f} ({self.unit})")
+
+
+def get_measured_peak_memory(memory: Any) -> Optional[float]:
+    """Returns the measured value that is comparable to an estimate's total (the memory of the model's device)."""
+    for key in ["max_process_vram", "max_reserved", "max_global_vram", "max_ram"]:
+        value = memory.get(key, None) if isinstance(memory, dict) else getattr(memory, key, None)
+        if value is not None:
+            return value
+
+    return None
+
+
+## Model architecture
+def get_config_attribute(config: Any, names: List[str], default: Any = None) -> Any:
+    for name in names:
+        value = getattr(config, name, None)
+        if value is not None:
+            return value
+
+    return default
+
+
+def get_dtype_name(dtype: Any) -> Optional[str]:
+    if dtype is None:
+        return None
+
+    # handles torch.dtype objects and their string representations
+    return str(dtype).replace("torch.", "")
+
+
+def get_model_dimensions(config: Any) -> Dict[str, int]:
+    hidden_size = get_config_attribute(config, ["hidden_size", "d_model", "n_embd", "dim"])
+    num_layers = get_config_attribute(config, ["num_hidden_layers", "num_layers", "n_layer", "n_layers"])
+    num_heads = get_config_attribute(config, ["num_attention_heads", "num_heads", "n_head", "n_heads"])
+
+    if hidden_size is None or num_layers is None or num_heads is None:
+        raise ValueError(f"Could not infer the dimensions of model type {getattr(config, 'model_type', None)}")
+
+    head_dim = get_config_attribute(config, ["head_dim", "d_kv"], hidden_size // num_heads)
+
+    if getattr(config, "multi_query", False) and not getattr(config, "new_decoder_architecture", False):
+        num_kv_heads = 1
+    else:
+        num_kv_heads = get_config_attribute(config, ["num_key_value_heads", "num_kv_heads", "n_head_kv"], num_heads)
+
+    intermediate_size = get_config_attribute(
+        config, ["intermediate_size", "ffn_hidden_size", "n_inner", "d_ff", "ffn_dim"], 4 * hidden_size
+    )
+
+    num_experts = get_config_attribute(config, ["num_local_experts", "num_experts", "moe_num_experts"], 1)
+
+    if getattr(config, "is_encoder_decoder", False):
+        num_decoder_layers = get_config_attribute(config, ["num_decoder_layers", "decoder_layers"], num_layers)
+    else:
+        num_decoder_layers = 0
+
+    return {
+        "hidden_size": hidden_size,
+        "num_layers": num_layers,
+        "num_decoder_layers": num_decoder_layers,
+        "num_heads": num_heads,
+        "num_kv_heads": num_kv_heads,
+        "head_dim": head_dim,
+        "intermediate_size": intermediate_size,
+        "num_experts": num_experts,
+        "vocab_size": get_config_attribute(config, ["vocab_size", "padded_vocab_size"], 0),
+    }
+
+
+def estimate_num_parameters(config: Any) -> Dict[str, int]:
+    """
+    Estimates the number of parameters of a transformers model from its pretrained config.
+    Returns the number of parameters in embeddings/heads and in transformer blocks separately,
+    since quantization schemes only quantize the latter.
+    """
+    dims = get_model_dimensions(config)
+    hidden_size, head_dim = dims["hidden_size"], dims["head_dim"]
+
+    embeddings = dims["vocab_size"] * hidden_size
+    if not ROTARY_ATTRIBUTES & set(config.to_dict().keys()):
+        # learned absolute position embeddings
+        embeddings += get_config_attribute(config, ["max_position_embeddings", "n_positions"], 0) * hidden_size
+    if not getattr(config, "tie_word_embeddings", True):
+        embeddings += dims["vocab_size"] * hidden_size
+
+    attention = 2 * hidden_size * dims["num_heads"] * head_dim + 2 * hidden_size * dims["num_kv_heads"] * head_dim
+    gated = (
+        getattr(config, "model_type", None) in GATED_MLP_MODEL_TYPES or getattr(config, "hidden_act", None) == "silu"
+    )
+    mlp = (3 if gated else 2) * hidden_size * dims["intermediate_size"] * dims["num_experts"]
+    if dims["num_experts"] > 1:
+        mlp += hidden_size * dims["num_experts"]  # router
+    norms = 2 * hidden_size
+
+    blocks = dims["num_layers"] * (attention + mlp + norms)
+    # decoder blocks of encoder-decoder models have an additional cross-attention
+    blocks += dims["num_decoder_layers"] * (2 * attention + mlp + 3 * hidden_size)
+
+    return {"embeddings": embeddings, "blocks": blocks, "total": embeddings + blocks}
+
+
+## Precision
+def get_compute_bytes(backend_config: Any, pretrained_config: Any) -> int:
+    dtype = get_dtype_name(getattr(backend_config, "torch_dtype", None) or getattr(backend_config, "dtype", None))
+
+    if dtype == "auto":
+        dtype = get_dtype_name(getattr(pretrained_config, "torch_dtype", None))
+
+    if dtype is None and (getattr(backend_config, "half", False) or get_quantization_bits(backend_config, None)):
+        dtype = "float16"
+
+    if dtype is None:
+        dtype = get_dtype_name(getattr(pretrained_config, "torch_dtype", None))
+
+    return DTYPES_BYTES.get(dtype, 4)
+
+
+def get_quantization_bits(backend_config: Any, pretrained_config: Any) -> Optional[int]:
+    quantization_config = dict(getattr(pretrained_config, "quantization_config", None) or {})
+    quantization_config.update(getattr(backend_config, "quantization_config", None) or {})
+
+    if quantization_config.get("load_in_4bit", False):
+        return 4
+    elif quantization_config.get("load_in_8bit", False):
+        return 8
+    elif quantization_config.get("bits", None) is not None:
+        return quantization_config["bits"]
+    elif getattr(backend_config, "quantization_scheme", None) is not None:
+        return 4
+    elif getattr(backend_config, "quantize", None) is not None:
+        # py-txi backend
+        return 8 if "8" in str(backend_config.quantize) else 4
+
+    return None
+
+
+## Estimation
+def estimate_inference_activations(
+    dims: Dict[str, int], batch_size: int, sequence_length: int, compute_bytes: int, attn_implementation: Optional[str]
+) -> float:
+    tokens = batch_size * sequence_length
+    # hidden states and intermediate projections alive during an mlp
+    activations = tokens * (2 * dims["hidden_size"] + 2 * dims["intermediate_size"]) * compute_bytes
+    # logits of the whole sequence, upcasted to float32
+    activations += tokens * dims["vocab_size"] * (compute_bytes + 4)
+
+    if attn_implementation == "eager":
+        # eager attention materializes the attention scores
+        activations += batch_size * dims["num_heads"] * sequence_length**2 * compute_bytes
+
+    return activations / 1e6
+
+
+def estimate_training_activations(
+    dims: Dict[str, int], batch_size: int, sequence_length: int, compute_bytes: int
+) -> float:
+    # https://arxiv.org/abs/2205.05198 (activations saved for backward, without recomputation)
+    s, b, h, a = sequence_length, batch_size, dims["hidden_size"], dims["num_heads"]
+    num_layers = dims["num_layers"] + dims["num_decoder_layers"]
+    activations = num_layers * s * b * h * (34 + 5 * a * s / h) * compute_bytes / 2
+    # logits and their gradients in float32
+    activations += 2 * b * s * dims["vocab_size"] * 4
+
+    return activations / 1e6
+
+
+def estimate_memory(
+    backend_config: Any, benchmark_config: Any, pretrained_config: Any = None
+) -> Dict[str, MemoryEstimate]:
+    """
+    Estimates the peak memory of each target of a benchmark's report from the model's pretrained config,
+    without loading the model. Returns an empty dict if the model's memory can't be estimated.
+    """
+    if backend_config.name in CONTAINERIZED_BACKENDS:
+        LOGGER.info(f"\t+ Memory estimation is not supported for containerized backends like {backend_config.name}")
+        return {}
+
+    if backend_config.library != "transformers" or backend_config.task in IMAGE_DIFFUSION_TASKS:
+        LOGGER.info(f"\t+ Memory estimation is not supported for {backend_config.library} models")
+        return {}
+
+    if pretrained_config is None:
+        from transformers import AutoConfig
+
+        pretrained_config = AutoConfig.from_pretrained(backend_config.model, **backend_config.hub_kwargs)
+
+    dims = get_model_dimensions(pretrained_config)
+    num_parameters = estimate_num_parameters(pretrained_config)
+    compute_bytes = get_compute_bytes(backend_config, pretrained_config)
+    quantization_bits = get_quantization_bits(backend_config, pretrained_config)
+
+    if quantization_bits is not None:
+        blocks_bytes = num_parameters["blocks"] * quantization_bits / 8 * QUANTIZATION_OVERHEAD_FACTOR
+    else:
+        blocks_bytes = num_parameters["blocks"] * compute_bytes
+
+    weights = (num_parameters["embeddings"] * compute_bytes + blocks_bytes) / 1e6
+    runtime_overhead = RUNTIME_OVERHEAD.get(backend_config.device, 0)
+    attn_implementation = getattr(backend_config, "attn_implementation", None)
+    kv_cache_per_token = (
+        2 * (dims["num_layers"] if dims["num_decoder_layers"] == 0 else dims["num_decoder_layers"])
+    ) * (dims["num_kv_heads"] * dims["head_dim"] * compute_bytes)
+
+    if benchmark_config.name == "training":
+        batch_size = benchmark_config.training_arguments["per_device_train_batch_size"]
+        sequence_length = benchmark_config.dataset_shapes["sequence_length"]
+        trainable_parameters = num_parameters["total"] if getattr(backend_config, "peft_type", None) is None else 0
+        estimate = MemoryEstimate.from_components(
+            weights=weights,
+            activations=estimate_training_activations(dims, batch_size, sequence_length, compute_bytes),
+            gradients=trainable_parameters * compute_bytes / 1e6,
+            optimizer_state=trainable_parameters * OPTIMIZER_STATE_BYTES / 1e6,
+            runtime_overhead=runtime_overhead,
+        )
+        return {"overall": estimate, "warmup": estimate, "train": estimate}
+
+    batch_size = benchmark_config.input_shapes["batch_size"]
+    sequence_length = benchmark_config.input_shapes["sequence_length"]
+    activations = estimate_inference_activations(dims, batch_size, sequence_length, compute_bytes, attn_implementation)
+
+    if backend_config.task in TEXT_GENERATION_TASKS:
+        num_beams = benchmark_config.generate_kwargs.get("num_beams", 1)
+        max_new_tokens = benchmark_config.generate_kwargs.get("max_new_tokens", 100)
+        prefill_tokens = batch_size * num_beams * (sequence_length + 1)
+        decode_tokens = batch_size * num_beams * (sequence_length + max_new_tokens)
+
+        return {
+            "prefill": MemoryEstimate.from_components(
+                weights=weights,
+                kv_cache=prefill_tokens * kv_cache_per_token / 1e6,
+                activations=activations,
+                runtime_overhead=runtime_overhead,
+            ),
+            "decode": MemoryEstimate.from_components(
+                weights=weights,
+                kv_cache=decode_tokens * kv_cache_per_token / 1e6,
+                activations=activations,
+                runtime_overhead=runtime_overhead,
+            ),
+        }
+
+    return {
+        "forward": MemoryEstimate.from_components(
+            weights=weights, activations=activations, runtime_overhead=runtime_overhead
+        )
+    }
+
+
+def get_required_memory(estimates: Dict[str, MemoryEstimate], launcher_config: Any) -> float:
+    peak = max(estimates.values(), key=lambda estimate: estimate.total)
+
+    if launcher_config.name == "torchrun":
+        # data parallelism replicates the weights on every process
+        num_processes = launcher_config.nproc_per_node * launcher_config.max_nodes
+        return peak.total + (num_processes - 1) * (peak.weights + peak.overhead)
+
+    return peak.total
+
+
+def is_sharded(backend_config: Any) -> bool:
+    return (
+        getattr(backend_config, "device_map", None) is not None
+        or getattr(backend_config, "deepspeed_inference", False)
+        or getattr(backend_config, "tp", 1) > 1
+    )
+
+
+def get_available_memory(backend_config: Any) -> float:
+    if backend_config.device == "cuda":
+        device_ids = [int(device_id) for device_id in backend_config.device_ids.split(",")]
+        vrams = get_gpu_available_vram_mb(device_ids=device_ids)
+        # a sharded model is spread across the devices, otherwise it has to fit in each of them
+        return sum(vrams) if is_sharded(backend_config) else min(vrams)
+
+    return get_cpu_available_ram_mb()
+
+
+def screen_memory(required_memory: float, available_memory: float, action: str) -> None:
+    if required_memory <= available_memory:
+        LOGGER.info(
+            f"\t+ Estimated peak memory ({required_memory:.0f} MB) fits in available memory ({available_memory:.0f} MB)"
+        )
+        return
+
+    message = f"Estimated peak memory ({required_memory:.0f} MB) exceeds available memory ({available_memory:.0f} MB). "
+
+    if action == "error":
+        raise RuntimeError(message + "Skipping experiment.")
+    elif action == "warn":
+        LOGGER.warning(message + "The experiment will probably run out of memory.")
+    else:
+        raise ValueError(f"Unsupported memory screening action {action}")
@@ -0,0 +1,267 @@
+import bisect
+import glob
+import os
+import threading
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Dict, List, Optional
+
+from ..import_utils import is_pynvml_available
+from ..system_utils import is_nvidia_system
+
+if is_nvidia_system() and is_pynvml_available():
+    import pynvml
+
+LOGGER = getLogger("rapl")
+
+SYSFS_ROOT = "/sys"
+MICROJOULES_PER_KWH = 3.6e12
+
+# top-level domains that are not part of the cpu packages
+NON_PACKAGE_DOMAINS = ["psys", "dram", "gpu"]
+# the timeline is halved (keeping every other sample) when it grows beyond this size
+MAX_SAMPLES = 100_000
+
+
+@dataclass
+class RAPLDomain:
+    name: str
+    counter_path: str
+    # counters wrap around to zero after this value, None for 64-bit accumulators
+    max_energy_range: Optional[int] = None
+
+    def read(self) -> int:
+        with open(self.counter_path, "r") as f:
+            return int(f.read().strip())
+
+    @property
+    def is_package(self) -> bool:
+        return "/" not in self.name and not any(domain in self.name for domain in NON_PACKAGE_DOMAINS)
+
+    @property
+    def is_dram(self) -> bool:
+        return self.name.split("/")[-1].startswith("dram")
+
+    @property
+    def is_gpu(self) -> bool:
+        return self.name.startswith("gpu")
+
+
+@dataclass
+class NVMLDomain(RAPLDomain):
+    """Exposes the total energy counter of an NVIDIA GPU (in mJ) as a RAPL domain (in uJ)."""
+
+    handle: Any = None
+
+    def read(self) -> int:
+        return pynvml.nvmlDeviceGetTotalEnergyConsumption(self.handle) * 1000
+
+
+def read_file(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read().strip()
+
+
+def get_powercap_domains(sysfs_root: str = SYSFS_ROOT) -> List[RAPLDomain]:
+    """
+    Lists the energy counters exposed through the powercap interface (Intel RAPL and AMD RAPL on recent kernels),
+    packages are named after their zone (e.g. package-0) and subzones after their package (e.g. package-0/dram).
+    """
+    domains = []
+
+    for zone_path in sorted(glob.glob(os.path.join(sysfs_root, "class", "powercap", "intel-rapl:*"))):
+        zone_id = os.path.basename(zone_path)[len("intel-rapl:") :]
+        if ":" in zone_id:
+            # subzones are listed inside their parent zone
+            continue
+
+        zone_name = read_file(os.path.join(zone_path, "name"))
+        domains.append(get_powercap_domain(zone_path, zone_name))
+
+        for subzone_path in sorted(glob.glob(os.path.join(zone_path, f"intel-rapl:{zone_id}:*"))):
+            subzone_name = read_file(os.path.join(subzone_path, "name"))
+            domains.append(get_powercap_domain(subzone_path, f"{zone_name}/{subzone_name}"))
+
+    return domains
+
+
+def get_powercap_domain(zone_path: str, name: str) -> RAPLDomain:
+    max_energy_range_path = os.path.join(zone_path, "max_energy_range_uj")
+    max_energy_range = int(read_file(max_energy_range_path)) if os.path.exists(max_energy_range_path) else None
+    return RAPLDomain(name=name, counter_path=os.path.join(zone_path, "energy_uj"), max_energy_range=max_energy_range)
+
+
+def get_amd_energy_domains(sysfs_root: str = SYSFS_ROOT) -> List[RAPLDomain]:
+    """
+    Lists the socket energy counters exposed by the amd_energy hwmon driver (e.g. Esocket0 -> package-0),
+    per-core counters are skipped since they are included in the socket counters.
+    """
+    domains = []
+
+    for hwmon_path in sorted(glob.glob(os.path.join(sysfs_root, "class", "hwmon", "hwmon*"))):
+        name_path = os.path.join(hwmon_path, "name")
+        if not os.path.exists(name_path) or read_file(name_path) != "amd_energy":
+            continue
+
+        for label_path in sorted(glob.glob(os.path.join(hwmon_path, "energy*_label"))):
+            label = read_file(label_path)
+            if not label.startswith("Esocket"):
+                continue
+
+            counter_path = label_path.replace("_label", "_input")
+            domains.append(RAPLDomain(name=f"package-{label[len('Esocket') :]}", counter_path=counter_path))
+
+    return domains
+
+
+def get_rapl_domains(sysfs_root: str = SYSFS_ROOT) -> List[RAPLDomain]:
+    domains = get_powercap_domains(sysfs_root)
+
+    if len(domains) == 0:
+        domains = get_amd_energy_domains(sysfs_root)
+
+    return domains
+
+
+class RAPLReader:
+    """
+    Reads RAPL energy counters (and optionally other energy counters, e.g. GPUs) at start and stop, handling counter
+    wraparounds. If a sampling interval is given, counters are also read periodically in a background thread, which
+    handles multiple wraparounds during long runs and records a timeline of (timestamp, cumulative energy per domain),
+    whose resolution is halved whenever it grows beyond `MAX_SAMPLES` to bound its memory during long runs.
+    """
+
+    def __init__(
+        self,
+        sysfs_root: str = SYSFS_ROOT,
+        sampling_interval: Optional[float] = None,
+        extra_domains: Optional[List[RAPLDomain]] = None,
+    ):
+        self.sysfs_root = sysfs_root
+        self.sampling_interval = sampling_interval
+        self.domains = get_rapl_domains(sysfs_root)
+
+        if len(self.domains) == 0:
+            raise ValueError(
+                f"No RAPL energy counters found under {sysfs_root}. Make sure the intel_rapl (or amd_energy) "
+                "driver is loaded or use another energy source."
+            )
+
+        try:
+            self.read_counters()
+        except PermissionError:
+            raise PermissionError(
+                "RAPL energy counters are only readable by root on this system. Please run the benchmark as root "
+                "or make the counters readable (e.g. `sudo chmod o+r /sys/class/powercap/intel-rapl:*/energy_uj`)."
+            )
+
+        LOGGER.info(f"\t+ Tracking RAPL energy of domains {[domain.name for domain in self.domains]}")
+        self.domains += extra_domains or []
+
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.last_counters: Dict[str, int] = {}
+        self.energies: Dict[str, int] = {}
+        # timeline of the cumulative energies, timestamps are kept apart to be bisected
+        self.timestamps: List[float] = []
+        self.samples: List[Dict[str, int]] = []
+
+    def read_counters(self) -> Dict[str, int]:
+        return {domain.name: domain.read() for domain in self.domains}
+
+    def update(self) -> None:
+        timestamp = time.perf_counter()
+        counters = self.read_counters()
+
+        for domain in self.domains:
+            delta = counters[domain.name] - self.last_counters[domain.name]
+            if delta < 0 and domain.max_energy_range is not None:
+                # the counter wrapped around
+                delta += domain.max_energy_range
+            self.energies[domain.name] += max(delta, 0)
+
+        self.last_counters = counters
+        self.timestamps.append(timestamp)
+        self.samples.append(dict(self.energies))
+
+        if len(self.samples) > MAX_SAMPLES:
+            # the first and last samples are kept, they delimit the tracked window
+            self.timestamps = self.timestamps[:-1:2] + self.timestamps[-1:]
+            self.samples = self.samples[:-1:2] + self.samples[-1:]
+
+    def sample(self) -> None:
+        while not self.stop_event.wait(self.sampling_interval):
+            self.update()
+
+    def start(self) -> None:
+        self.last_counters = self.read_counters()
+        self.energies = {domain.name: 0 for domain in self.domains}
+        self.timestamps = [time.perf_counter()]
+        self.samples = [dict(self.energies)]
+
+        if self.sampling_interval is not None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.sample, daemon=True)
+            self.thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+        self.update()
+
+        return dict(self.energies)
+
+    def get_cpu_energy(self) -> float:  # in kWh
+        return sum(self.energies[domain.name] for domain in self.domains if domain.is_package) / MICROJOULES_PER_KWH
+
+    def get_ram_energy(self) -> float:  # in kWh
+        return sum(self.energies[domain.name] for domain in self.domains if domain.is_dram) / MICROJOULES_PER_KWH
+
+    def get_gpu_energy(self) -> float:  # in kWh
+        return sum(self.energies[domain.name] for domain in self.domains if domain.is_gpu) / MICROJOULES_PER_KWH
+
+    def get_domains_energy(self) -> Dict[str, float]:  # in kWh
+        return {name: energy / MICROJOULES_PER_KWH for name, energy in self.energies.items()}
+
+    def get_energies_at(self, timestamp: float) -> Dict[str, float]:  # in uJ
+        """Linearly interpolates the cumulative energy of each domain at a given timestamp from the samples."""
+
+        index = bisect.bisect_right(self.timestamps, timestamp)
+
+        # timestamps outside of the tracked window are clamped to its boundaries
+        if index == 0:
+            return dict(self.samples[0])
+        elif index == len(self.samples):
+            return dict(self.samples[-1])
+
+        start_time, end_time = self.timestamps[index - 1], self.timestamps[index]
+        start_energies, end_energies = self.samples[index - 1], self.samples[index]
+        ratio = (timestamp - start_time) / (end_time - start_time)
+
+        return {
+            name: start_energies[name] + ratio * (end_energies[name] - start_energies[name]) for name in start_energies
+        }
+
+    def get_interval_energies(self, start: float, end: float) -> Dict[str, float]:  # in uJ
+        start_energies, end_energies = self.get_energies_at(start), self.get_energies_at(end)
+        return {name: end_energies[name] - start_energies[name] for name in start_energies}
+
+    def get_power_timeline(self) -> Dict[str, Any]:  # in W
+        """Returns the average power of each domain between consecutive samples, timestamped at the end of each one."""
+
+        timestamps, power = [], {name: [] for name in self.energies}
+        for index in range(1, len(self.samples)):
+            duration = self.timestamps[index] - self.timestamps[index - 1]
+            if duration <= 0:
+                continue
+
+            timestamps.append(self.timestamps[index])
+            for name in power:
+                # uJ over seconds to W
+                power[name].append((self.samples[index][name] - self.samples[index - 1][name]) / 1e6 / duration)
+
+        return {"timestamps": timestamps, "power": power}
@@ -0,0 +1,296 @@
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, List, Literal, Optional
+
+import psutil
+
+from ..import_utils import is_torch_available
+from .memory import Memory, MemoryTracker
+
+if is_torch_available():
+    import torch
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+LOGGER = getLogger("stage")
+
+ACTIVITY_UNIT = "MB"
+Activity_Unit_Literal = Literal["MB"]
+
+ARTIFACT_UNIT = "MB"
+Artifact_Unit_Literal = Literal["MB"]
+
+# stage trackers that are currently recording, stages are recorded by the innermost one
+ACTIVE_STAGE_TRACKERS: List["StageTracker"] = []
+
+
+@dataclass
+class ProcessActivity:
+    unit: Activity_Unit_Literal
+
+    minor_page_faults: Optional[int] = None
+    major_page_faults: Optional[int] = None
+    storage_read: Optional[float] = None
+    total_read: Optional[float] = None
+
+    def __sub__(self, activity: "ProcessActivity") -> "ProcessActivity":
+        if not isinstance(activity, ProcessActivity):
+            raise ValueError(f"Cannot subtract {type(activity)} from ProcessActivity")
+
+        def delta(attr: str):
+            end, start = getattr(self, attr), getattr(activity, attr)
+            return end - start if end is not None and start is not None else None
+
+        return ProcessActivity(
+            unit=self.unit,
+            minor_page_faults=delta("minor_page_faults"),
+            major_page_faults=delta("major_page_faults"),
+            storage_read=delta("storage_read"),
+            total_read=delta("total_read"),
+        )
+
+    @staticmethod
+    def aggregate(activities: List["ProcessActivity"]) -> "ProcessActivity":
+        if len(activities) == 0:
+            raise ValueError("No process activities to aggregate")
+        elif any(activity is None for activity in activities):
+            raise ValueError("Some process activities are missing")
+
+        def total(attr: str):
+            values = [getattr(activity, attr) for activity in activities]
+            return sum(values) if all(value is not None for value in values) else None
+
+        return ProcessActivity(
+            unit=activities[0].unit,
+            minor_page_faults=total("minor_page_faults"),
+            major_page_faults=total("major_page_faults"),
+            storage_read=total("storage_read"),
+            total_read=total("total_read"),
+        )
+
+    @staticmethod
+    def current() -> "ProcessActivity":
+        activity = ProcessActivity(unit=ACTIVITY_UNIT)
+
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            activity.minor_page_faults = usage.ru_minflt
+            activity.major_page_faults = usage.ru_majflt
+
+        process = psutil.Process()
+        if hasattr(process, "io_counters"):
+            io_counters = process.io_counters()
+            # bytes actually fetched from the storage layer
+            activity.storage_read = io_counters.read_bytes / 1e6
+            # bytes passed to read syscalls, including those served from the page cache
+            if hasattr(io_counters, "read_chars"):
+                activity.total_read = io_counters.read_chars / 1e6
+
+        return activity
+
+    def log(self, prefix: str = "stage"):
+        LOGGER.info(f"\t\t+ {prefix} process activity:")
+        if self.minor_page_faults is not None:
+            LOGGER.info(f"\t\t\t- minor page faults: {self.minor_page_faults}")
+        if self.major_page_faults is not None:
+            LOGGER.info(f"\t\t\t- major page faults: {self.major_page_faults}")
+        if self.storage_read is not None:
+            LOGGER.info(f"\t\t\t- storage read: {self.storage_read:f} ({self.unit})")
+        if self.total_read is not None:
+            LOGGER.info(f"\t\t\t- total read: {self.total_read:f} ({self.unit})")
+
+
+@dataclass
+class Artifact:
+    unit: Artifact_Unit_Literal
+
+    size: float
+
+    @staticmethod
+    def aggregate(artifacts: List["Artifact"]) -> "Artifact":
+        if len(artifacts) == 0:
+            raise ValueError("No artifacts to aggregate")
+        elif any(artifact is None for artifact in artifacts):
+            raise ValueError("Some artifacts are missing")
+
+        # processes build the same artifact
+        return Artifact(unit=artifacts[0].unit, size=max(artifact.size for artifact in artifacts))
+
+    @staticmethod
+    def from_path(path: str) -> "Artifact":
+        if os.path.isfile(path):
+            size = os.path.getsize(path)
+        else:
+            size = sum(os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(path) for file in files)
+
+        return Artifact(unit=ARTIFACT_UNIT, size=size / 1e6)
+
+    def log(self, prefix: str = "stage"):
+        LOGGER.info(f"\t\t+ {prefix} artifact size: {self.size:f} ({self.unit})")
+
+
+class StageTracker:
+    """
+    Times the stages of a process (e.g. imports, weights loading, first inference) and records their peak memory,
+    page faults and bytes read. Stages are declared anywhere in the code with `track_stage(name)`, which is a no-op
+    unless a stage tracker is active. Nested stages are also accounted in their parent stage.
+    Stages can also declare the number of samples they processed (e.g. calibration) and the artifact they produced
+    (e.g. an exported or quantized model) with `record_artifact(stage, path)`.
+    """
+
+    def __init__(self, device: str, backend: str, device_ids: Optional[str] = None, memory: bool = True):
+        self.device = device
+        self.backend = backend
+        self.device_ids = device_ids
+        self.memory = memory
+        # cuda work is asynchronous, device moves and kernels are only accounted after a synchronization
+        self.synchronize = self.backend == "pytorch" and self.device == "cuda"
+
+        self.start_time = time.perf_counter()
+        # time spent by the tracker itself (e.g. spawning memory monitors), excluded from the stages
+        self.overhead = 0.0
+        self.durations: Dict[str, float] = {}
+        self.end_times: Dict[str, float] = {}
+        self.memories: Dict[str, Memory] = {}
+        self.activities: Dict[str, ProcessActivity] = {}
+        self.samples: Dict[str, int] = {}
+        self.artifacts: Dict[str, Artifact] = {}
+
+    @contextmanager
+    def activate(self):
+        ACTIVE_STAGE_TRACKERS.append(self)
+        try:
+            yield
+        finally:
+            ACTIVE_STAGE_TRACKERS.remove(self)
+
+    @contextmanager
+    def track(self, stage: str, samples: Optional[int] = None):
+        LOGGER.info(f"\t+ Tracking {stage} stage")
+        enter_time = time.perf_counter()
+
+        if self.memory:
+            # the caching allocator is not tracked since its statistics would initialize cuda
+            memory_tracker = MemoryTracker(
+                device=self.device, backend=self.backend, device_ids=self.device_ids, track_allocator=False
+            )
+            memory_context = memory_tracker.track()
+        else:
+            memory_context = nullcontext()
+
+        with memory_context:
+            start_activity = ProcessActivity.current()
+            start_time = time.perf_counter()
+            start_overhead = self.overhead
+
+            yield
+
+            if self.synchronize and torch.cuda.is_initialized():
+                torch.cuda.synchronize()
+
+            end_time = time.perf_counter()
+            end_activity = ProcessActivity.current()
+
+        exit_time = time.perf_counter()
+        # the overhead of nested stages is excluded as well
+        duration = end_time - start_time - (self.overhead - start_overhead)
+        self.overhead += (start_time - enter_time) + (exit_time - end_time)
+
+        # stages that are tracked multiple times are accumulated
+        self.durations[stage] = self.durations.get(stage, 0) + duration
+        self.end_times[stage] = exit_time - self.start_time - self.overhead
+
+        if samples is not None:
+            self.samples[stage] = self.samples.get(stage, 0) + samples
+
+        activity = end_activity - start_activity
+        if stage in self.activities:
+            activity = ProcessActivity.aggregate([self.activities[stage], activity])
+        self.activities[stage] = activity
+
+        if self.memory:
+            memory = memory_tracker.get_max_memory()
+            if stage in self.memories:
+                memory = get_max_of_memories(self.memories[stage], memory)
+            self.memories[stage] = memory
+
+    def record(self, stage: str, duration: float, activity: ProcessActivity, elapsed: float) -> None:
+        """
+        Records a stage that was measured outside of the tracked process (e.g. in a fresh interpreter), the time it took
+        to measure it (elapsed) beyond its duration is accounted as overhead.
+        """
+
+        LOGGER.info(f"\t+ Recording {stage} stage")
+        self.overhead += max(elapsed - duration, 0)
+
+        self.durations[stage] = self.durations.get(stage, 0) + duration
+        self.end_times[stage] = time.perf_counter() - self.start_time - self.overhead
+
+        if stage in self.activities:
+            activity = ProcessActivity.aggregate([self.activities[stage], activity])
+        self.activities[stage] = activity
+
+    def get_stages(self) -> List[str]:
+        return list(self.durations.keys())
+
+    def get_duration(self, stage: str) -> float:  # in seconds
+        return self.durations[stage]
+
+    def get_end_time(self, stage: str) -> float:  # in seconds since the tracker's creation, without its overhead
+        return self.end_times[stage]
+
+    def get_max_memory(self, stage: str) -> Optional[Memory]:
+        return self.memories.get(stage)
+
+    def get_activity(self, stage: str) -> ProcessActivity:
+        return self.activities[stage]
+
+    def get_samples(self, stage: str) -> Optional[int]:
+        return self.samples.get(stage)
+
+    def record_artifact(self, stage: str, path: str) -> None:
+        LOGGER.info(f"\t+ Recording artifact of {stage} stage")
+        self.artifacts[stage] = Artifact.from_path(path)
+
+    def get_artifact(self, stage: str) -> Optional[Artifact]:
+        return self.artifacts.get(stage)
+
+
+def track_stage(stage: str, samples: Optional[int] = None):
+    """Tracks a stage with the active stage tracker, if any."""
+
+    if len(ACTIVE_STAGE_TRACKERS) == 0:
+        return nullcontext()
+
+    return ACTIVE_STAGE_TRACKERS[-1].track(stage, samples=samples)
+
+
+def record_artifact(stage: str, path: str) -> None:
+    """Records the size on disk of the artifact produced by a stage with the active stage tracker, if any."""
+
+    if len(ACTIVE_STAGE_TRACKERS) == 0:
+        return
+
+    ACTIVE_STAGE_TRACKERS[-1].record_artifact(stage, path)
+
+
+def get_max_of_memories(memory: Memory, other: Memory) -> Memory:
+    def peak(attr: str) -> Optional[float]:
+        values = [getattr(memory, attr), getattr(other, attr)]
+        return max(values) if all(value is not None for value in values) else None
+
+    return Memory(
+        unit=memory.unit,
+        max_ram=peak("max_ram"),
+        max_global_vram=peak("max_global_vram"),
+        max_process_vram=peak("max_process_vram"),
+        max_reserved=peak("max_reserved"),
+        max_allocated=peak("max_allocated"),
+    )
@@ -1,4 +1,5 @@
 import gc
+import json
 import os
 import time
 from importlib import reload
@@ -281,3 +282,1140 @@ def test_api_memory_tracker(device, backend):
 
 def test_git_revision_hash_detection():
     assert get_git_revision_hash("optimum_benchmark") is not None
+
+
+@pytest.mark.parametrize("model_type", ["gpt2", "llama", "mixtral"])
+def test_api_memory_estimator(model_type):
+    from transformers import AutoConfig, AutoModelForCausalLM
+
+    from optimum_benchmark.trackers.memory_estimator import estimate_num_parameters
+
+    config_kwargs = {"gpt2": {"n_embd": 64, "n_layer": 2, "n_head": 4}}
+    pretrained_config = AutoConfig.for_model(
+        model_type,
+        **config_kwargs.get(
+            model_type,
+            {"hidden_size": 64, "num_hidden_layers": 2, "num_attention_heads": 4, "intermediate_size": 128},
+        ),
+    )
+    model = AutoModelForCausalLM.from_config(pretrained_config)
+
+    num_parameters = sum(p.numel() for p in model.parameters())
+    estimated_num_parameters = estimate_num_parameters(pretrained_config)["total"]
+
+    assert abs(estimated_num_parameters - num_parameters) / num_parameters < 0.05, (
+        f"Estimated {estimated_num_parameters} parameters, but the model has {num_parameters}"
+    )
+
+
+def test_api_memory_breakdown():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.trackers.memory import get_tensors_memory
+
+    pretrained_config = GPT2Config(n_embd=64, n_layer=2, n_head=4)
+    model = GPT2LMHeadModel(pretrained_config).eval()
+
+    # tied embeddings are counted once
+    weights_memory = sum(p.nbytes for p in model.parameters()) + sum(b.nbytes for b in model.buffers())
+    assert get_tensors_memory(model) == weights_memory / 1e6
+
+    batch_size, sequence_length, new_tokens = 2, 8, 4
+    input_ids = torch.randint(0, pretrained_config.vocab_size, (batch_size, sequence_length))
+    outputs = model.generate(
+        input_ids,
+        max_new_tokens=new_tokens,
+        min_new_tokens=new_tokens,
+        do_sample=False,
+        pad_token_id=0,
+        return_dict_in_generate=True,
+    )
+
+    # the last generated token is never fed back to the model
+    cache_length = sequence_length + new_tokens - 1
+    kv_cache_memory = 2 * pretrained_config.n_layer * batch_size * cache_length * pretrained_config.n_embd * 4
+    assert get_tensors_memory(outputs.past_key_values) == kv_cache_memory / 1e6
+
+
+def test_api_memory_screening(monkeypatch):
+    from types import SimpleNamespace
+
+    from transformers import LlamaConfig
+
+    from optimum_benchmark.trackers import memory_estimator
+    from optimum_benchmark.trackers.memory_estimator import estimate_memory, get_available_memory, get_compute_bytes
+
+    pretrained_config = LlamaConfig(torch_dtype="bfloat16")
+
+    # the model is loaded in its pretrained dtype when the backend doesn't set one
+    assert get_compute_bytes(SimpleNamespace(dtype=None), pretrained_config) == 2
+    assert get_compute_bytes(SimpleNamespace(torch_dtype="float32"), pretrained_config) == 4
+
+    # containerized backends aren't screened
+    assert estimate_memory(SimpleNamespace(name="py-txi"), None, pretrained_config) == {}
+
+    monkeypatch.setattr(memory_estimator, "get_gpu_available_vram_mb", lambda device_ids: [1000.0] * len(device_ids))
+
+    # a sharded model can use the memory of all the devices
+    backend_config = SimpleNamespace(device="cuda", device_ids="0,1", device_map=None)
+    assert get_available_memory(backend_config) == 1000
+    backend_config.device_map = "auto"
+    assert get_available_memory(backend_config) == 2000
+
+
+def test_api_step_memory_trainer_callback():
+    from transformers import GPT2Config, GPT2LMHeadModel, Trainer, TrainingArguments, default_data_collator
+
+    from optimum_benchmark.trackers.memory import StepMemoryTrainerCallback
+
+    model = GPT2LMHeadModel(GPT2Config(n_embd=64, n_layer=2, n_head=4))
+    input_ids = torch.randint(0, model.config.vocab_size, (16,))
+    dataset = [{"input_ids": input_ids, "labels": input_ids} for _ in range(8)]
+    memory_callback = StepMemoryTrainerCallback(device="cpu", backend="pytorch", warmup_steps=2)
+
+    with TemporaryDirectory() as tmpdir:
+        trainer = Trainer(
+            model=model,
+            train_dataset=dataset,
+            data_collator=default_data_collator,
+            callbacks=[memory_callback],
+            args=TrainingArguments(
+                output_dir=tmpdir, max_steps=4, per_device_train_batch_size=2, use_cpu=True, report_to="none"
+            ),
+        )
+        trainer.train()
+
+    parameters_memory = sum(p.nbytes for p in model.parameters()) / 1e6
+
+    for phase in ["warmup", "train"]:
+        memory = memory_callback.get_phase_memory(phase)
+        breakdown = memory_callback.get_phase_memory_breakdown(phase)
+        assert memory.max_ram > 0
+        assert breakdown.gradients == parameters_memory
+        # adamw keeps two states per parameter
+        assert breakdown.optimizer_state >= 2 * parameters_memory
+        assert breakdown.activations > 0
+
+
+def write_powercap_zone(path, name, energy, max_energy_range=1_000_000_000):
+    os.makedirs(path, exist_ok=True)
+    for filename, value in [("name", name), ("energy_uj", energy), ("max_energy_range_uj", max_energy_range)]:
+        with open(os.path.join(path, filename), "w") as f:
+            f.write(f"{value}\n")
+
+
+@pytest.fixture
+def fake_powercap(tmp_path, monkeypatch):
+    """A sysfs root with an idle package-0 powercap zone, the energy files are written in it (the working directory)."""
+
+    write_powercap_zone(os.path.join(tmp_path, "class", "powercap", "intel-rapl:0"), "package-0", 0)
+    monkeypatch.chdir(tmp_path)
+
+    return str(tmp_path)
+
+
+def test_api_rapl_energy_tracker(fake_powercap):
+    from optimum_benchmark.trackers.energy import EnergyTracker
+
+    package_path = os.path.join(fake_powercap, "class", "powercap", "intel-rapl:0")
+    dram_path = os.path.join(package_path, "intel-rapl:0:0")
+    write_powercap_zone(package_path, "package-0", 999_000_000)
+    write_powercap_zone(dram_path, "dram", 1_000_000)
+
+    energy_tracker = EnergyTracker(backend="pytorch", device="cpu", source="rapl", sysfs_root=fake_powercap)
+
+    with energy_tracker.track(file_prefix="forward"):
+        # the package counter wraps around
+        write_powercap_zone(package_path, "package-0", 2_000_000)
+        write_powercap_zone(dram_path, "dram", 4_000_000)
+
+    energy = energy_tracker.get_energy()
+
+    assert os.path.exists(os.path.join(fake_powercap, "forward_rapl.json"))
+
+    # 3 J on the package and 3 J on the dram
+    assert energy.cpu == pytest.approx(3 / 3.6e6)
+    assert energy.ram == pytest.approx(3 / 3.6e6)
+    assert energy.gpu == 0
+    assert energy.total == pytest.approx(6 / 3.6e6)
+
+
+def test_api_energy_idle_baseline(fake_powercap):
+    from optimum_benchmark.trackers.energy import Energy, EnergyTracker, Power
+
+    # 1 kWh consumed in 1 hour and 2 kWh in 1 hour
+    idle_power = Power.from_energies(
+        [Energy(unit="kWh", cpu=1, ram=0, gpu=0, total=1), Energy(unit="kWh", cpu=2, ram=0, gpu=0, total=2)],
+        [3600, 3600],
+    )
+    assert idle_power.total == 1500
+    assert idle_power.stdev == 500
+
+    package_path = os.path.join(fake_powercap, "class", "powercap", "intel-rapl:0")
+    energy_tracker = EnergyTracker(backend="pytorch", device="cpu", source="rapl", sysfs_root=fake_powercap)
+
+    # counters are idle
+    assert energy_tracker.calibrate(duration=0.2).total == 0
+    energy_tracker.idle_power = Power(unit="W", cpu=1, ram=0, gpu=0, total=1, stdev=0)
+    with energy_tracker.track():
+        write_powercap_zone(package_path, "package-0", 1_000_000_000)
+
+    # 1000 J minus 1 W during the tracked duration
+    assert energy_tracker.get_net_energy().total == pytest.approx((1000 - energy_tracker.duration) / 3.6e6)
+
+
+def test_api_energy_per_iteration(fake_powercap, monkeypatch):
+    from optimum_benchmark.trackers import rapl
+    from optimum_benchmark.trackers.energy import ENERGY_UNIT, EnergyDistribution, EnergyTracker, Power
+
+    energy_tracker = EnergyTracker(backend="pytorch", device="cpu", source="rapl", sysfs_root=fake_powercap)
+    latency_tracker = LatencyTracker(backend="pytorch", device="cpu")
+
+    with energy_tracker.track():
+        for _ in range(2):
+            with latency_tracker.track():
+                time.sleep(0.01)
+
+    intervals = latency_tracker.get_intervals()
+    assert len(intervals) == 2
+    assert all(end - start >= 0.01 for start, end in intervals)
+
+    # a constant 1 W package power over the tracked window, sampled every second
+    start_time = energy_tracker.rapl_reader.timestamps[0]
+    energy_tracker.rapl_reader.timestamps = [start_time + i for i in range(10)]
+    energy_tracker.rapl_reader.samples = [{"package-0": i * 1_000_000} for i in range(10)]
+    energies = energy_tracker.get_intervals_energy(
+        [(start_time + 0.5, start_time + 2.5), (start_time + 3, start_time + 4)]
+    )
+    assert energies[0].cpu == pytest.approx(2 / 3.6e6)
+    assert energies[1].cpu == pytest.approx(1 / 3.6e6)
+
+    power = Power.from_energies(energies, [2, 1])
+    assert power.cpu == pytest.approx(1)
+    assert power.stdev == pytest.approx(0)
+
+    distribution = EnergyDistribution.from_values([energy.total for energy in energies], unit=ENERGY_UNIT)
+    assert distribution.count == 2
+    assert distribution.total == pytest.approx(3 / 3.6e6)
+
+    # the sampled power is summarized over the window or over the samples ending within the given intervals
+    assert energy_tracker.get_power_timeline().count == 9
+    assert energy_tracker.get_power_timeline().max == pytest.approx(1)
+    assert energy_tracker.get_power_timeline([(start_time + 0.5, start_time + 2.5)]).count == 2
+    assert energy_tracker.get_power_timeline([(start_time + 0.2, start_time + 0.8)]) is None
+
+    with open(os.path.join(fake_powercap, "task_rapl.json"), "r") as f:
+        power_timeline = json.load(f)["power_timeline"]
+    assert len(power_timeline["timestamps"]) == len(power_timeline["power"]["package-0"])
+
+    # the timeline's resolution is halved when it grows too large, its boundaries are kept
+    monkeypatch.setattr(rapl, "MAX_SAMPLES", 8)
+    reader = energy_tracker.rapl_reader
+    reader.start()
+    for _ in range(8):
+        reader.update()
+    assert len(reader.timestamps) == len(reader.samples) == 5
+    assert reader.timestamps == sorted(reader.timestamps)
+    reader.stop()
+
+
+@pytest.mark.parametrize("combined", [False, True])
+def test_api_text_generation_decode_energy(fake_powercap, monkeypatch, combined):
+    import functools
+
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.benchmarks.inference import benchmark as inference_benchmark
+    from optimum_benchmark.launchers.inline.config import InlineConfig
+    from optimum_benchmark.trackers.energy import EnergyTracker
+
+    monkeypatch.setattr(
+        inference_benchmark, "EnergyTracker", functools.partial(EnergyTracker, sysfs_root=fake_powercap)
+    )
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        experiment_config = ExperimentConfig(
+            experiment_name="decode_energy",
+            backend=PyTorchConfig(model=tmpdir, library="transformers", task="text-generation", device="cpu"),
+            launcher=InlineConfig(),
+            benchmark=InferenceConfig(
+                combined=combined,
+                latency=False,
+                memory=False,
+                energy=True,
+                energy_source="rapl",
+                energy_per_iteration=True,
+                energy_sampling_interval=0.001,
+                duration=0,
+                iterations=3,
+                warmup_runs=1,
+                input_shapes={"batch_size": 1, "sequence_length": 8},
+                generate_kwargs={"max_new_tokens": 32, "min_new_tokens": 32},
+            ),
+        )
+        report = launch(experiment_config)
+
+    # decode energy is attributed within each generation, after its first token
+    assert report.decode.energy_distribution.count == 3
+    assert report.decode.power.total == 0
+    assert report.prefill.power_timeline is not None and report.decode.power_timeline is not None
+    assert report.to_dict()["decode"]["power_timeline"]["count"] > 0
+
+
+def test_api_tracking_overhead():
+    from optimum_benchmark.trackers.latency import TrackingOverhead
+
+    overhead = TrackingOverhead.from_latencies(tracked=0.11, untracked=0.1, unit="s")
+    assert overhead.overhead == pytest.approx(0.01)
+    assert overhead.percentage == pytest.approx(10)
+
+    aggregated = TrackingOverhead.aggregate([overhead, TrackingOverhead.from_latencies(0.13, 0.1, unit="s")])
+    assert aggregated.tracked == pytest.approx(0.12)
+    assert aggregated.percentage == pytest.approx(20)
+
+    with pytest.raises(ValueError):
+        TrackingOverhead.aggregate([overhead, None])
+
+    benchmark_config = InferenceConfig(combined=True, memory=True, combined_overhead_runs=5)
+    assert benchmark_config.combined and benchmark_config.combined_overhead_runs == 5
+
+
+def test_api_combined_tracking():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.launchers.inline.config import InlineConfig
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        experiment_config = ExperimentConfig(
+            experiment_name="combined",
+            backend=PyTorchConfig(model=tmpdir, library="transformers", task="text-generation", device="cpu"),
+            launcher=InlineConfig(),
+            benchmark=InferenceConfig(
+                combined=True,
+                memory=True,
+                compilation=True,
+                duration=0,
+                iterations=2,
+                warmup_runs=1,
+                combined_overhead_runs=2,
+                input_shapes={"batch_size": 1, "sequence_length": 8},
+                generate_kwargs={"max_new_tokens": 32, "min_new_tokens": 32},
+            ),
+        )
+        report = launch(experiment_config)
+
+    # compilation is tracked in the same loops as latency and memory
+    assert report.prefill.compilation is not None and report.decode.compilation is not None
+    assert report.prefill.memory.max_ram > 0 and report.decode.tracking_overhead is not None
+
+
+def test_api_stage_tracker():
+    from optimum_benchmark.trackers.stage import StageTracker, track_stage
+
+    # no-op without an active stage tracker
+    with track_stage("load_weights"):
+        pass
+
+    stage_tracker = StageTracker(device="cpu", backend="pytorch", memory=False)
+
+    with stage_tracker.activate():
+        with track_stage("load_weights"):
+            with track_stage("move_to_device"):
+                time.sleep(0.1)
+            time.sleep(0.1)
+
+    assert stage_tracker.get_stages() == ["move_to_device", "load_weights"]
+    assert stage_tracker.get_duration("move_to_device") >= 0.1
+    # nested stages are accounted in their parent stage
+    assert stage_tracker.get_duration("load_weights") >= 0.2
+    assert stage_tracker.get_end_time("load_weights") >= stage_tracker.get_duration("load_weights")
+    assert stage_tracker.get_activity("load_weights").minor_page_faults is not None
+    assert stage_tracker.get_max_memory("load_weights") is None
+
+
+def test_api_compile_tracker():
+    from optimum_benchmark.trackers.compile import CompileTracker
+
+    torch._dynamo.reset()
+
+    def function(x):
+        x = x * 2
+        # graph break
+        print("", end="")
+        return x + 1
+
+    compiled_function = torch.compile(function, backend="eager")
+    compile_tracker = CompileTracker()
+
+    with compile_tracker.track("warmup"):
+        for _ in range(2):
+            with compile_tracker.track_iteration():
+                compiled_function(torch.ones(4))
+
+    warmup_compilation = compile_tracker.get_compilation("warmup")
+    assert warmup_compilation.compilations > 0
+    assert warmup_compilation.graph_breaks > 0
+    assert warmup_compilation.compiling_iterations == [0]
+
+    with compile_tracker.track("forward"):
+        for shape in [4, 4, 8]:
+            with compile_tracker.track_iteration():
+                compiled_function(torch.ones(shape))
+
+    # a new shape triggers a recompilation
+    forward_compilation = compile_tracker.get_compilation("forward")
+    assert forward_compilation.compiling_iterations == [2]
+    assert forward_compilation.recompilations is None or forward_compilation.recompilations > 0
+
+    torch._dynamo.reset()
+
+
+def test_api_compile_cache_time_saved():
+    from optimum_benchmark.trackers.compile import Compilation, CompileTracker
+
+    with TemporaryDirectory() as tmpdir:
+        compile_tracker = CompileTracker(cache_dir=tmpdir)
+
+        cold = Compilation(unit="s", compilations=2, unique_graphs=2, graph_breaks=0, cache_misses=2, compile_time=50)
+        assert compile_tracker.get_time_saved("warmup", cold) == 0
+        assert os.path.exists(os.path.join(tmpdir, "compile_times.json"))
+
+        warm = Compilation(unit="s", compilations=2, unique_graphs=2, graph_breaks=0, cache_hits=2, compile_time=5)
+        assert compile_tracker.get_time_saved("warmup", warm) == pytest.approx(45)
+        # no cold compile time recorded for this phase
+        assert compile_tracker.get_time_saved("forward", warm) is None
+
+
+def test_api_artifact_cache():
+    from optimum_benchmark.backends.cache_utils import cache_artifact, get_artifact_dir, is_artifact_cached
+
+    backend_config = PyTorchConfig(model="gpt2", task="text-generation", library="transformers", device="cpu")
+    other_config = PyTorchConfig(model="gpt2", task="text-generation", library="transformers", device="cpu", seed=0)
+
+    with TemporaryDirectory() as tmpdir:
+        artifact_dir = get_artifact_dir(tmpdir, backend_config, exclude=["seed"])
+        assert artifact_dir == get_artifact_dir(tmpdir, other_config, exclude=["seed"])
+        assert get_artifact_dir(tmpdir, backend_config, exclude=[]) != get_artifact_dir(
+            tmpdir, other_config, exclude=[]
+        )
+        assert not is_artifact_cached(artifact_dir)
+
+        artifact = os.path.join(tmpdir, "artifact")
+        os.makedirs(artifact)
+        with open(os.path.join(artifact, "model.onnx"), "w") as f:
+            f.write("onnx")
+
+        cache_artifact(artifact, artifact_dir, metadata={"model": backend_config.model})
+        assert is_artifact_cached(artifact_dir)
+        assert os.path.isfile(os.path.join(artifact_dir, "model.onnx"))
+
+        # already cached by another run
+        cache_artifact(artifact, artifact_dir, metadata={"model": backend_config.model})
+        assert sorted(os.listdir(os.path.dirname(artifact_dir))) == [os.path.basename(artifact_dir)]
+
+
+def test_api_build_steps_report():
+    from optimum_benchmark.benchmarks.startup.benchmark import get_stages_report
+    from optimum_benchmark.trackers.stage import StageTracker, record_artifact, track_stage
+
+    stage_tracker = StageTracker(device="cpu", backend="onnxruntime", memory=False)
+
+    with TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, "model.onnx"), "wb") as f:
+            f.write(b"0" * 1000000)
+
+        with stage_tracker.activate():
+            with track_stage("quantize"):
+                with track_stage("calibrate", samples=4):
+                    time.sleep(0.2)
+            record_artifact("quantize", tmpdir)
+
+    assert stage_tracker.get_samples("calibrate") == 4
+    assert stage_tracker.get_artifact("quantize").size == pytest.approx(1)
+
+    report = get_stages_report(stage_tracker, stage_tracker.get_stages(), extra_targets=[])
+    assert report.quantize.artifact.size == pytest.approx(1)
+    assert report.calibrate.artifact is None
+    assert report.calibrate_per_sample.latency.mean == pytest.approx(report.calibrate.latency.mean / 4)
+
+
+def test_api_build_process_launcher():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.benchmarks.build.config import BuildConfig
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        # the build steps report is sent back by the launcher's worker
+        experiment_config = ExperimentConfig(
+            experiment_name="build",
+            backend=PyTorchConfig(
+                model=tmpdir, library="transformers", task="feature-extraction", device="cpu", load_strategy="mmap"
+            ),
+            launcher=ProcessConfig(),
+            benchmark=BuildConfig(memory=False),
+        )
+        report = launch(experiment_config)
+
+    assert report.read_weights.latency.mean > 0 and report.assign_weights.latency.mean > 0
+
+
+def test_api_no_weights_cache():
+    from transformers import GPT2Config
+
+    from optimum_benchmark.backends.cache_utils import get_no_weights_model_dir
+
+    with TemporaryDirectory() as tmpdir:
+        no_weights_model_dir = get_no_weights_model_dir(tmpdir, GPT2Config(n_layer=2), torch_dtype="float16")
+        assert no_weights_model_dir == get_no_weights_model_dir(tmpdir, GPT2Config(n_layer=2), torch_dtype="float16")
+        assert no_weights_model_dir != get_no_weights_model_dir(tmpdir, GPT2Config(n_layer=2), torch_dtype="float32")
+        assert no_weights_model_dir != get_no_weights_model_dir(tmpdir, GPT2Config(n_layer=4), torch_dtype="float16")
+
+
+def test_api_fast_random_init_weights(monkeypatch):
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.backends import transformers_utils
+    from optimum_benchmark.backends.transformers_utils import fast_random_init_weights
+
+    # small chunks to split parameters across threads
+    monkeypatch.setattr(transformers_utils, "FAST_INIT_CHUNK_SIZE", 1000)
+
+    model = GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100))
+    other_model = GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100))
+
+    fast_random_init_weights(model, seed=0, num_threads=1)
+    fast_random_init_weights(other_model, seed=0, num_threads=4)
+
+    for parameter, other_parameter in zip(model.parameters(), other_model.parameters()):
+        # deterministic regardless of the number of threads
+        assert torch.equal(parameter, other_parameter)
+        assert parameter.abs().max() <= 0.02
+        assert parameter.std() > 0
+
+    assert model.lm_head.weight.data_ptr() == model.transformer.wte.weight.data_ptr()
+
+
+def test_api_metadata_cache(monkeypatch, caplog):
+    from transformers import GPT2Config
+
+    from optimum_benchmark.metadata_cache import (
+        cached_metadata,
+        get_metadata_cache_stats,
+        log_metadata_cache_stats,
+        save_pretrained,
+    )
+
+    calls = []
+
+    @cached_metadata("test_config", save=save_pretrained, load=GPT2Config.from_pretrained)
+    def get_config(model: str, **kwargs) -> GPT2Config:
+        calls.append(model)
+        return GPT2Config(n_layer=3)
+
+    with TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("METADATA_CACHE_DIR", tmpdir)
+        monkeypatch.setenv("HF_HUB_OFFLINE", "0")
+
+        assert get_config("org/model", revision="main").n_layer == 3
+        assert get_config("org/model", revision="main").n_layer == 3
+        assert len(calls) == 1
+
+        get_config("org/model", revision="v1.0")
+        assert len(calls) == 2
+
+        # credentials are part of the key but never written to the cache
+        get_config("org/model", revision="main", token="hf_secret")
+        get_config("org/model", revision="main", token="hf_secret")
+        assert len(calls) == 3
+        for root, _, files in os.walk(tmpdir):
+            for file in files:
+                with open(os.path.join(root, file), "rb") as f:
+                    assert b"hf_secret" not in f.read()
+
+        # expired entries are resolved again
+        monkeypatch.setenv("METADATA_CACHE_TTL", "0")
+        get_config("org/model", revision="main")
+        assert len(calls) == 4
+
+        # unless in offline mode
+        monkeypatch.setenv("METADATA_CACHE_OFFLINE", "1")
+        assert get_config("org/model", revision="main").n_layer == 3
+        assert len(calls) == 4
+
+    stats = get_metadata_cache_stats()["test_config"]
+    assert stats["hits"] == 3 and stats["misses"] == 4
+    assert stats["hits_time"] > 0 and stats["misses_time"] > 0
+
+    with caplog.at_level("INFO", logger="metadata-cache"):
+        log_metadata_cache_stats()
+    assert "Metadata cache test_config: 3 hit(s)" in caplog.text
+
+
+@pytest.mark.parametrize("strategy", ["mmap", "meta", "parallel"])
+def test_api_load_strategies(strategy):
+    from accelerate import init_empty_weights
+    from transformers import GPT2Config, GPT2LMHeadModel, GPT2Model
+
+    from optimum_benchmark.backends.transformers_utils import (
+        assign_transformers_state_dict,
+        get_transformers_safetensors_files,
+        load_transformers_state_dict,
+    )
+
+    model = GPT2LMHeadModel(GPT2Config(n_layer=2, n_embd=32, n_head=2, vocab_size=100))
+
+    with TemporaryDirectory() as tmpdir:
+        # sharded checkpoint
+        model.save_pretrained(tmpdir, max_shard_size="20KB")
+        files = get_transformers_safetensors_files(tmpdir)
+        assert len(files) > 1
+
+        for automodel_class in [GPT2LMHeadModel, GPT2Model]:
+            with init_empty_weights(include_buffers=False):
+                loaded_model = automodel_class(model.config)
+
+            state_dict = load_transformers_state_dict(files, strategy=strategy, num_threads=2)
+            assign_transformers_state_dict(loaded_model, state_dict)
+
+            for name, tensor in loaded_model.state_dict().items():
+                expected = model.state_dict()[name if automodel_class is GPT2LMHeadModel else f"transformer.{name}"]
+                assert torch.equal(tensor, expected)
+
+        assert loaded_model.wte.weight.device.type == "cpu"
+
+
+def test_api_pool_launcher():
+    from optimum_benchmark.launchers.pool.config import PoolConfig
+    from optimum_benchmark.launchers.pool.launcher import PoolLauncher, close_worker_pools
+
+    launcher = PoolLauncher(PoolConfig(preload_modules=["optimum_benchmark.benchmarks.report"]))
+
+    try:
+        # workers are kept alive across launches
+        worker_pid = launcher.launch(os.getpid)
+        assert worker_pid != os.getpid()
+        assert (
+            PoolLauncher(PoolConfig(preload_modules=["optimum_benchmark.benchmarks.report"])).launch(os.getpid)
+            == worker_pid
+        )
+        assert launcher.launch(os.getcwd) == os.getcwd()
+
+        # crashed workers are replaced
+        with pytest.raises(RuntimeError, match="crashed"):
+            launcher.launch(os._exit, 1)
+        assert launcher.launch(os.getpid) not in [worker_pid, os.getpid()]
+    finally:
+        close_worker_pools()
+
+
+def test_api_launch_batched_experiments(monkeypatch):
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark import experiment as experiment_module
+    from optimum_benchmark.backends.pytorch.backend import PyTorchBackend
+    from optimum_benchmark.benchmarks.startup.config import StartupConfig
+    from optimum_benchmark.experiment import group_experiments
+    from optimum_benchmark.launchers.inline.config import InlineConfig
+
+    allocations = []
+    original_init = PyTorchBackend.__init__
+
+    def counting_init(self, config):
+        allocations.append(config.seed)
+        original_init(self, config)
+
+    monkeypatch.setattr(PyTorchBackend, "__init__", counting_init)
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        def experiment(seed: int, batch_size: int, benchmark_config=None) -> ExperimentConfig:
+            return ExperimentConfig(
+                experiment_name=f"batched_{seed}_{batch_size}",
+                backend=PyTorchConfig(model=tmpdir, library="transformers", task="feature-extraction", seed=seed),
+                launcher=InlineConfig(),
+                benchmark=benchmark_config
+                or InferenceConfig(
+                    duration=0,
+                    iterations=2,
+                    warmup_runs=1,
+                    input_shapes={"batch_size": batch_size, "sequence_length": 8},
+                ),
+            )
+
+        experiment_configs = [experiment(1, 1), experiment(2, 1), experiment(1, 2), experiment(1, 1, StartupConfig())]
+        assert group_experiments(experiment_configs) == [[0, 2], [1], [3]]
+
+        reports = launch(experiment_configs[:3])
+
+        # a group that fails (here screened out) doesn't stop the others
+        monkeypatch.setattr(experiment_module, "get_available_memory", lambda backend_config: 0)
+        screened_config = experiment(3, 1)
+        screened_config.launcher = InlineConfig(memory_screening=True, memory_screening_action="error")
+        screened_reports = launch([screened_config, experiment(4, 1)])
+
+    # the backend of the first and third experiments is only loaded once
+    assert allocations == [1, 2, 4]
+    assert len(reports) == 3
+    assert all(isinstance(report, BenchmarkReport) for report in reports)
+    assert isinstance(screened_reports[0], RuntimeError) and isinstance(screened_reports[1], BenchmarkReport)
+
+
+def test_api_launch_batched_experiments_process_launcher():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.launchers.torchrun.launcher import merge_outputs
+    from optimum_benchmark.trackers.latency import Latency
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        def experiment(batch_size: int, launcher_config: ProcessConfig, duration: int = 0) -> ExperimentConfig:
+            return ExperimentConfig(
+                experiment_name=f"batched_{batch_size}",
+                backend=PyTorchConfig(model=tmpdir, library="transformers", task="feature-extraction", device="cpu"),
+                launcher=launcher_config,
+                benchmark=InferenceConfig(
+                    duration=duration,
+                    iterations=2,
+                    warmup_runs=1,
+                    input_shapes={"batch_size": batch_size, "sequence_length": 8},
+                ),
+            )
+
+        reports = launch([experiment(1, ProcessConfig()), experiment(2, ProcessConfig())])
+        assert len(reports) == 2 and all(report.forward.latency is not None for report in reports)
+
+        # the experiments of a group whose worker was killed keep their reports if they completed before the timeout
+        launcher_config = ProcessConfig(timeouts={"measure": 2})
+        reports = launch([experiment(1, launcher_config), experiment(2, launcher_config, duration=60)])
+        assert len(reports) == 2 and reports[0].forward.latency is not None
+        assert reports[1].experiment.timeout.phase == "measure"
+
+    # the reports of the torchrun workers are merged per experiment when they ran a group
+    outputs = []
+    for rank_values in [[1.0, 2.0], [3.0, 1.0]]:
+        rank_reports = []
+        for value in rank_values:
+            report = BenchmarkReport.from_targets(["forward"])
+            report.forward.latency = Latency.from_values([value], unit="s")
+            rank_reports.append(report)
+        outputs.append(rank_reports)
+
+    reports = merge_outputs(outputs)
+    assert [report.forward.latency.values for report in reports] == [[3.0], [2.0]]
+
+
+def test_api_scheduler_packing():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.launchers.inline.config import InlineConfig
+    from optimum_benchmark.scheduler import Job, Scheduler
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        experiment_config = ExperimentConfig(
+            experiment_name="scheduled",
+            backend=PyTorchConfig(model=tmpdir, library="transformers", task="feature-extraction", device="cpu"),
+            launcher=InlineConfig(),
+            benchmark=InferenceConfig(duration=0, iterations=2, warmup_runs=1),
+        )
+
+        jobs = [Job(experiment_config, cpus=2, memory=400), Job(experiment_config, cpus=2, memory=400)]
+        # memory is estimated from the model's config
+        assert Job(experiment_config).memory > 0
+
+    with pytest.raises(ValueError, match="more than the host"):
+        Scheduler([Job(experiment_config, cpus=8, memory=100)], cores=[0, 1, 2, 3], memory=1000)
+
+    scheduler = Scheduler(jobs, cores=[0, 1, 2, 3], memory=1000)
+    first, second = scheduler.allocate(jobs[0]), scheduler.allocate(jobs[1])
+    # disjoint cores without oversubscription
+    assert first.cores == [0, 1] and second.cores == [2, 3]
+    assert scheduler.allocate(jobs[0]) is None
+
+    scheduler.release(first)
+    assert scheduler.allocate(Job(experiment_config, cpus=1, memory=700)) is None
+    assert scheduler.allocate(Job(experiment_config, cpus=1, memory=100)).cores == [0]
+
+
+def test_api_scheduler_run():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.launchers.inline.config import InlineConfig
+    from optimum_benchmark.scheduler import Job, Scheduler
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        def job(batch_size: int) -> Job:
+            experiment_config = ExperimentConfig(
+                experiment_name=f"scheduled_{batch_size}",
+                backend=PyTorchConfig(model=tmpdir, library="transformers", task="feature-extraction", device="cpu"),
+                launcher=InlineConfig(),
+                benchmark=InferenceConfig(
+                    duration=0, iterations=2, warmup_runs=1, input_shapes={"batch_size": batch_size}
+                ),
+            )
+            return Job(experiment_config, cpus=1, memory=100)
+
+        cores = sorted(os.sched_getaffinity(0))[:2]
+        results = list(Scheduler([job(1), job(2)], cores=cores, memory=1000).run())
+
+    assert sorted(result.index for result in results) == [0, 1]
+    assert all(result.error is None and result.report.forward.latency is not None for result in results)
+    assert all(set(result.cores) <= set(cores) for result in results)
+
+
+def test_api_journal():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.heartbeat_utils import Timeout
+    from optimum_benchmark.journal import DONE, FAILED, RUNNING, Journal
+    from optimum_benchmark.launchers.inline.config import InlineConfig
+    from optimum_benchmark.launchers.process.launcher import ProcessLauncher
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        def experiment(batch_size: int) -> ExperimentConfig:
+            return ExperimentConfig(
+                experiment_name="journaled",
+                backend=PyTorchConfig(model=tmpdir, library="transformers", task="feature-extraction", device="cpu"),
+                launcher=InlineConfig(),
+                benchmark=InferenceConfig(input_shapes={"batch_size": batch_size}),
+            )
+
+        journal = Journal(os.path.join(tmpdir, "journal.db"), max_attempts=2, backoff=0.5)
+        assert journal.should_run(experiment(1)) and journal.get_entry(experiment(1)) is None
+
+        with journal.record(experiment(1)):
+            assert journal.get_entry(experiment(1)).state == RUNNING
+
+        # the environment isn't part of the experiment's hash
+        other_experiment = experiment(1)
+        other_experiment.environment = {}
+        assert journal.get_entry(other_experiment).state == DONE
+        assert not journal.should_run(other_experiment)
+
+        with pytest.raises(RuntimeError):
+            with journal.record(experiment(2)):
+                raise RuntimeError("out of memory")
+
+        entry = journal.get_entry(experiment(2))
+        assert entry.state == FAILED and entry.attempts == 1 and "out of memory" in entry.error
+        # failed experiments are retried after a backoff, until the maximum number of attempts is reached
+        assert not journal.should_run(experiment(2))
+        time.sleep(0.5)
+        assert journal.should_run(experiment(2))
+        journal.start(experiment(2))
+        journal.finish(experiment(2), error="out of memory")
+        time.sleep(1)
+        assert not journal.should_run(experiment(2))
+
+        # an experiment killed by the watchdog returns a timeout report without raising, it's retried like failures
+        timeout = Timeout(unit="s", phase="measure", reason="heartbeat", limit=10, elapsed=12)
+        with journal.record(experiment(3)) as record:
+            record.report = ProcessLauncher(ProcessConfig()).get_timeout_report(timeout)
+
+        entry = journal.get_entry(experiment(3))
+        assert entry.state == FAILED and "measure phase (heartbeat)" in entry.error
+
+        # an experiment whose report couldn't be saved isn't done
+        with pytest.raises(OSError):
+            with journal.record(experiment(4)) as record:
+                record.report = BenchmarkReport.from_targets(["forward"])
+                raise OSError("No space left on device")
+
+        assert journal.get_entry(experiment(4)).state == FAILED
+
+        # the journal is persisted
+        assert len(Journal(os.path.join(tmpdir, "journal.db")).get_entries(state=FAILED)) == 3
+
+
+def test_api_watchdog_timeouts():
+    import pickle
+    import subprocess
+    import sys
+
+    import psutil
+
+    from optimum_benchmark.heartbeat_utils import HEARTBEAT_DIR_ENV
+    from optimum_benchmark.launchers.inline.config import InlineConfig
+    from optimum_benchmark.launchers.process.launcher import ProcessLauncher
+    from optimum_benchmark.launchers.watchdog_utils import watchdog
+
+    worker_code = (
+        "import subprocess, sys, time\n"
+        "from optimum_benchmark.heartbeat_utils import heartbeat\n"
+        "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        "heartbeat('load')\n"
+        "for _ in range(int(sys.argv[1])):\n"
+        "    heartbeat()\n"
+        "    time.sleep(0.1)\n"
+        "time.sleep(60)\n"
+    )
+
+    # a worker stuck in its load phase is killed with its children
+    with watchdog(timeouts={"load": 2}) as dog:
+        worker = subprocess.Popen([sys.executable, "-c", worker_code, "1000"])
+        children = []
+        while worker.poll() is None:
+            children = children or psutil.Process(worker.pid).children()
+            time.sleep(0.1)
+
+    assert dog.timeout.phase == "load" and dog.timeout.reason == "phase" and dog.timeout.elapsed > 2
+    assert len(children) == 1 and not children[0].is_running()
+
+    # a worker that stops sending heartbeats is killed
+    with watchdog(timeouts={"load": 60}, heartbeat_timeout=2) as dog:
+        worker = subprocess.Popen([sys.executable, "-c", worker_code, "20"])
+        start = time.perf_counter()
+        worker.wait(timeout=30)
+
+    assert dog.timeout.reason == "heartbeat" and time.perf_counter() - start > 4
+    assert HEARTBEAT_DIR_ENV not in os.environ
+
+    # heartbeats are sent in the background while loading, and each benchmark of a group restarts the measure phase
+    group_worker_code = (
+        "import time\n"
+        "from optimum_benchmark.heartbeat_utils import heartbeat, heartbeats\n"
+        "heartbeat('load')\n"
+        "with heartbeats():\n"
+        "    time.sleep(4)\n"
+        "for _ in range(3):\n"
+        "    heartbeat('measure')\n"
+        "    time.sleep(1.5)\n"
+    )
+    with watchdog(timeouts={"measure": 3}, heartbeat_timeout=2) as group_dog:
+        worker = subprocess.Popen([sys.executable, "-c", group_worker_code])
+        assert worker.wait(timeout=30) == 0
+
+    assert group_dog.timeout is None
+
+    report = ProcessLauncher(ProcessConfig()).get_timeout_report(dog.timeout)
+    assert report.experiment.timeout.limit == 2 and report.to_dict()["experiment"]["timeout"]["phase"] == "load"
+    # the report can be sent between processes (e.g. by the scheduler)
+    assert pickle.loads(pickle.dumps(report)).experiment.timeout.reason == "heartbeat"
+
+    with pytest.raises(ValueError):
+        ProcessConfig(timeouts={"compile": 10})
+    with pytest.raises(ValueError):
+        InlineConfig(heartbeat_timeout=10)
+
+
+def test_api_training_heartbeats():
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        experiment_config = ExperimentConfig(
+            experiment_name="training_heartbeats",
+            backend=PyTorchConfig(model=tmpdir, library="transformers", task="text-generation", device="cpu"),
+            launcher=ProcessConfig(heartbeat_timeout=2, timeouts={"warmup": 60, "measure": 60}),
+            benchmark=TrainingConfig(
+                max_steps=250,
+                warmup_steps=10,
+                dataset_shapes={"dataset_size": 240, "sequence_length": 256},
+                training_arguments={"per_device_train_batch_size": 4},
+            ),
+        )
+        report = launch(experiment_config)
+
+    # the training steps send heartbeats, a run longer than the heartbeat timeout isn't killed
+    assert sum(report.overall.latency.values) > 2
+    assert report.train.latency.count == 240 and report.warmup.latency.count == 10
+
+
+def test_api_cpu_isolation():
+    import signal
+    import subprocess
+    import sys
+
+    from optimum_benchmark.launchers.isolation_utils import cpu_isolation, get_cpus_busy_time
+
+    cpus = sorted(os.sched_getaffinity(0))
+    busy_time = get_cpus_busy_time(cpus)
+    competing = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+    time.sleep(1)
+    assert get_cpus_busy_time(cpus) > busy_time
+
+    # the isolated process is signaled (and killed by the default handler) because of the competing load
+    isolated = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        with cpu_isolation(isolated_pid=isolated.pid, enabled=True, action="error", threshold=20):
+            assert isolated.wait(timeout=30) == -signal.SIGUSR1
+    finally:
+        competing.kill()
+        competing.wait()
+        isolated.kill()
+        isolated.wait()
+
+    with pytest.raises(ValueError):
+        ProcessConfig(cpu_isolation=True, cpu_isolation_threshold=0)
+    assert ProcessConfig(cpu_isolation=True).device_isolation_action == "warn"
+
+
+def test_api_device_isolation_mocked_nvml(monkeypatch):
+    import signal
+    import subprocess
+    import sys
+    from types import SimpleNamespace
+
+    import psutil
+
+    from optimum_benchmark.launchers import isolation_utils
+
+    isolated = subprocess.Popen(
+        [sys.executable, "-c", "import subprocess, sys, time; subprocess.Popen(['sleep', '60']); time.sleep(60)"]
+    )
+    foreign = subprocess.Popen(["sleep", "60"])
+
+    while not psutil.Process(isolated.pid).children():
+        time.sleep(0.1)
+    child_pid = psutil.Process(isolated.pid).children()[0].pid
+
+    calls = {"init": 0, "handles": 0, "processes": 0, "descendant": 0}
+
+    def get_processes(handle):
+        calls["processes"] += 1
+        pids = [child_pid] if calls["processes"] <= 6 else [child_pid, foreign.pid]
+        return [SimpleNamespace(pid=pid) for pid in pids]
+
+    def get_handle(index):
+        calls["handles"] += 1
+        return index
+
+    def init():
+        calls["init"] += 1
+
+    fake_pynvml = SimpleNamespace(
+        nvmlInit=init,
+        nvmlShutdown=lambda: None,
+        nvmlDeviceGetHandleByIndex=get_handle,
+        nvmlDeviceGetComputeRunningProcesses=get_processes,
+    )
+
+    is_descendant = isolation_utils.is_descendant
+
+    def count_is_descendant(pid, ancestor_pid):
+        calls["descendant"] += 1
+        return is_descendant(pid, ancestor_pid)
+
+    monkeypatch.setattr(isolation_utils, "pynvml", fake_pynvml, raising=False)
+    monkeypatch.setattr(isolation_utils, "is_pynvml_available", lambda: True)
+    monkeypatch.setattr(isolation_utils, "is_nvidia_system", lambda: True)
+    monkeypatch.setattr(isolation_utils, "setup_logging", lambda level: None)
+    monkeypatch.setattr(isolation_utils, "is_descendant", count_is_descendant)
+
+    try:
+        with pytest.raises(SystemExit):
+            isolation_utils.assert_system_devices_isolation(isolated.pid, "0,1", "error", interval=0.01)
+
+        assert isolated.wait(timeout=10) == -signal.SIGUSR1
+    finally:
+        for pid in [child_pid, foreign.pid, isolated.pid]:
+            if psutil.pid_exists(pid):
+                psutil.Process(pid).kill()
+        isolated.wait()
+        foreign.wait()
+
+    # the library is initialized and the handles are fetched once, each new pid is checked once
+    assert calls["init"] == 1 and calls["handles"] == 2
+    assert calls["processes"] == 8 and calls["descendant"] == 2
+
+
+def test_api_noise_audit(monkeypatch):
+    from optimum_benchmark import system_utils
+    from optimum_benchmark.system_utils import get_noise_audit, screen_noise
+
+    system_files = {
+        "/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor": "powersave",
+        "/sys/devices/system/cpu/intel_pstate/no_turbo": "0",
+        "/sys/devices/system/cpu/smt/active": "1",
+        "/sys/kernel/mm/transparent_hugepage/enabled": "[always] madvise never",
+        "/proc/sys/kernel/numa_balancing": "0",
+    }
+    monkeypatch.setattr(system_utils, "glob", lambda pattern: ["/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"])
+    monkeypatch.setattr(system_utils, "read_system_file", system_files.get)
+    monkeypatch.setattr(os, "getloadavg", lambda: (os.cpu_count() / 2, 0.0, 0.0))
+
+    audit = get_noise_audit()
+    assert audit["scaling_governor"] == "powersave" and audit["turbo"] and audit["smt"]
+    assert audit["transparent_hugepage"] == "always" and audit["numa_balancing"] is False
+    assert audit["noise_sources"] == ["scaling_governor", "turbo", "smt", "transparent_hugepage"]
+    assert audit["noise_score"] == 4.5
+
+    screen_noise(audit, threshold=5, action="error")
+    screen_noise(audit, threshold=2, action="warn")
+    with pytest.raises(RuntimeError):
+        screen_noise(audit, threshold=2, action="error")
+
+    # settings that can't be read aren't noisy
+    monkeypatch.setattr(system_utils, "read_system_file", lambda path: None)
+    audit = get_noise_audit()
+    assert audit["turbo"] is None and audit["noise_sources"] == [] and audit["noise_score"] == 0.5
+
+
+def test_api_rank_latency_aggregation():
+    from optimum_benchmark.benchmarks.report import BenchmarkMeasurements
+    from optimum_benchmark.trackers.latency import Latency, RankLatency
+
+    rank_values = [[1.0, 1.0, 1.0, 1.0], [1.1, 0.9, 1.0, 1.0], [1.5, 1.6, 1.4, 1.5, 1.5]]
+    latencies = [Latency.from_values(values, unit="s") for values in rank_values]
+
+    rank_latency = RankLatency.from_latencies(latencies)
+    # iterations are aligned across ranks, up to the smallest count
+    assert rank_latency.max.values == [1.5, 1.6, 1.4, 1.5] and rank_latency.min.values == [1.0, 0.9, 1.0, 1.0]
+    assert rank_latency.spread.values == pytest.approx([0.5, 0.7, 0.4, 0.5])
+    assert rank_latency.slowest_counts == [0, 0, 4] and rank_latency.stragglers == [2]
+    assert rank_latency.ranks[1].values == rank_values[1]
+
+    reports = []
+    for latency in latencies:
+        report = BenchmarkReport.from_targets(["forward"])
+        report.forward.latency = latency
+        reports.append(report)
+
+    # the latency of synchronized ranks is the latency of the slowest one at each iteration
+    report = reports[0].aggregate(reports)
+    assert report.forward.latency.values == rank_latency.max.values
+    assert report.to_dict()["forward"]["rank_latency"]["stragglers"] == [2]
+    assert BenchmarkMeasurements.aggregate([BenchmarkMeasurements()]).rank_latency is None
+
+
+def test_api_startup_process_launcher():
+    import pickle
+
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from optimum_benchmark.benchmarks.startup.config import StartupConfig
+    from optimum_benchmark.trackers.latency import Latency
+
+    # reports with dynamic targets are sent back by the launchers' workers
+    report = BenchmarkReport.from_targets(["imports", "first_response"])
+    report.imports.latency = Latency.from_values([1.0], unit="s")
+    assert list(pickle.loads(pickle.dumps(report)).to_dict().keys()) == ["imports", "first_response"]
+
+    with TemporaryDirectory() as tmpdir:
+        GPT2LMHeadModel(GPT2Config(n_layer=1, n_embd=32, n_head=2, vocab_size=100)).save_pretrained(tmpdir)
+
+        experiment_config = ExperimentConfig(
+            experiment_name="startup",
+            backend=PyTorchConfig(model=tmpdir, library="transformers", task="feature-extraction", device="cpu"),
+            launcher=ProcessConfig(),
+            benchmark=StartupConfig(memory=False, input_shapes={"batch_size": 1, "sequence_length": 8}),
+        )
+        report = launch(experiment_config)
+
+    # the imports are timed in a fresh interpreter, where torch and transformers aren't imported yet
+    assert report.imports.latency.mean > 0.5
+    assert report.first_response.latency.mean > report.imports.latency.mean